@@ -6,6 +6,7 @@ API REST para análise de padrões de vento usando ML.
 Integrada com MLflow, ThingsBoard e Trendz Analytics.
 """
 
+import asyncio
 import logging
 import os
 import sys
@@ -14,15 +15,29 @@ from datetime import datetime
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
 # Adicionar o diretório raiz ao Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.models.schemas import APIResponse
 from app.routers import clustering, dashboard, health, prediction, thermal_comfort
-from app.services.database import get_db_connection
+from app.services.fast_json import FastJSONResponse
+from app.services.ingest_buffer import (
+    close_ingest_buffer,
+    init_ingest_buffer,
+    write_behind_enabled,
+)
+from app.services.lake_compaction import create_lake_compactor, run_compaction_periodically
 from app.services.mlflow_service import MLflowService
+from app.services.retention import create_retention_policy, run_retention_periodically
+from app.services.storage_service import provision_bucket
+from app.services.thermal_repository import (
+    REJECTED_ERRORS,
+    close_async_pool,
+    init_async_pool,
+    recycle_pool_connections,
+)
+from app.services.thermal_schema import maintain_partitions
 
 # Configuração de logging
 logging.basicConfig(
@@ -59,6 +74,7 @@ app = FastAPI(
     license_info={
         "name": "MIT License",
     },
+    default_response_class=FastJSONResponse,
 )
 
 # Configurar CORS
@@ -89,34 +105,118 @@ async def log_requests(request, call_next):
 
 # Inicializar serviços
 mlflow_service = None
+background_tasks = set()
+
+
+def start_background(coro) -> asyncio.Task:
+    """Executar ``coro`` em background, mantendo uma referência até terminar."""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+async def start_database_tasks(retry_interval: float = 5.0, max_retry_interval: float = 60.0):
+    """
+    Abrir o pool asyncpg, tentando de novo (com backoff) enquanto o
+    PostgreSQL não aceita conexões, e então iniciar a renovação das
+    conexões, a manutenção de partições e a retenção. Sem isso, uma falha
+    no startup deixaria o processo sem partições novas (tudo iria para a
+    partição default) e sem retenção até ser reiniciado.
+    """
+    delay = retry_interval
+    while True:
+        try:
+            pool = await init_async_pool()
+            break
+        except Exception as e:
+            logger.warning(f"⚠️ PostgreSQL indisponível ({e}); nova tentativa em {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_retry_interval)
+    logger.info("✅ Pool de conexões com banco de dados estabelecido")
+
+    # Idade máxima das conexões (o asyncpg só fecha as ociosas)
+    max_lifetime = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+    if max_lifetime > 0:
+        start_background(recycle_pool_connections(pool, max_lifetime))
+
+    # Criar as partições mensais futuras de thermal_measurements
+    start_background(maintain_partitions(
+        pool,
+        interval=float(os.getenv("THERMAL_PARTITION_CHECK_INTERVAL", "86400")),
+        months_ahead=int(os.getenv("THERMAL_PARTITION_MONTHS_AHEAD", "3")),
+    ))
+
+    # Retenção por níveis: descartar partições antigas, manter rollups
+    retention = create_retention_policy()
+    if retention.enabled:
+        start_background(run_retention_periodically(
+            pool,
+            retention,
+            interval=float(os.getenv("THERMAL_RETENTION_CHECK_INTERVAL", "86400")),
+            dry_run=os.getenv("THERMAL_RETENTION_DRY_RUN", "false").lower() == "true",
+        ))
+        logger.info(f"✅ Retenção ativada ({retention.describe()})")
 
 @app.on_event("startup")
 async def startup_event():
-    """Inicializar serviços na inicialização da aplicação."""
+    """
+    Inicializar serviços na inicialização da aplicação.
+
+    Cada subsistema tem seu próprio tratamento de erro: uma falha em um
+    deles não impede os demais de iniciar.
+    """
     global mlflow_service
     
     logger.info("🚀 Inicializando thermal Pattern Analysis API...")
     
+    # Inicializar MLflow
     try:
-        # Inicializar MLflow
         mlflow_service = MLflowService()
         logger.info("✅ MLflow service inicializado")
-        
-        # Testar conexão com banco
-        db = get_db_connection()
-        if db:
-            logger.info("✅ Conexão com banco de dados estabelecida")
-            db.close()
-        
-        logger.info("🎉 API inicializada com sucesso!")
-        
     except Exception as e:
-        logger.error(f"❌ Erro na inicialização: {e}")
+        logger.error(f"❌ Erro ao inicializar o MLflow: {e}")
+    
+    # Provisionar o bucket do data lake sem bloquear o startup
+    start_background(provision_bucket(thermal_comfort.storage_service))
+    
+    # Arquivamento em background no data lake
+    try:
+        await thermal_comfort.lake_archiver.start()
+    except Exception as e:
+        logger.error(f"❌ Erro ao iniciar o arquivamento no data lake: {e}")
+    
+    # Compactação periódica dos objetos JSON de leitura única (opcional)
+    try:
+        compaction_interval = float(os.getenv("LAKE_COMPACTION_INTERVAL", "0"))
+        if compaction_interval > 0:
+            compactor = create_lake_compactor(thermal_comfort.storage_service)
+            start_background(run_compaction_periodically(compactor, compaction_interval))
+    except Exception as e:
+        logger.error(f"❌ Erro ao iniciar a compactação do data lake: {e}")
+    
+    # Buffer write-behind (opcional) para POST /thermal_comfort/
+    try:
+        if write_behind_enabled():
+            await init_ingest_buffer(thermal_comfort.flush_buffered_records, reject_errors=REJECTED_ERRORS)
+            logger.info("✅ Modo write-behind de ingestão ativado")
+    except Exception as e:
+        logger.error(f"❌ Erro ao iniciar o buffer write-behind: {e}")
+    
+    # Pool do banco, partições e retenção (com novas tentativas em background)
+    start_background(start_database_tasks())
+    
+    logger.info("🎉 API inicializada com sucesso!")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup na finalização da aplicação."""
     logger.info("🛑 Finalizando Thermal Pattern Analysis API...")
+    for task in list(background_tasks):
+        task.cancel()
+    await close_ingest_buffer()
+    await thermal_comfort.lake_archiver.stop()
+    await close_async_pool()
 
 # Incluir routers
 app.include_router(health.router, prefix="/health", tags=["Health"])
@@ -187,7 +287,7 @@ async def api_info():
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handler personalizado para HTTPExceptions."""
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content=APIResponse(
             success=False,
@@ -201,7 +301,7 @@ async def http_exception_handler(request, exc):
 async def general_exception_handler(request, exc):
     """Handler geral para exceções não tratadas."""
     logger.error(f"Erro não tratado: {exc}", exc_info=True)
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content=APIResponse(
             success=False,
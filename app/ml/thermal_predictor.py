@@ -7,7 +7,6 @@ Suporta múltiplos modelos: Random Forest, Gradient Boosting, Neural Networks.
 """
 
 import numpy as np
-import pandas as pd
 import os
 from typing import Dict, Tuple, Optional, List
 import joblib
@@ -19,6 +18,8 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 
+from app.services.thermal_dataset import load_dataset
+
 
 class ThermalSensationPredictor:
     """
@@ -101,21 +102,21 @@ class ThermalSensationPredictor:
         except Exception as e:
             print(f"❌ Erro ao salvar modelo: {e}")
     
-    def train(self, data_path: str = "/app/data/sample_thermal_data.csv"):
+    def train(self, data_path: str = "/app/data/sample_thermal_data.parquet"):
         """
         Treinar modelo com dados históricos.
         
         Args:
-            data_path: Caminho para arquivo CSV com dados de treinamento
+            data_path: Dataset processado (``.parquet``, ou ``.csv`` de mesmo nome)
         """
         print(f"🔄 Treinando modelo {self.model_type}...")
         
-        # Carregar dados
-        df = pd.read_csv(data_path)
-        print(f"📊 Dataset carregado: {len(df)} registros")
-        
         # Features e target
         features = ['temperature', 'humidity', 'wind_velocity', 'pressure', 'solar_radiation']
+        
+        # Carregar dados (só as colunas usadas)
+        df = load_dataset(data_path, columns=features + ['thermal_sensation'])
+        print(f"📊 Dataset carregado: {len(df)} registros")
         X = df[features].values
         y = df['thermal_sensation'].values
         
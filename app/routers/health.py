@@ -12,6 +12,7 @@ import requests
 import time
 
 from app.models.schemas import SystemHealth, HealthStatus, APIResponse
+from app.services.thermal_repository import get_async_pool_stats
 
 router = APIRouter()
 
@@ -167,6 +168,20 @@ async def system_info():
         }
     )
 
+@router.get("/database/pool")
+async def database_pool_stats():
+    """
+    🗄️ **Estatísticas do pool de conexões**
+    
+    Conexões em uso, ociosas e tempo de espera para obter uma conexão do
+    pool asyncpg da API.
+    """
+    return APIResponse(
+        success=True,
+        message="Estatísticas do pool de conexões",
+        data=get_async_pool_stats()
+    )
+
 # Funções auxiliares
 async def check_service(url: str, service_name: str) -> HealthStatus:
     """Verificar status de um serviço HTTP."""
@@ -125,7 +125,11 @@ async def predict_batch(
         raise HTTPException(status_code=500, detail=f"Erro na predição em lote: {str(e)}")
 
 @router.post("/train", response_model=APIResponse)
-async def train_models():
+async def train_models(
+    source: str = Query("csv", pattern="^(csv|lake)$", description="Fonte dos dados: csv ou lake (MinIO)"),
+    start_date: Optional[datetime] = Query(None, description="Início do intervalo (source=lake)"),
+    end_date: Optional[datetime] = Query(None, description="Fim do intervalo (source=lake)")
+):
     """
     🎓 **Treinar modelos de predição**
     
@@ -136,13 +140,14 @@ async def train_models():
     - Gradient Boosting Regressor
     
     **Processo:**
-    1. Carrega dados de `/app/data/sample_thermal_data.csv`
+    1. Carrega dados de `/app/data/sample_thermal_data.parquet` (ou `.csv`) ou, com
+       `source=lake`, as leituras arquivadas no MinIO entre `start_date` e `end_date`
     2. Prepara features (incluindo features derivadas)
     3. Treina modelos com validação
     4. Salva modelos e registra no MLflow
     """
     try:
-        results = prediction_service.train_models()
+        results = prediction_service.train_models(source=source, start=start_date, end=end_date)
         
         return APIResponse(
             success=True,
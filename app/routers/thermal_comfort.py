@@ -1,70 +1,58 @@
-from datetime import datetime
-from typing import Optional
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from psycopg2.extras import RealDictCursor
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.models.schemas import (
     APIResponse,
     ThermalDataBatch,
     ThermalDataInput,
-    ThermalDataOutput,
 )
-from app.services.database import get_db_connection
-from app.services.storage_service import StorageService
+from app.services.downsampling import downsample as downsample_series
+from app.services.fast_json import api_response
+from app.services.ingest_buffer import BufferFullError, get_ingest_buffer
+from app.services.lake_archiver import create_lake_archiver
+from app.services.query_cache import etag_matches, get_query_cache, query_etag
+from app.services.storage_service import create_storage_service
+from app.services.thermal_calculations import (
+    calculate_thermal_sensation,
+    compute_thermal_fields,
+    get_comfort_zone,
+)
+from app.services.thermal_export import EXPORT_FORMATS
+from app.services.thermal_repository import (
+    ThermalRepository,
+    decode_cursor,
+    encode_cursor,
+    get_thermal_repository,
+    to_naive_utc,
+)
+from app.services.thermal_schema import ROLLUP_VARIABLES
 
 router = APIRouter()
-storage_service = StorageService()
-
-def calculate_thermal_sensation(temp, humidity, wind_speed, pressure=None, solar_radiation=None):
-    # ... (implementation remains the same)
-    
-    if temp < 27:
-        if wind_speed > 1.79:
-            wind_chill = 13.12 + 0.6215 * temp - 11.37 * (wind_speed * 3.6)**0.16 + 0.3965 * temp * (wind_speed * 3.6)**0.16
-            return round(wind_chill, 2)
-        return round(temp, 2)
-    
-    c1 = -8.78469475556
-    c2 = 1.61139411
-    c3 = 2.33854883889
-    c4 = -0.14611605
-    c5 = -0.012308094
-    c6 = -0.0164248277778
-    c7 = 0.002211732
-    c8 = 0.00072546
-    c9 = -0.000003582
-    
-    heat_index = (c1 + (c2 * temp) + (c3 * humidity) + 
-                 (c4 * temp * humidity) + (c5 * temp**2) + 
-                 (c6 * humidity**2) + (c7 * temp**2 * humidity) + 
-                 (c8 * temp * humidity**2) + (c9 * temp**2 * humidity**2))
-    
-    if wind_speed > 0:
-        wind_factor = 1 - (wind_speed * 0.05)
-        wind_factor = max(wind_factor, 0.7)
-        heat_index *= wind_factor
-    
-    if solar_radiation is not None and solar_radiation > 200:
-        solar_factor = 1 + (solar_radiation - 200) / 2000
-        heat_index *= solar_factor
-    
-    return round(heat_index, 2)
-
-def get_comfort_zone(thermal_sensation):
-    if thermal_sensation < 16:
-        return "Frio"
-    elif thermal_sensation < 20:
-        return "Fresco" 
-    elif thermal_sensation < 26:
-        return "Confortável"
-    elif thermal_sensation < 30:
-        return "Quente"
-    else:
-        return "Muito Quente"
+storage_service = create_storage_service()
+lake_archiver = create_lake_archiver(storage_service)
+
+# Limite de intervalos por consulta em /aggregate
+MAX_AGGREGATE_BUCKETS = 200_000
+
+async def flush_buffered_records(records: List[Dict[str, Any]]):
+    """Gravar em lote as leituras acumuladas pelo buffer write-behind."""
+    repo = await get_thermal_repository()
+    ids = await repo.insert_many(records)
+    for record, db_id in zip(records, ids):
+        record["id"] = db_id
+    lake_archiver.submit_many(records)
 
 @router.post("/", response_model=APIResponse)
-async def create_thermal_data(thermal_data: ThermalDataInput, conn: RealDictCursor = Depends(get_db_connection)):
+async def create_thermal_data(
+    thermal_data: ThermalDataInput,
+    response: Response,
+    repo: ThermalRepository = Depends(get_thermal_repository)
+):
     try:
         data_dict = thermal_data.dict()
         
@@ -78,32 +66,34 @@ async def create_thermal_data(thermal_data: ThermalDataInput, conn: RealDictCurs
         comfort_zone = get_comfort_zone(thermal_sensation)
         
         data_dict.update({
+            # Horário da leitura em UTC sem fuso, como no banco (padrão: agora);
+            # validado aqui, e não só no flush do write-behind
+            "timestamp": to_naive_utc(thermal_data.timestamp or datetime.now(timezone.utc)),
             "created_at": datetime.now(),
             "thermal_sensation": thermal_sensation,
             "comfort_zone": comfort_zone
         })
 
-        # Save to PostgreSQL
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO thermal_measurements 
-                (timestamp, temperature, humidity, wind_velocity, pressure, solar_radiation, thermal_sensation, comfort_zone, created_at)
-                VALUES (%(timestamp)s, %(temperature)s, %(humidity)s, %(wind_velocity)s, %(pressure)s, %(solar_radiation)s, %(thermal_sensation)s, %(comfort_zone)s, %(created_at)s)
-                RETURNING id;
-                """,
-                data_dict
+        # Write-behind: aceitar a leitura e gravá-la depois, em lote
+        buffer = get_ingest_buffer()
+        if buffer is not None:
+            try:
+                sequence = buffer.append(data_dict)
+            except BufferFullError as e:
+                raise HTTPException(status_code=503, detail=str(e))
+
+            response.status_code = 202
+            return APIResponse(
+                success=True,
+                message="Dados térmicos aceitos para gravação",
+                data={**data_dict, "sequence": sequence}
             )
-            db_id = cur.fetchone()['id']
-            data_dict["id"] = db_id
-            conn.commit()
 
-        # Save to MinIO (S3)
-        try:
-            s3_path = storage_service.save_json(data_dict)
-            data_dict["s3_path"] = s3_path
-        except Exception as e:
-            print(f"Failed to save to S3: {e}")
+        # Save to PostgreSQL
+        data_dict["id"] = await repo.insert(data_dict)
+
+        # Arquivar no MinIO (S3) fora do caminho da requisição
+        lake_archiver.submit(data_dict)
 
         return APIResponse(
             success=True,
@@ -111,53 +101,73 @@ async def create_thermal_data(thermal_data: ThermalDataInput, conn: RealDictCurs
             data=data_dict
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
+
+@router.get("/ingest/status", response_model=APIResponse)
+async def get_ingest_status(sequence: Optional[int] = Query(default=None, ge=1)):
+    """
+    Estado do buffer write-behind (profundidade, latência de flush e, se
+    ``sequence`` for informado, se aquela leitura já está gravada no banco
+    ou foi rejeitada por ele),
+    da fila de arquivamento no data lake e do cache de consultas.
+    """
+    buffer = get_ingest_buffer()
+    if buffer is None:
+        return APIResponse(
+            success=True,
+            message="Modo write-behind desativado",
+            data={"enabled": False, "archiver": lake_archiver.stats(), "query_cache": get_query_cache().stats()}
+        )
+
+    data = {
+        "enabled": True,
+        **buffer.stats(),
+        "archiver": lake_archiver.stats(),
+        "query_cache": get_query_cache().stats(),
+    }
+    if sequence is not None:
+        data["sequence"] = sequence
+        data["durable"] = buffer.is_durable(sequence)
+        data["rejected"] = buffer.is_rejected(sequence)
+
+    return APIResponse(
+        success=True,
+        message="Estado do buffer de ingestão",
+        data=data
+    )
 
 @router.post("/batch", response_model=APIResponse)
-async def create_thermal_data_batch(batch_data: ThermalDataBatch, conn: RealDictCursor = Depends(get_db_connection)):
+async def create_thermal_data_batch(batch_data: ThermalDataBatch, repo: ThermalRepository = Depends(get_thermal_repository)):
     try:
-        created_records = []
-        with conn.cursor() as cur:
-            for item in batch_data.data:
-                data_dict = item.dict()
-                
-                thermal_sensation = calculate_thermal_sensation(
-                    temp=item.temperature, 
-                    humidity=item.humidity, 
-                    wind_speed=item.wind_velocity,
-                    pressure=item.pressure,
-                    solar_radiation=item.solar_radiation
-                )
-                comfort_zone = get_comfort_zone(thermal_sensation)
-                
-                data_dict.update({
-                    "created_at": datetime.now(),
-                    "thermal_sensation": thermal_sensation,
-                    "comfort_zone": comfort_zone
-                })
-
-                cur.execute(
-                    """
-                    INSERT INTO thermal_measurements 
-                    (timestamp, temperature, humidity, wind_velocity, pressure, solar_radiation, thermal_sensation, comfort_zone, created_at)
-                    VALUES (%(timestamp)s, %(temperature)s, %(humidity)s, %(wind_velocity)s, %(pressure)s, %(solar_radiation)s, %(thermal_sensation)s, %(comfort_zone)s, %(created_at)s)
-                    RETURNING id;
-                    """,
-                    data_dict
-                )
-                db_id = cur.fetchone()['id']
-                data_dict["id"] = db_id
-                
-                # Offload S3 saving to background task if it becomes slow
-                storage_service.save_json(data_dict)
+        created_records = [item.dict() for item in batch_data.data]
+
+        # Campos derivados calculados sobre as colunas inteiras do lote
+        thermal_sensations, comfort_zones = compute_thermal_fields(
+            temp=[r["temperature"] for r in created_records],
+            humidity=[r["humidity"] for r in created_records],
+            wind_speed=[r["wind_velocity"] for r in created_records],
+            solar_radiation=[r["solar_radiation"] for r in created_records],
+        )
+
+        created_at = datetime.now()
+        for data_dict, thermal_sensation, comfort_zone in zip(
+            created_records, thermal_sensations.tolist(), comfort_zones.tolist()
+        ):
+            data_dict.update({
+                "timestamp": to_naive_utc(data_dict["timestamp"] or datetime.now(timezone.utc)),
+                "created_at": created_at,
+                "thermal_sensation": thermal_sensation,
+                "comfort_zone": comfort_zone
+            })
+
+        ids = await repo.insert_many(created_records)
 
-                created_records.append(data_dict)
-            
-            conn.commit()
+        for data_dict, db_id in zip(created_records, ids):
+            data_dict["id"] = db_id
+        lake_archiver.submit_many(created_records)
 
         return APIResponse(
             success=True,
@@ -168,109 +178,237 @@ async def create_thermal_data_batch(batch_data: ThermalDataBatch, conn: RealDict
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
+
+async def cached_api_response(
+    request: Request,
+    repo: ThermalRepository,
+    key: Tuple[Any, ...],
+    load: Callable[[], Awaitable[Tuple[str, Dict[str, Any]]]],
+) -> Response:
+    """
+    Resposta de uma consulta de leitura pelo cache versionado.
+
+    ``load`` devolve ``(mensagem, dados)`` e só roda em um miss; com
+    ``If-None-Match`` igual ao ETag atual a resposta é 304.
+    """
+    cache = get_query_cache()
+    version = await repo.write_version()
+    headers = {"ETag": query_etag(key, version), "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        cache.not_modified()
+        return Response(status_code=304, headers=headers)
+
+    message, data = await cache.get(key, version, load)
+    response = api_response(message, data=data)
+    response.headers.update(headers)
+    return response
 
 @router.get("/", response_model=APIResponse)
 async def get_thermal_data(
+    request: Request,
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(default=0, ge=0, description="Obsoleto: prefira o cursor `after`"),
+    after: Optional[str] = Query(default=None, description="Cursor `next_cursor` da página anterior"),
+    count: Optional[str] = Query(default=None, pattern="^(exact|estimated)$", description="Incluir o total: exact ou estimated"),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     min_temp: Optional[float] = None,
     max_temp: Optional[float] = None,
     comfort_zone: Optional[str] = None,
-    conn: RealDictCursor = Depends(get_db_connection)
+    format: str = Query(default="records", pattern="^(records|columnar)$", description="records (lista de objetos) ou columnar ({coluna: [valores]})"),
+    repo: ThermalRepository = Depends(get_thermal_repository)
 ):
     try:
-        query_params = []
-        where_clauses = []
-        
-        if start_date:
-            where_clauses.append("timestamp >= %s")
-            query_params.append(start_date)
-        if end_date:
-            where_clauses.append("timestamp <= %s")
-            query_params.append(end_date)
-        if min_temp is not None:
-            where_clauses.append("temperature >= %s")
-            query_params.append(min_temp)
-        if max_temp is not None:
-            where_clauses.append("temperature <= %s")
-            query_params.append(max_temp)
-        if comfort_zone:
-            where_clauses.append("comfort_zone = %s")
-            query_params.append(comfort_zone)
-
-        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-        
-        with conn.cursor() as cur:
-            # Get total records for pagination
-            cur.execute(f"SELECT COUNT(*) FROM thermal_measurements {where_sql}", query_params)
-            total_records = cur.fetchone()['count']
-            
-            # Get paginated data
-            query = f"""
-                SELECT * FROM thermal_measurements 
-                {where_sql}
-                ORDER BY timestamp DESC
-                LIMIT %s OFFSET %s
-            """
-            cur.execute(query, query_params + [limit, offset])
-            records = cur.fetchall()
+        try:
+            after_key = decode_cursor(after) if after else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        return APIResponse(
-            success=True,
-            message="Dados recuperados com sucesso",
-            data={
-                "records": [ThermalDataOutput(**rec) for rec in records],
+        async def load():
+            records, total_records, has_next = await repo.list(
+                limit=limit,
+                offset=offset,
+                start_date=start_date,
+                end_date=end_date,
+                min_temp=min_temp,
+                max_temp=max_temp,
+                comfort_zone=comfort_zone,
+                after=after_key,
+                count=count,
+                columnar=format == "columnar",
+            )
+
+            next_cursor = None
+            if has_next:
+                if format == "columnar":
+                    next_cursor = encode_cursor(records["timestamp"][-1], records["id"][-1])
+                else:
+                    next_cursor = encode_cursor(records[-1]["timestamp"], records[-1]["id"])
+
+            # Registros do banco vão direto para o orjson, sem modelo por linha
+            return "Dados recuperados com sucesso", {
+                "format": format,
+                "records": records,
                 "pagination": {
                     "total": total_records,
+                    "total_is_estimate": count == "estimated",
                     "limit": limit,
                     "offset": offset,
-                    "has_next": offset + limit < total_records
+                    "has_next": has_next,
+                    "next_cursor": next_cursor
                 }
             }
+
+        key = ("list", limit, offset, after_key, count, start_date, end_date,
+               min_temp, max_temp, comfort_zone, format)
+        return await cached_api_response(request, repo, key, load)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+BUCKET_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_bucket(bucket: str) -> timedelta:
+    """Converter ``15m``, ``1h``, ``1d``... em ``timedelta``."""
+    match = re.fullmatch(r"(\d+)([mhd])", bucket)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Intervalo inválido: {bucket} (use, por exemplo, 15m, 1h ou 1d)")
+    return timedelta(**{BUCKET_UNITS[match.group(2)]: int(match.group(1))})
+
+
+@router.get("/aggregate", response_model=APIResponse)
+async def aggregate_thermal_data(
+    bucket: str = Query(default="1h", description="Tamanho do intervalo: 15m, 1h, 1d..."),
+    from_: Optional[datetime] = Query(default=None, alias="from", description="Início (padrão: 24h antes de `to`)"),
+    to: Optional[datetime] = Query(default=None, description="Fim, exclusivo (padrão: agora)"),
+    metrics: str = Query(default="temperature,thermal_sensation", description="Variáveis separadas por vírgula"),
+    percentiles: Optional[str] = Query(default=None, description="Percentis por intervalo, ex.: 50,95"),
+    comfort_zone: Optional[str] = None,
+    points: Optional[int] = Query(default=None, ge=3, le=10000, description="Máximo de pontos retornados"),
+    downsample: str = Query(default="lttb", pattern="^(lttb|minmax)$", description="Método de redução para `points`"),
+    repo: ThermalRepository = Depends(get_thermal_repository)
+):
+    """
+    Série agregada por intervalo de tempo, calculada no banco.
+
+    Com ``points``, a série é reduzida no servidor (LTTB ou min/max sobre a
+    média da primeira métrica), então um ano de dados chega ao dashboard
+    como algumas centenas de pontos em uma única consulta.
+    """
+    try:
+        try:
+            interval = parse_bucket(bucket)
+            metric_list = [m.strip() for m in metrics.split(",") if m.strip()]
+            unknown = [m for m in metric_list if m not in ROLLUP_VARIABLES]
+            if not metric_list or unknown:
+                raise ValueError(
+                    f"Métricas inválidas: {', '.join(unknown) or metrics} "
+                    f"(disponíveis: {', '.join(ROLLUP_VARIABLES)})"
+                )
+            percentile_list = [float(p) for p in percentiles.split(",")] if percentiles else []
+            if any(not 0 < p < 100 for p in percentile_list):
+                raise ValueError("Percentis devem estar entre 0 e 100")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # Com fuso -> UTC sem fuso, para comparar com o padrão ``now()``
+        end = to_naive_utc(to) or datetime.now()
+        start = to_naive_utc(from_) or end - timedelta(days=1)
+        if start >= end:
+            raise HTTPException(status_code=400, detail="`from` deve ser anterior a `to`")
+        if (end - start) / interval > MAX_AGGREGATE_BUCKETS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Intervalo gera mais de {MAX_AGGREGATE_BUCKETS} pontos; aumente `bucket`"
+            )
+
+        rows = await repo.aggregate(
+            interval, start, end, metric_list,
+            percentiles=percentile_list, comfort_zone=comfort_zone,
         )
-        
+
+        total_buckets = len(rows)
+        if points and len(rows) > points:
+            x = np.array([row["bucket"].timestamp() for row in rows])
+            y = np.array([
+                np.nan if row[metric_list[0]]["avg"] is None else row[metric_list[0]]["avg"]
+                for row in rows
+            ])
+            rows = [rows[i] for i in downsample_series(x, y, points, method=downsample)]
+
+        return APIResponse(
+            success=True,
+            message="Dados agregados com sucesso",
+            data={
+                "bucket": bucket,
+                "from": start,
+                "to": end,
+                "metrics": metric_list,
+                "buckets": rows,
+                "total_buckets": total_buckets,
+                "downsampled": len(rows) < total_buckets,
+            }
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
+
+@router.get("/export")
+async def export_thermal_data(
+    format: str = Query(default="csv", pattern="^(csv|ndjson|parquet)$", description="csv, ndjson ou parquet"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    min_temp: Optional[float] = None,
+    max_temp: Optional[float] = None,
+    comfort_zone: Optional[str] = None,
+    chunk_rows: int = Query(default=10_000, ge=100, le=100_000, description="Linhas por bloco lido do banco"),
+    repo: ThermalRepository = Depends(get_thermal_repository)
+):
+    """
+    Exportar as medições filtradas em fluxo, em ordem cronológica.
+
+    A memória usada não depende do volume; a última linha (ou, no Parquet,
+    os metadados do arquivo) traz linhas, bytes e vazão da exportação.
+    """
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        repo.export(
+            format,
+            start_date=start_date,
+            end_date=end_date,
+            min_temp=min_temp,
+            max_temp=max_temp,
+            comfort_zone=comfort_zone,
+            chunk_rows=chunk_rows,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="thermal_measurements.{extension}"'},
+    )
 
 @router.get("/{thermal_id}", response_model=APIResponse)
-async def get_thermal_data_by_id(thermal_id: int, conn: RealDictCursor = Depends(get_db_connection)):
+async def get_thermal_data_by_id(thermal_id: int, repo: ThermalRepository = Depends(get_thermal_repository)):
     try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT * FROM thermal_measurements WHERE id = %s", (thermal_id,))
-            record = cur.fetchone()
+        record = await repo.get_by_id(thermal_id)
         
         if not record:
             raise HTTPException(status_code=404, detail="Registro não encontrado")
         
-        return APIResponse(
-            success=True,
-            message="Registro encontrado",
-            data=ThermalDataOutput(**record)
-        )
+        return api_response("Registro encontrado", data=record)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 @router.delete("/{thermal_id}", response_model=APIResponse)
-async def delete_thermal_data(thermal_id: int, conn: RealDictCursor = Depends(get_db_connection)):
+async def delete_thermal_data(thermal_id: int, repo: ThermalRepository = Depends(get_thermal_repository)):
     try:
-        with conn.cursor() as cur:
-            cur.execute("DELETE FROM thermal_measurements WHERE id = %s RETURNING *;", (thermal_id,))
-            deleted_record = cur.fetchone()
-            conn.commit()
+        deleted_record = await repo.delete(thermal_id)
 
         if not deleted_record:
             raise HTTPException(status_code=404, detail="Registro não encontrado")
@@ -278,67 +416,24 @@ async def delete_thermal_data(thermal_id: int, conn: RealDictCursor = Depends(ge
         return APIResponse(
             success=True,
             message="Registro deletado com sucesso",
-            data=ThermalDataOutput(**deleted_record)
+            data=deleted_record
         )
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 @router.get("/stats/summary", response_model=APIResponse)
-async def get_thermal_stats(conn: RealDictCursor = Depends(get_db_connection)):
+async def get_thermal_stats(request: Request, repo: ThermalRepository = Depends(get_thermal_repository)):
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT 
-                    COUNT(*) as total_records,
-                    MIN(temperature) as min_temp,
-                    MAX(temperature) as max_temp,
-                    AVG(temperature) as avg_temp,
-                    MIN(thermal_sensation) as min_thermal_sensation,
-                    MAX(thermal_sensation) as max_thermal_sensation,
-                    AVG(thermal_sensation) as avg_thermal_sensation
-                FROM thermal_measurements;
-            """)
-            summary_stats = cur.fetchone()
-
-            if summary_stats['total_records'] == 0:
-                 return APIResponse(success=True, message="Nenhum dado disponível", data={"total_records": 0})
-
-            cur.execute("""
-                SELECT comfort_zone, COUNT(*) as count
-                FROM thermal_measurements
-                GROUP BY comfort_zone;
-            """)
-            comfort_zones = {row['comfort_zone']: row['count'] for row in cur.fetchall()}
-
-        stats = {
-            "total_records": summary_stats['total_records'],
-            "temperature": {
-                "min": summary_stats['min_temp'],
-                "max": summary_stats['max_temp'],
-                "avg": round(summary_stats['avg_temp'], 2) if summary_stats['avg_temp'] else None,
-            },
-            "thermal_sensation": {
-                "min": summary_stats['min_thermal_sensation'],
-                "max": summary_stats['max_thermal_sensation'],
-                "avg": round(summary_stats['avg_thermal_sensation'], 2) if summary_stats['avg_thermal_sensation'] else None,
-            },
-            "comfort_zones": comfort_zones
-        }
-        
-        return APIResponse(
-            success=True,
-            message="Estatísticas calculadas com sucesso",
-            data=stats
-        )
-        
+        async def load():
+            stats = await repo.stats()
+            if stats['total_records'] == 0:
+                return "Nenhum dado disponível", {"total_records": 0}
+            return "Estatísticas calculadas com sucesso", stats
+
+        return await cached_api_response(request, repo, ("stats",), load)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
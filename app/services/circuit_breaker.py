@@ -0,0 +1,141 @@
+"""
+Circuit Breaker
+===============
+
+Disjuntor por taxa de erro para chamadas a serviços externos (MinIO/S3).
+
+- ``closed``: chamadas passam; o resultado das últimas ``window_size``
+  chamadas é registrado. Se pelo menos ``min_calls`` foram feitas e a taxa
+  de falhas atingir ``failure_rate_threshold``, o disjuntor abre.
+- ``open``: chamadas falham imediatamente com ``CircuitOpenError`` até
+  passar ``reset_timeout`` segundos.
+- ``half_open``: uma chamada de teste é liberada; sucesso fecha o
+  disjuntor, falha o abre de novo.
+
+Nem toda exceção é falha do serviço: ``is_failure`` decide. Erros em que
+o serviço respondeu normalmente (ex.: 404 do S3) contam como sucesso e
+são apenas repassados.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Chamada rejeitada porque o disjuntor está aberto."""
+
+
+class CircuitBreaker:
+    """
+    Args:
+        name: Nome do serviço protegido (usado nas mensagens)
+        failure_rate_threshold: Fração de falhas (0-1) que abre o disjuntor
+        window_size: Quantidade de chamadas recentes consideradas
+        min_calls: Mínimo de chamadas na janela antes de avaliar a taxa
+        reset_timeout: Tempo (s) aberto antes de liberar uma chamada de teste
+        is_failure: Se uma exceção de ``call`` indica falha do serviço
+            (padrão: toda exceção)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        reset_timeout: float = 30.0,
+        is_failure: Optional[Callable[[Exception], bool]] = None,
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda error: True)
+
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {"rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
+        self._stats["opened"] += 1
+
+    def allow_request(self) -> bool:
+        """Se uma chamada pode ser feita agora (reserva a chamada de teste em half-open)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._window.clear()
+            self._window.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            self._window.append(False)
+            failures = self._window.count(False)
+            if (
+                len(self._window) >= self.min_calls
+                and failures / len(self._window) >= self.failure_rate_threshold
+            ):
+                self._open()
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Executar ``fn`` protegida pelo disjuntor."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuito '{self.name}' aberto")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            window = len(self._window)
+            return {
+                "state": self._current_state(),
+                "failure_rate": round(self._window.count(False) / window, 3) if window else 0.0,
+                "window_calls": window,
+                **self._stats,
+            }
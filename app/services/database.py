@@ -2,27 +2,27 @@
 Database Service
 ===============
 
-Serviços para conexão com banco de dados.
+Conexões psycopg2 avulsas para os scripts de manutenção
+(``scripts/*.py``). A API usa o pool asyncpg de
+``app/services/thermal_repository.py``.
 """
 
+import os
+
 import psycopg2
 from psycopg2.extras import RealDictCursor
-import os
 
-def get_db_connection():
+
+def create_connection():
     """
-    Obter conexão com banco PostgreSQL.
+    Abrir uma nova conexão com o banco PostgreSQL.
     """
-    try:
-        connection = psycopg2.connect(
-            host=os.getenv("POSTGRES_HOST", "localhost"),
-            port=os.getenv("POSTGRES_PORT", "5433"),
-            database=os.getenv("POSTGRES_DB", "avd_wind_data"),
-            user=os.getenv("POSTGRES_USER", "user"),
-            password=os.getenv("POSTGRES_PASSWORD", "password"),
-            cursor_factory=RealDictCursor
-        )
-        return connection
-    except Exception as e:
-        print(f"Erro ao conectar com banco: {e}")
-        return None
\ No newline at end of file
+    return psycopg2.connect(
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=os.getenv("POSTGRES_PORT", "5433"),
+        database=os.getenv("POSTGRES_DB", "avd_wind_data"),
+        user=os.getenv("POSTGRES_USER", "user"),
+        password=os.getenv("POSTGRES_PASSWORD", "password"),
+        connect_timeout=int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+        cursor_factory=RealDictCursor
+    )
@@ -0,0 +1,82 @@
+"""
+Downsampling
+============
+
+Redução de séries temporais para visualização, preservando a forma:
+
+- ``lttb``: Largest-Triangle-Three-Buckets (Steinarsson, 2013) — mantém o
+  primeiro e o último ponto e, em cada balde intermediário, o ponto que
+  forma o maior triângulo com o ponto escolhido antes e a média do balde
+  seguinte;
+- ``minmax``: em cada balde, o mínimo e o máximo (picos nunca somem).
+
+As funções recebem arrays NumPy e devolvem os **índices** dos pontos
+mantidos, em ordem crescente, para que o chamador selecione as linhas
+completas.
+"""
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Índices dos ``n_out`` pontos escolhidos por LTTB."""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=int)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Limites dos n_out - 2 baldes intermediários (primeiro e último ficam fixos)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs(
+            (x[previous] - avg_x) * (by - y[previous])
+            - (x[previous] - bx) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Índices do mínimo e do máximo de cada um de ``n_out // 2`` baldes."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    buckets = max(n_out // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    indices = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        segment = y[start:end]
+        indices.append(start + int(np.argmin(segment)))
+        indices.append(start + int(np.argmax(segment)))
+    return np.unique(indices)
+
+
+def downsample(x: np.ndarray, y: np.ndarray, n_out: int, method: str = "lttb") -> np.ndarray:
+    """Índices mantidos por ``method`` (``lttb`` ou ``minmax``); NaN em ``y`` vira 0 no cálculo."""
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    if method == "minmax":
+        return minmax(y, n_out)
+    if method == "lttb":
+        return lttb(x, y, n_out)
+    raise ValueError(f"Método de downsampling desconhecido: {method}")
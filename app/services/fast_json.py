@@ -0,0 +1,65 @@
+"""
+Fast JSON
+=========
+
+Serialização JSON das respostas da API com ``orjson``.
+
+``FastJSONResponse`` é a classe de resposta padrão da aplicação: datetime,
+arrays NumPy e NaN (vira ``null``) são tratados nativamente, sem passar
+por ``jsonable_encoder``. Rotas de leitura com muitas linhas montam o
+envelope de ``APIResponse`` com ``api_response`` e devolvem os registros do
+banco como estão, sem construir um modelo Pydantic por linha.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    # Tipos que o orjson não conhece (Decimal, numpy escalar, objetos Pydantic)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` serializada com orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def api_response(
+    message: str,
+    data: Optional[Dict[str, Any]] = None,
+    success: bool = True,
+    status_code: int = 200,
+) -> FastJSONResponse:
+    """Envelope de ``APIResponse`` serializado direto, sem validação do modelo."""
+    return FastJSONResponse(
+        status_code=status_code,
+        content={"success": success, "message": message, "data": data, "timestamp": datetime.now()},
+    )
+
+
+def to_columns(rows: List[Any], empty_columns: Iterable[str] = ()) -> Dict[str, List[Any]]:
+    """
+    ``{coluna: [valores...]}`` a partir de registros asyncpg (ou dicts com as
+    mesmas chaves, na mesma ordem). ``empty_columns`` nomeia as colunas de
+    uma página vazia.
+    """
+    if not rows:
+        return {col: [] for col in empty_columns}
+    values = zip(*(tuple(row.values()) for row in rows))
+    return dict(zip(rows[0].keys(), map(list, values)))
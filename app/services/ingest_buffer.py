@@ -0,0 +1,403 @@
+"""
+Ingest Buffer
+=============
+
+Modo write-behind para ingestão de leituras individuais.
+
+O endpoint apenas anexa a leitura a um buffer em memória (limitado) e a um
+log local append-only, respondendo 202 com um número de sequência. Uma task
+em background grava o buffer no PostgreSQL em lote a cada N ms ou M linhas.
+
+Layout do log (``THERMAL_WAL_DIR``):
+
+- ``segment-<n>.ndjson``: uma linha ``{"seq": ..., "record": {...}}`` por leitura;
+  a cada flush o segmento ativo é selado e um novo é aberto;
+- ``committed``: maior sequência já gravada no banco. Segmentos selados são
+  removidos depois que a sequência é registrada aqui;
+- ``dead-letter.ndjson``: leituras que o banco rejeitou (``{"seq", "record",
+  "error", "rejected_at"}``), fora da fila para não bloquear as demais.
+
+Na inicialização, leituras de segmentos remanescentes com sequência maior
+que ``committed`` são reenfileiradas.
+
+Se um lote falha com um erro de ``reject_errors`` (dado inválido, e não
+banco indisponível), ele é dividido ao meio, em ordem, até isolar as
+leituras rejeitadas, que vão para o dead-letter; as demais são gravadas.
+Leituras rejeitadas nunca contam como duráveis (``is_rejected``), mesmo
+com ``committed`` já adiante delas. Qualquer outro erro devolve o
+restante do lote à fila, e as tentativas seguintes esperam em backoff
+exponencial (até ``max_retry_interval_ms``) até um flush dar certo.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FIELDS = ("timestamp", "created_at")
+
+
+class BufferFullError(Exception):
+    """O buffer atingiu a capacidade máxima."""
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class WriteBehindBuffer:
+    """
+    Buffer limitado com log append-only e flush periódico em lote.
+
+    Args:
+        flush_fn: Corrotina que grava uma lista de registros no banco
+        wal_dir: Diretório do log local
+        max_size: Capacidade máxima (leituras ainda não gravadas no banco)
+        flush_interval_ms: Intervalo máximo entre flushes
+        flush_max_rows: Quantidade de linhas que dispara um flush imediato
+        fsync: Forçar ``fsync`` a cada leitura (sobrevive a queda do SO,
+            não só do processo)
+        reject_errors: Exceções de ``flush_fn`` que indicam leituras
+            rejeitadas pelo banco (vão para o dead-letter em vez de voltar
+            à fila)
+        max_retry_interval_ms: Espera máxima entre tentativas depois de
+            flushes que falharam
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        wal_dir: str,
+        max_size: int = 10000,
+        flush_interval_ms: int = 200,
+        flush_max_rows: int = 500,
+        fsync: bool = False,
+        reject_errors: Tuple[Type[BaseException], ...] = (),
+        max_retry_interval_ms: int = 30000,
+    ):
+        self.flush_fn = flush_fn
+        self.reject_errors = reject_errors
+        self.wal_dir = wal_dir
+        self.max_size = max_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_rows = flush_max_rows
+        self.fsync = fsync
+        self.max_retry_interval = max_retry_interval_ms / 1000
+
+        self._pending: List[Tuple[int, Dict[str, Any]]] = []
+        self._sealed: List[str] = []
+        self._segment_no = 0
+        self._segment = None
+        self._segment_path: Optional[str] = None
+        self._last_seq = 0
+        self._committed_seq = 0
+        self._rejected: Set[int] = set()
+        self._retry_delay = 0.0
+        self._retry_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+        self._stats = {
+            "flushes": 0,
+            "failed_flushes": 0,
+            "rows_flushed": 0,
+            "rows_rejected": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    # --- log local ---------------------------------------------------------
+
+    @property
+    def _committed_path(self) -> str:
+        return os.path.join(self.wal_dir, "committed")
+
+    def _segment_paths(self) -> List[str]:
+        names = [n for n in os.listdir(self.wal_dir) if n.startswith("segment-") and n.endswith(".ndjson")]
+        names.sort(key=lambda n: int(n[len("segment-"):-len(".ndjson")]))
+        return [os.path.join(self.wal_dir, n) for n in names]
+
+    def _open_segment(self):
+        self._segment_no += 1
+        self._segment_path = os.path.join(self.wal_dir, f"segment-{self._segment_no}.ndjson")
+        self._segment = open(self._segment_path, "a", encoding="utf-8")
+
+    def _seal_segment(self):
+        """Fechar o segmento ativo (que passa a aguardar o flush) e abrir outro."""
+        self._segment.close()
+        self._sealed.append(self._segment_path)
+        self._open_segment()
+
+    @property
+    def _dead_letter_path(self) -> str:
+        return os.path.join(self.wal_dir, "dead-letter.ndjson")
+
+    def _write_dead_letter(self, rejected: List[Tuple[Tuple[int, Dict[str, Any]], BaseException]]):
+        rejected_at = datetime.now().isoformat()
+        with open(self._dead_letter_path, "a", encoding="utf-8") as f:
+            for (seq, record), error in rejected:
+                entry = {"seq": seq, "record": record, "error": f"{type(error).__name__}: {error}",
+                         "rejected_at": rejected_at}
+                f.write(json.dumps(entry, default=_json_default) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_committed(self, seq: int):
+        tmp_path = self._committed_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._committed_path)
+
+    def _recover(self):
+        """Reenfileirar leituras do log que ainda não chegaram ao banco."""
+        os.makedirs(self.wal_dir, exist_ok=True)
+
+        if os.path.exists(self._committed_path):
+            with open(self._committed_path) as f:
+                self._committed_seq = int(f.read().strip() or 0)
+        self._last_seq = self._committed_seq
+
+        if os.path.exists(self._dead_letter_path):
+            with open(self._dead_letter_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._rejected.add(json.loads(line)["seq"])
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+
+        for path in self._segment_paths():
+            self._segment_no = max(self._segment_no, int(os.path.basename(path)[len("segment-"):-len(".ndjson")]))
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última linha truncada por uma queda no meio da escrita
+                        continue
+                    seq = entry["seq"]
+                    self._last_seq = max(self._last_seq, seq)
+                    if seq <= self._committed_seq:
+                        continue
+                    record = entry["record"]
+                    for field in DATETIME_FIELDS:
+                        if record.get(field):
+                            record[field] = datetime.fromisoformat(record[field])
+                    self._pending.append((seq, record))
+            self._sealed.append(path)
+
+        if self._pending:
+            logger.info(f"Write-behind: {len(self._pending)} leituras recuperadas do log")
+
+    # --- API pública --------------------------------------------------------
+
+    async def start(self):
+        self._recover()
+        self._open_segment()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Parar a task de background, gravando o que ainda estiver pendente."""
+        if self._task:
+            # Sem cancelar: um flush em andamento termina normalmente
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._segment:
+            self._segment.close()
+            self._segment = None
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Anexar uma leitura ao buffer e ao log local.
+
+        Returns:
+            Número de sequência da leitura
+
+        Raises:
+            BufferFullError: se o buffer estiver cheio
+        """
+        if len(self._pending) >= self.max_size:
+            raise BufferFullError(f"Buffer de ingestão cheio ({self.max_size} leituras pendentes)")
+
+        seq = self._last_seq + 1
+        self._segment.write(json.dumps({"seq": seq, "record": record}, default=_json_default) + "\n")
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+
+        self._last_seq = seq
+        self._pending.append((seq, record))
+        if len(self._pending) >= self.flush_max_rows:
+            self._wakeup.set()
+        return seq
+
+    def is_durable(self, seq: int) -> bool:
+        """Se a leitura com essa sequência já foi gravada no banco."""
+        return seq <= self._committed_seq and seq not in self._rejected
+
+    def is_rejected(self, seq: int) -> bool:
+        """Se a leitura com essa sequência foi rejeitada pelo banco (dead-letter)."""
+        return seq in self._rejected
+
+    async def _write(self, batch: List[Tuple[int, Dict[str, Any]]], progress: List[int], rejected: list):
+        """
+        Gravar ``batch`` em ordem, isolando por bisseção as leituras
+        rejeitadas. ``progress[0]`` conta as leituras já resolvidas (gravadas
+        ou rejeitadas); outros erros são propagados.
+        """
+        try:
+            await self.flush_fn([record for _, record in batch])
+        except self.reject_errors as e:
+            if len(batch) == 1:
+                rejected.append((batch[0], e))
+                progress[0] += 1
+                return
+            middle = len(batch) // 2
+            await self._write(batch[:middle], progress, rejected)
+            await self._write(batch[middle:], progress, rejected)
+            return
+        progress[0] += len(batch)
+
+    async def flush(self):
+        """Gravar no banco todas as leituras pendentes."""
+        if not self._pending:
+            return
+
+        self._seal_segment()
+        batch = self._pending
+        sealed = self._sealed
+        self._pending = []
+        self._sealed = []
+
+        start = time.perf_counter()
+        progress, rejected = [0], []
+        try:
+            await self._write(batch, progress, rejected)
+        except Exception as e:
+            self._stats["failed_flushes"] += 1
+            self._retry_delay = min(max(self._retry_delay * 2, self.flush_interval * 2), self.max_retry_interval)
+            self._retry_at = time.monotonic() + self._retry_delay
+            logger.error(
+                f"Write-behind: falha ao gravar {len(batch) - progress[0]} leituras: {e} "
+                f"(nova tentativa em {self._retry_delay:.1f}s)"
+            )
+        else:
+            self._retry_delay = 0.0
+            self._retry_at = 0.0
+
+        if rejected:
+            # Registradas antes de avançar ``committed``: não se perdem numa queda
+            self._write_dead_letter(rejected)
+            self._rejected.update(seq for (seq, _), _ in rejected)
+            self._stats["rows_rejected"] += len(rejected)
+            logger.warning(
+                f"Write-behind: {len(rejected)} leituras rejeitadas pelo banco, "
+                f"movidas para {self._dead_letter_path} (ex.: {rejected[0][1]})"
+            )
+
+        done, remaining = batch[:progress[0]], batch[progress[0]:]
+        if remaining:
+            # Devolver o restante para a frente da fila; será tentado de novo
+            self._pending = remaining + self._pending
+            self._sealed = sealed + self._sealed
+        if not done:
+            return
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._committed_seq = done[-1][0]
+        self._write_committed(self._committed_seq)
+        if not remaining:
+            for path in sealed:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+        self._stats["flushes"] += 1
+        self._stats["rows_flushed"] += len(done) - len(rejected)
+        self._stats["last_flush_ms"] = round(elapsed_ms, 3)
+        self._stats["max_flush_ms"] = round(max(self._stats["max_flush_ms"], elapsed_ms), 3)
+        self._stats["total_flush_ms"] += elapsed_ms
+
+    async def _run(self):
+        while not self._stopping:
+            timeout = max(self.flush_interval, self._retry_at - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # Em backoff, lotes cheios esperam a próxima tentativa
+            if not self._stopping and time.monotonic() < self._retry_at:
+                continue
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        flushes = self._stats["flushes"]
+        return {
+            "depth": len(self._pending),
+            "capacity": self.max_size,
+            "last_sequence": self._last_seq,
+            "committed_sequence": self._committed_seq,
+            "flushes": flushes,
+            "failed_flushes": self._stats["failed_flushes"],
+            "rows_flushed": self._stats["rows_flushed"],
+            "rows_rejected": self._stats["rows_rejected"],
+            "retry_delay_ms": round(self._retry_delay * 1000, 3),
+            "last_flush_ms": self._stats["last_flush_ms"],
+            "avg_flush_ms": round(self._stats["total_flush_ms"] / flushes, 3) if flushes else 0.0,
+            "max_flush_ms": self._stats["max_flush_ms"],
+        }
+
+
+_buffer: Optional[WriteBehindBuffer] = None
+
+
+def write_behind_enabled() -> bool:
+    return os.getenv("THERMAL_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+
+
+async def init_ingest_buffer(
+    flush_fn: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+    reject_errors: Tuple[Type[BaseException], ...] = (),
+) -> WriteBehindBuffer:
+    """Criar e iniciar o buffer write-behind do processo."""
+    global _buffer
+    if _buffer is None:
+        _buffer = WriteBehindBuffer(
+            flush_fn,
+            wal_dir=os.getenv("THERMAL_WAL_DIR", "/app/data/wal"),
+            max_size=int(os.getenv("THERMAL_BUFFER_MAX_SIZE", "10000")),
+            flush_interval_ms=int(os.getenv("THERMAL_FLUSH_INTERVAL_MS", "200")),
+            flush_max_rows=int(os.getenv("THERMAL_FLUSH_MAX_ROWS", "500")),
+            fsync=os.getenv("THERMAL_WAL_FSYNC", "false").lower() in ("1", "true", "yes"),
+            reject_errors=reject_errors,
+            max_retry_interval_ms=int(os.getenv("THERMAL_FLUSH_MAX_RETRY_MS", "30000")),
+        )
+        await _buffer.start()
+    return _buffer
+
+
+async def close_ingest_buffer():
+    global _buffer
+    if _buffer is not None:
+        await _buffer.stop()
+        _buffer = None
+
+
+def get_ingest_buffer() -> Optional[WriteBehindBuffer]:
+    """Buffer write-behind ativo, ou None se o modo estiver desligado."""
+    return _buffer
@@ -0,0 +1,365 @@
+"""
+Lake Archiver
+=============
+
+Arquivamento assíncrono das leituras no data lake (MinIO/S3).
+
+Em vez de um objeto JSON por leitura, os registros são enfileirados e
+agrupados por partição de hora da medição::
+
+    thermal/year=2025/month=12/day=03/hour=16/part-20251203T161502-1a2b3c4d.ndjson
+
+Um lote que cobre mais de ``max_batch_hours`` horas (carga histórica,
+leituras horárias) é agrupado por dia (``.../day=03/part-...``), para não
+gerar um objeto por leitura; o ``DatasetReader`` entende os dois níveis.
+
+Cada partição é gravada como um único objeto NDJSON (ou Parquet) quando
+atinge ``max_bytes`` ou ``max_age`` segundos. Cada objeto gravado é
+registrado em um manifesto local (NDJSON, uma linha por objeto).
+
+Objetos que não puderem ser gravados (erro do S3 ou disjuntor aberto) vão
+para uma ``SpillQueue`` em disco e são regravados em background assim que
+o disjuntor do ``StorageService`` deixar de estar aberto.
+
+Garantia: no máximo uma vez. Até o objeto ser gravado (ou ir para o
+spill), as leituras existem só em memória: na fila ou em uma partição
+aberta, por até ``max_age`` segundos. Uma queda do processo nesse
+intervalo as perde no lake, mas não no PostgreSQL, onde já foram
+confirmadas antes de ``submit``; o banco é a fonte da verdade e o lake,
+uma cópia para análise.
+
+Os lotes de ``submit_many`` entram na fila como um único item e são
+medidos com um ``json.dumps`` por partição do lote, não por leitura.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.services.circuit_breaker import OPEN
+from app.services.spill_queue import SpillQueue
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def partition_prefix(prefix: str, moment: datetime, hourly: bool = True) -> str:
+    """Prefixo da partição horária (ou diária) de ``moment``."""
+    day = f"{prefix}/year={moment.year:04d}/month={moment.month:02d}/day={moment.day:02d}"
+    return f"{day}/hour={moment.hour:02d}" if hourly else day
+
+
+class _PartitionBuffer:
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self.size = 0
+        self.opened_at = time.monotonic()
+
+
+class LakeArchiver:
+    """
+    Fila de arquivamento com rollover por tamanho ou tempo.
+
+    Args:
+        storage: ``StorageService`` usado para gravar os objetos
+        prefix: Prefixo das chaves no bucket
+        file_format: ``ndjson`` ou ``parquet``
+        max_bytes: Tamanho aproximado que fecha um objeto
+        max_age: Idade máxima (s) de um objeto aberto
+        queue_size: Capacidade da fila (em leituras); as excedentes são
+            descartadas
+        manifest_path: Arquivo local onde os objetos gravados são registrados
+        spill_dir: Diretório da fila de objetos com gravação pendente
+        replay_interval: Intervalo (s) entre tentativas de replay da fila
+        max_batch_hours: Horas distintas a partir das quais um lote é
+            agrupado por dia em vez de por hora
+    """
+
+    def __init__(
+        self,
+        storage,
+        prefix: str = "thermal",
+        file_format: str = "ndjson",
+        max_bytes: int = 8 * 1024 * 1024,
+        max_age: float = 300.0,
+        queue_size: int = 100_000,
+        manifest_path: Optional[str] = None,
+        spill_dir: Optional[str] = None,
+        replay_interval: float = 10.0,
+        max_batch_hours: int = 6,
+    ):
+        if file_format not in ("ndjson", "parquet"):
+            raise ValueError(f"Formato não suportado: {file_format}")
+
+        self.storage = storage
+        self.prefix = prefix
+        self.file_format = file_format
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.manifest_path = manifest_path
+        self.spill = SpillQueue(spill_dir) if spill_dir else None
+        self.replay_interval = replay_interval
+        self.max_batch_hours = max_batch_hours
+        self._last_replay = 0.0
+
+        self.queue_size = queue_size
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queued = 0
+        self._partitions: Dict[str, _PartitionBuffer] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self._stats = {
+            "submitted": 0,
+            "dropped": 0,
+            "objects_written": 0,
+            "records_written": 0,
+            "bytes_written": 0,
+            "failed_writes": 0,
+            "spilled_objects": 0,
+            "replayed_objects": 0,
+        }
+
+    # --- API pública --------------------------------------------------------
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Enfileirar uma leitura sem bloquear. Retorna False se a fila estiver cheia."""
+        return self.submit_many([record]) == 1
+
+    def submit_many(self, records: List[Dict[str, Any]]) -> int:
+        """Enfileirar várias leituras como um lote; retorna quantas foram aceitas."""
+        accepted = [dict(record) for record in records[:max(self.queue_size - self._queued, 0)]]
+        self._stats["dropped"] += len(records) - len(accepted)
+        if accepted:
+            self._queue.put_nowait(accepted)
+            self._queued += len(accepted)
+            self._stats["submitted"] += len(accepted)
+        return len(accepted)
+
+    async def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Drenar a fila e gravar todas as partições abertas."""
+        if self._task:
+            self._stopping = True
+            await self._task
+            self._task = None
+        self._drain_queue()
+        await self.flush_all()
+
+    async def flush_all(self):
+        for key in list(self._partitions):
+            await self._flush_partition(key)
+
+    def stats(self) -> Dict[str, Any]:
+        breaker = getattr(self.storage, "breaker", None)
+        return {
+            **self._stats,
+            "queued": self._queued,
+            "open_partitions": len(self._partitions),
+            "buffered_records": sum(len(p.records) for p in self._partitions.values()),
+            "spill_pending": len(self.spill) if self.spill else 0,
+            "breaker": breaker.stats() if breaker else None,
+        }
+
+    async def replay_spilled(self) -> int:
+        """Regravar objetos da fila de spill; retorna quantos foram gravados."""
+        if not self.spill or not len(self.spill):
+            return 0
+        breaker = getattr(self.storage, "breaker", None)
+        if breaker is not None and breaker.state == OPEN:
+            return 0
+        try:
+            replayed = await asyncio.to_thread(
+                self.spill.replay, self.storage.put_object, self._on_replayed
+            )
+        except Exception as e:
+            logger.warning(f"Replay da fila de spill interrompido: {e}")
+            return 0
+        if replayed:
+            logger.info(f"{replayed} objetos regravados a partir da fila de spill")
+        return replayed
+
+    def manifest(self) -> List[Dict[str, Any]]:
+        """Objetos já gravados, conforme o manifesto local."""
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # --- internos -----------------------------------------------------------
+
+    def _add(self, batch: List[Dict[str, Any]]) -> List[str]:
+        """Distribuir um lote pelas partições; retorna as que encheram."""
+        moments = []
+        for record in batch:
+            moment = record.get("timestamp") or record.get("created_at") or datetime.now()
+            if isinstance(moment, str):
+                moment = datetime.fromisoformat(moment)
+            moments.append(moment)
+        hours = {moment.replace(minute=0, second=0, microsecond=0) for moment in moments}
+        hourly = len(hours) <= self.max_batch_hours
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for record, moment in zip(batch, moments):
+            groups.setdefault(partition_prefix(self.prefix, moment, hourly), []).append(record)
+
+        full = []
+        for key, records in groups.items():
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = self._partitions[key] = _PartitionBuffer()
+            partition.records.extend(records)
+            partition.size += len(json.dumps(records, default=_json_default))
+            if partition.size >= self.max_bytes:
+                full.append(key)
+        return full
+
+    def _take(self) -> List[Dict[str, Any]]:
+        batch = self._queue.get_nowait()
+        self._queued -= len(batch)
+        return batch
+
+    def _drain_queue(self):
+        while not self._queue.empty():
+            self._add(self._take())
+
+    async def _run(self):
+        check_interval = min(1.0, self.max_age)
+        while not self._stopping:
+            try:
+                batch = await asyncio.wait_for(self._queue.get(), timeout=check_interval)
+            except asyncio.TimeoutError:
+                batch = None
+
+            # Um erro inesperado (ex.: disco do manifesto) não pode matar a
+            # task: o arquivamento pararia até o processo reiniciar
+            try:
+                if batch is not None:
+                    self._queued -= len(batch)
+                    for key in self._add(batch):
+                        await self._flush_partition(key)
+
+                now = time.monotonic()
+                for key, partition in list(self._partitions.items()):
+                    if now - partition.opened_at >= self.max_age:
+                        await self._flush_partition(key)
+
+                if self.spill and now - self._last_replay >= self.replay_interval:
+                    self._last_replay = now
+                    await self.replay_spilled()
+            except Exception as e:
+                logger.exception(f"Erro no loop do arquivador do data lake: {e}")
+
+    def _serialize(self, records: List[Dict[str, Any]]) -> bytes:
+        if self.file_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            buffer = io.BytesIO()
+            pq.write_table(pa.Table.from_pylist(records), buffer, compression="snappy")
+            return buffer.getvalue()
+        return "".join(
+            json.dumps(record, default=_json_default) + "\n" for record in records
+        ).encode("utf-8")
+
+    async def _flush_partition(self, key: str):
+        partition = self._partitions.pop(key, None)
+        if partition is None or not partition.records:
+            return
+
+        records = partition.records
+        object_key = (
+            f"{key}/part-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.{self.file_format}"
+        )
+
+        try:
+            body = await asyncio.to_thread(self._serialize, records)
+        except Exception as e:
+            self._stats["failed_writes"] += 1
+            logger.error(f"Falha ao serializar {len(records)} registros de {key}: {e}")
+            return
+
+        timestamps = [r["timestamp"] for r in records if isinstance(r.get("timestamp"), datetime)]
+        entry = {
+            "bucket": self.storage.bucket_name,
+            "key": object_key,
+            "partition": key,
+            "format": self.file_format,
+            "records": len(records),
+            "bytes": len(body),
+            "min_timestamp": min(timestamps).isoformat() if timestamps else None,
+            "max_timestamp": max(timestamps).isoformat() if timestamps else None,
+        }
+
+        try:
+            await asyncio.to_thread(self.storage.put_object, object_key, body)
+        except Exception as e:
+            self._stats["failed_writes"] += 1
+            if self.spill is None:
+                logger.error(f"Falha ao arquivar {len(records)} registros em {object_key}: {e}")
+                return
+            try:
+                await asyncio.to_thread(self.spill.spill, object_key, body, entry)
+            except OSError as spill_error:
+                logger.error(
+                    f"Falha ao arquivar {len(records)} registros em {object_key} "
+                    f"e ao gravá-los na fila de spill: {spill_error}"
+                )
+                return
+            self._stats["spilled_objects"] += 1
+            logger.warning(f"{object_key} enviado para a fila de spill: {e}")
+            return
+
+        self._record_written(entry)
+
+    def _on_replayed(self, key: str, body: bytes, entry: Dict[str, Any]):
+        self._stats["replayed_objects"] += 1
+        self._record_written(entry)
+
+    def _record_written(self, entry: Dict[str, Any]):
+        self._stats["objects_written"] += 1
+        self._stats["records_written"] += entry["records"]
+        self._stats["bytes_written"] += entry["bytes"]
+        try:
+            self._write_manifest({**entry, "written_at": datetime.now().isoformat()})
+        except OSError as e:
+            # O objeto já está no bucket; só o registro local se perde
+            logger.error(f"Falha ao registrar {entry['key']} no manifesto: {e}")
+
+    def _write_manifest(self, entry: Dict[str, Any]):
+        if not self.manifest_path:
+            return
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def create_lake_archiver(storage) -> LakeArchiver:
+    """Arquivador configurado pelas variáveis de ambiente ``LAKE_*``."""
+    return LakeArchiver(
+        storage,
+        prefix=os.getenv("LAKE_ARCHIVE_PREFIX", "thermal"),
+        file_format=os.getenv("LAKE_ARCHIVE_FORMAT", "ndjson"),
+        max_bytes=int(os.getenv("LAKE_ARCHIVE_MAX_BYTES", str(8 * 1024 * 1024))),
+        max_age=float(os.getenv("LAKE_ARCHIVE_MAX_AGE", "300")),
+        queue_size=int(os.getenv("LAKE_ARCHIVE_QUEUE_SIZE", "100000")),
+        manifest_path=os.getenv("LAKE_MANIFEST_PATH", "/app/data/lake_manifest.ndjson"),
+        spill_dir=os.getenv("LAKE_SPILL_DIR", "/app/data/spill"),
+        replay_interval=float(os.getenv("LAKE_SPILL_REPLAY_INTERVAL", "10")),
+        max_batch_hours=int(os.getenv("LAKE_ARCHIVE_MAX_BATCH_HOURS", "6")),
+    )
@@ -0,0 +1,202 @@
+"""
+Lake Cache
+==========
+
+Cache local em disco para objetos do data lake.
+
+Os objetos arquivados são imutáveis, então cada entrada é endereçada por
+``sha256(bucket/chave@etag)``: um objeto regravado ganha outro ETag e
+simplesmente deixa de ser encontrado. As entradas ficam em
+``<diretório>/objects/<2 primeiros hex>/<hash>``.
+
+Vários processos podem compartilhar o mesmo diretório:
+
+- entradas são gravadas em arquivo temporário e publicadas com
+  ``os.replace``, então nunca são lidas pela metade;
+- downloads são serializados por ``flock`` em 256 arquivos de lock
+  (pelo prefixo do hash), evitando que dois processos baixem o mesmo
+  objeto;
+- o uso em disco é um contador compartilhado (``usage``), somado a cada
+  download sob um ``flock`` global, então o limite vale para todos os
+  processos juntos;
+- a remoção por LRU (pelo mtime, atualizado a cada acerto) roda sob o
+  mesmo ``flock``, recalcula o uso a partir do diretório e remove até o
+  cache voltar a 90% de ``max_bytes``.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ObjectCache:
+    """
+    Args:
+        directory: Diretório do cache (pode ser compartilhado entre processos)
+        max_bytes: Tamanho máximo em disco antes da remoção por LRU
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._objects_dir = os.path.join(directory, "objects")
+        self._locks_dir = os.path.join(directory, "locks")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._locks_dir, exist_ok=True)
+
+        self._usage_path = os.path.join(directory, "usage")
+        self._evict_lock_path = os.path.join(self._locks_dir, "evict.lock")
+
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bytes_downloaded": 0, "bytes_served": 0, "evictions": 0}
+        with self._file_lock(self._evict_lock_path):
+            self._disk_bytes = self._scan()[1]
+            self._write_usage(self._disk_bytes)
+        if self._disk_bytes > self.max_bytes:
+            self.evict()
+
+    # --- API pública --------------------------------------------------------
+
+    def get(self, bucket: str, key: str, etag: str, loader: Callable[[], bytes]) -> bytes:
+        """Conteúdo do objeto, do disco se possível; senão ``loader()`` e guarda."""
+        digest = hashlib.sha256(f"{bucket}/{key}@{etag}".encode("utf-8")).hexdigest()
+        path = os.path.join(self._objects_dir, digest[:2], digest)
+
+        body = self._read(path)
+        if body is None:
+            with self._file_lock(os.path.join(self._locks_dir, f"{digest[:2]}.lock")):
+                # Outro processo pode ter baixado enquanto esperávamos
+                body = self._read(path)
+                if body is None:
+                    body = loader()
+                    self._write(path, body)
+                    total = self._add_usage(len(body))
+                    with self._lock:
+                        self._stats["misses"] += 1
+                        self._stats["bytes_downloaded"] += len(body)
+                        self._disk_bytes = total
+                    if total > self.max_bytes:
+                        self.evict()
+                    return body
+
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["bytes_served"] += len(body)
+        return body
+
+    def evict(self) -> int:
+        """Remover as entradas menos usadas até 90% de ``max_bytes``; retorna quantas."""
+        removed = 0
+        with self._file_lock(self._evict_lock_path):
+            entries, total = self._scan()
+            target = int(self.max_bytes * 0.9)
+            for mtime, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                total -= size
+                removed += 1
+            self._write_usage(total)
+        with self._lock:
+            self._disk_bytes = total
+            self._stats["evictions"] += removed
+        if removed:
+            logger.info(f"Cache do data lake: {removed} entradas removidas por LRU")
+        return removed
+
+    def prefetch(self, items: Iterable[Tuple[str, str, str, Callable[[], bytes]]], max_workers: int = 8) -> int:
+        """Baixar antecipadamente ``(bucket, chave, etag, loader)``; retorna quantos objetos."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return sum(1 for _ in executor.map(lambda item: self.get(*item), items))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": round(self._stats["hits"] / requests, 3) if requests else 0.0,
+                "disk_bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    # --- internos -----------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self, path: str):
+        with open(path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return body
+
+    def _write(self, path: str, body: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def _add_usage(self, size: int) -> int:
+        """Somar ``size`` ao uso compartilhado entre processos; retorna o total."""
+        with self._file_lock(self._evict_lock_path):
+            try:
+                with open(self._usage_path) as f:
+                    total = int(f.read().strip() or 0)
+            except (FileNotFoundError, ValueError):
+                total = self._scan()[1] - size
+            total += size
+            self._write_usage(total)
+        return total
+
+    def _write_usage(self, total: int):
+        tmp_path = f"{self._usage_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(total))
+        os.replace(tmp_path, self._usage_path)
+
+    def _scan(self):
+        entries, total = [], 0
+        for dirpath, _, filenames in os.walk(self._objects_dir):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+
+def create_object_cache() -> Optional[ObjectCache]:
+    """Cache configurado por ``LAKE_CACHE_DIR``/``LAKE_CACHE_MAX_BYTES`` (None se desativado)."""
+    directory = os.getenv("LAKE_CACHE_DIR")
+    if not directory:
+        return None
+    return ObjectCache(directory, max_bytes=int(os.getenv("LAKE_CACHE_MAX_BYTES", str(2 * 1024 ** 3))))
@@ -0,0 +1,343 @@
+"""
+Lake Compaction
+===============
+
+Compactação dos objetos JSON de leitura única gravados por
+``StorageService.save_json`` (``thermal_data_<YYYYMMDD>_<HHMMSS>[_<hex>].json``)
+em arquivos Parquet diários com colunas tipadas::
+
+    compacted/year=2025/month=12/day=03/part-<hash>.parquet
+
+A partição é o dia do ``timestamp`` das leituras (é por ele que o
+``DatasetReader`` seleciona os objetos), não o dia de gravação que está na
+chave de origem: um grupo de origens com leituras de vários dias vira um
+Parquet por dia. Leituras sem ``timestamp`` ficam no dia de gravação.
+
+Para cada dia de gravação:
+
+1. os objetos do dia são listados (os dias são listados em paralelo);
+2. os objetos são lidos em paralelo e convertidos em uma tabela tipada;
+3. os Parquet (um por dia das leituras) são gravados, lidos de volta e
+   conferidos (linhas e chaves de origem);
+4. um estado ``committed`` com a lista de origens é gravado em
+   ``_compaction/day=<YYYY-MM-DD>/<hash>.json``;
+5. as origens são removidas e o estado passa a ``done``.
+
+O nome dos Parquet é derivado das chaves de origem: uma execução interrompida
+antes do passo 4 é simplesmente refeita, sobrescrevendo os mesmos objetos, e
+estados ``committed`` pendentes são concluídos no início da execução
+seguinte. Origens ilegíveis nunca são removidas.
+
+``repartition`` move para o dia certo as leituras de Parquet compactados
+antes dessa regra, que ficavam no dia de gravação.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+SOURCE_KEY_PATTERN = re.compile(r"^thermal_data_(\d{8})_\d{6}(?:_[0-9a-f]+)?\.json$")
+OUTPUT_DAY_PATTERN = re.compile(r"/year=(\d{4})/month=(\d{2})/day=(\d{2})/[^/]+\.parquet$")
+
+FLOAT_COLUMNS = [
+    "temperature", "humidity", "wind_velocity", "pressure",
+    "solar_radiation", "thermal_sensation",
+]
+TIMESTAMP_COLUMNS = ["timestamp", "created_at"]
+
+COMPACTED_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("timestamp", pa.timestamp("us")),
+    *[(column, pa.float64()) for column in FLOAT_COLUMNS],
+    ("comfort_zone", pa.string()),
+    ("created_at", pa.timestamp("us")),
+    ("source_key", pa.string()),
+])
+
+
+def records_to_table(rows: List[Dict[str, Any]]) -> pa.Table:
+    """Converter leituras brutas em uma tabela com ``COMPACTED_SCHEMA``."""
+    df = pd.DataFrame(rows, columns=COMPACTED_SCHEMA.names)
+    df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
+    for column in FLOAT_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+    for column in TIMESTAMP_COLUMNS:
+        # Horários com fuso são normalizados para UTC sem fuso
+        df[column] = pd.to_datetime(df[column], errors="coerce", utc=True, format="ISO8601").dt.tz_convert(None)
+    for column in ("comfort_zone", "source_key"):
+        df[column] = df[column].astype("string")
+    return pa.Table.from_pandas(df, schema=COMPACTED_SCHEMA, preserve_index=False)
+
+
+def split_by_day(table: pa.Table, fallback: date) -> Dict[date, pa.Table]:
+    """Separar ``table`` pelo dia do ``timestamp`` (sem ``timestamp``: ``fallback``)."""
+    days = table.column("timestamp").to_pandas().dt.normalize()
+    missing = days.isna().to_numpy()
+    groups: Dict[date, pa.Table] = {}
+    for day in days.dropna().unique():
+        groups[day.date()] = table.filter(pa.array((days == day).to_numpy()))
+    if missing.any():
+        orphans = table.filter(pa.array(missing))
+        groups[fallback] = pa.concat_tables([groups[fallback], orphans]) if fallback in groups else orphans
+    return groups
+
+
+class LakeCompactor:
+    """
+    Args:
+        storage: ``StorageService`` (ou ``LocalStorageService``) do bucket
+        source_prefix: Prefixo dos objetos de leitura única
+        output_prefix: Prefixo dos Parquet compactados
+        state_prefix: Prefixo dos objetos de estado da compactação
+        max_workers: Threads para listagem e leitura concorrentes
+        max_objects_per_file: Máximo de origens por Parquet
+    """
+
+    def __init__(
+        self,
+        storage,
+        source_prefix: str = "thermal_data_",
+        output_prefix: str = "compacted",
+        state_prefix: str = "_compaction",
+        max_workers: int = 16,
+        max_objects_per_file: int = 100_000,
+    ):
+        self.storage = storage
+        self.source_prefix = source_prefix
+        self.output_prefix = output_prefix
+        self.state_prefix = state_prefix
+        self.max_workers = max_workers
+        self.max_objects_per_file = max_objects_per_file
+
+    # --- listagem -----------------------------------------------------------
+
+    def first_day(self) -> Optional[date]:
+        """Dia do objeto de origem mais antigo (as chaves ordenam por data)."""
+        for key, _ in self.storage.list_keys(self.source_prefix):
+            match = SOURCE_KEY_PATTERN.match(key)
+            if match:
+                return datetime.strptime(match.group(1), "%Y%m%d").date()
+        return None
+
+    def list_day(self, day: date) -> List[str]:
+        prefix = f"{self.source_prefix}{day:%Y%m%d}_"
+        return [key for key, _ in self.storage.list_keys(prefix) if SOURCE_KEY_PATTERN.match(key)]
+
+    def list_sources(self, start: date, until: date) -> Dict[date, List[str]]:
+        """Listar as origens de cada dia em ``[start, until]``, um dia por thread."""
+        days = [start + timedelta(days=i) for i in range((until - start).days + 1)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listed = executor.map(self.list_day, days)
+            return {day: keys for day, keys in zip(days, listed) if keys}
+
+    # --- estado -------------------------------------------------------------
+
+    def _state_key(self, day: date, digest: str) -> str:
+        return f"{self.state_prefix}/day={day.isoformat()}/{digest}.json"
+
+    def _write_state(self, key: str, state: Dict[str, Any]):
+        self.storage.put_object(key, json.dumps(state).encode("utf-8"))
+
+    def resume(self) -> int:
+        """Concluir compactações já confirmadas cujas origens não foram removidas."""
+        resumed = 0
+        for key, _ in self.storage.list_keys(f"{self.state_prefix}/"):
+            state = json.loads(self.storage.get_object(key))
+            if state.get("status") != "committed":
+                continue
+            # Estados antigos têm um único ``output_key``
+            outputs = state.get("output_keys") or [state["output_key"]]
+            logger.info(f"Retomando remoção das origens de {', '.join(outputs)}")
+            self._finish(key, state)
+            resumed += 1
+        return resumed
+
+    def _finish(self, state_key: str, state: Dict[str, Any]):
+        self.storage.delete_objects(state["sources"])
+        self._write_state(state_key, {
+            **{k: v for k, v in state.items() if k != "sources"},
+            "status": "done",
+            "deleted": len(state["sources"]),
+            "finished_at": datetime.now().isoformat(),
+        })
+
+    # --- compactação --------------------------------------------------------
+
+    def _fetch(self, key: str) -> Tuple[str, Optional[List[Dict[str, Any]]], Optional[str]]:
+        try:
+            payload = json.loads(self.storage.get_object(key))
+        except Exception as e:
+            return key, None, str(e)
+        records = payload if isinstance(payload, list) else [payload]
+        if not all(isinstance(record, dict) for record in records):
+            return key, None, "conteúdo não é um objeto JSON"
+        return key, records, None
+
+    def compact_files(self, day: date, keys: List[str]) -> Dict[str, Any]:
+        """Compactar um grupo de origens gravadas em ``day`` (um Parquet por dia das leituras)."""
+        rows: List[Dict[str, Any]] = []
+        sources: List[str] = []
+        failed: List[str] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for key, records, error in executor.map(self._fetch, keys):
+                if error is not None:
+                    logger.warning(f"Origem ignorada {key}: {error}")
+                    failed.append(key)
+                    continue
+                sources.append(key)
+                rows.extend({**record, "source_key": key} for record in records)
+
+        result = {"day": day.isoformat(), "sources": len(sources), "rows": len(rows), "failed": failed}
+        if not sources:
+            return result
+
+        digest = hashlib.sha1("\n".join(sorted(sources)).encode("utf-8")).hexdigest()[:16]
+        output_keys, size = self._write_days(split_by_day(records_to_table(rows), day), digest)
+
+        # Conferir os objetos gravados antes de tocar nas origens
+        written_rows, written_sources = 0, set()
+        for output_key in output_keys:
+            written = pq.read_table(io.BytesIO(self.storage.get_object(output_key)))
+            written_rows += written.num_rows
+            written_sources.update(written.column("source_key").to_pylist())
+        if written_rows != len(rows) or written_sources != set(sources):
+            raise RuntimeError(
+                f"Verificação de {', '.join(output_keys)} falhou: {written_rows} linhas "
+                f"(esperado {len(rows)}), {len(written_sources)} origens (esperado {len(sources)})"
+            )
+
+        state_key = self._state_key(day, digest)
+        state = {
+            "day": day.isoformat(),
+            "output_keys": output_keys,
+            "rows": len(rows),
+            "bytes": size,
+            "sources": sources,
+            "status": "committed",
+            "committed_at": datetime.now().isoformat(),
+        }
+        self._write_state(state_key, state)
+        self._finish(state_key, state)
+
+        result.update({"output_keys": output_keys, "bytes": size})
+        return result
+
+    def _output_key(self, day: date, digest: str) -> str:
+        return (
+            f"{self.output_prefix}/year={day.year:04d}/month={day.month:02d}"
+            f"/day={day.day:02d}/part-{digest}.parquet"
+        )
+
+    def _write_days(self, tables: Dict[date, pa.Table], digest: str) -> Tuple[List[str], int]:
+        """Gravar um Parquet por dia das leituras; retorna as chaves e o total de bytes."""
+        output_keys, size = [], 0
+        for reading_day, table in sorted(tables.items()):
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer, compression="snappy")
+            body = buffer.getvalue()
+            output_key = self._output_key(reading_day, digest)
+            self.storage.put_object(output_key, body)
+            output_keys.append(output_key)
+            size += len(body)
+        return output_keys, size
+
+    def repartition(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Regravar no dia das leituras os Parquet compactados cujas linhas não
+        são do dia da partição (layout antigo, por dia de gravação).
+
+        Os novos objetos são derivados da chave antiga, então uma execução
+        interrompida é simplesmente refeita; o objeto antigo só é removido
+        depois que todos os novos foram gravados.
+        """
+        summary = {"checked": 0, "moved": 0, "rows": 0, "details": []}
+        for key, _ in list(self.storage.list_keys(f"{self.output_prefix}/")):
+            match = OUTPUT_DAY_PATTERN.search(key)
+            if not match:
+                continue
+            summary["checked"] += 1
+            path_day = date(*map(int, match.groups()))
+            table = pq.read_table(io.BytesIO(self.storage.get_object(key)))
+            tables = split_by_day(table, path_day)
+            if set(tables) <= {path_day}:
+                continue
+
+            summary["moved"] += 1
+            summary["rows"] += table.num_rows
+            digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+            output_keys = [self._output_key(reading_day, digest) for reading_day in sorted(tables)]
+            if not dry_run:
+                self._write_days(tables, digest)
+                self.storage.delete_objects([key])
+            summary["details"].append({"key": key, "rows": table.num_rows, "output_keys": output_keys})
+        return summary
+
+    def run(self, start: Optional[date] = None, until: Optional[date] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Compactar os dias em ``[start, until]``.
+
+        Por padrão ``start`` é o dia da origem mais antiga e ``until`` é
+        ontem: o dia corrente ainda recebe gravações.
+        """
+        until = until or date.today() - timedelta(days=1)
+        summary = {"resumed": 0, "days": 0, "files": 0, "sources": 0, "rows": 0, "failed": 0, "details": []}
+
+        if not dry_run:
+            summary["resumed"] = self.resume()
+
+        start = start or self.first_day()
+        if start is None or start > until:
+            return summary
+
+        for day, keys in sorted(self.list_sources(start, until).items()):
+            summary["days"] += 1
+            if dry_run:
+                summary["sources"] += len(keys)
+                summary["details"].append({"day": day.isoformat(), "sources": len(keys)})
+                continue
+            for i in range(0, len(keys), self.max_objects_per_file):
+                result = self.compact_files(day, keys[i:i + self.max_objects_per_file])
+                summary["files"] += len(result.get("output_keys", []))
+                summary["sources"] += result["sources"]
+                summary["rows"] += result["rows"]
+                summary["failed"] += len(result["failed"])
+                summary["details"].append(result)
+        return summary
+
+
+def create_lake_compactor(storage) -> LakeCompactor:
+    """Compactador configurado pelas variáveis de ambiente ``LAKE_COMPACTION_*``."""
+    return LakeCompactor(
+        storage,
+        output_prefix=os.getenv("LAKE_COMPACTION_OUTPUT_PREFIX", "compacted"),
+        max_workers=int(os.getenv("LAKE_COMPACTION_WORKERS", "16")),
+        max_objects_per_file=int(os.getenv("LAKE_COMPACTION_MAX_OBJECTS", "100000")),
+    )
+
+
+async def run_compaction_periodically(compactor: LakeCompactor, interval: float):
+    """Executar a compactação a cada ``interval`` segundos (``asyncio.create_task``)."""
+    while True:
+        try:
+            summary = await asyncio.to_thread(compactor.run)
+            if summary["days"] or summary["resumed"]:
+                logger.info(
+                    f"Compactação: {summary['sources']} objetos de {summary['days']} dias "
+                    f"em {summary['files']} arquivos ({summary['failed']} ignorados)"
+                )
+        except Exception as e:
+            logger.error(f"Falha na compactação do data lake: {e}")
+        await asyncio.sleep(interval)
@@ -14,11 +14,19 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import joblib
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import mlflow
 import mlflow.sklearn
 
+from app.services.thermal_dataset import load_dataset
+
+# Colunas lidas (data lake ou dataset processado) para treinamento
+TRAINING_COLUMNS = [
+    'timestamp', 'temperature', 'humidity', 'wind_velocity',
+    'pressure', 'solar_radiation', 'thermal_sensation',
+]
+
 class ThermalPredictionService:
     """Serviço de predição de sensação térmica."""
     
@@ -235,18 +243,46 @@ class ThermalPredictionService:
             
             return metrics
     
-    def train_models(self, data_path: str = "/app/data/sample_thermal_data.csv") -> Dict:
+    def load_lake_data(self, start: datetime, end: datetime) -> pd.DataFrame:
+        """Ler do data lake (MinIO) apenas as colunas usadas no treinamento."""
+        from app.services.lake_cache import create_object_cache
+        from app.services.storage_service import DatasetReader, create_storage_service
+
+        reader = DatasetReader(create_storage_service(), cache=create_object_cache())
+        df = reader.read(start, end, columns=TRAINING_COLUMNS)
+        if reader.cache is not None:
+            print(f"🗄️ Cache do data lake: {reader.cache.stats()}")
+        return df
+
+    def train_models(
+        self,
+        data_path: str = "/app/data/sample_thermal_data.parquet",
+        source: str = "csv",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Dict:
         """
         Treinar todos os modelos.
         
         Args:
-            data_path: Caminho para arquivo CSV com dados
+            data_path: Dataset processado (``source="csv"``): ``.parquet``,
+                ``.csv`` de mesmo nome como fallback, ou diretório do lote
+            source: ``csv`` (dataset local) ou ``lake`` (leituras arquivadas no MinIO)
+            start, end: Intervalo lido do data lake (padrão: últimos 365 dias)
             
         Returns:
             Dict com métricas de todos os modelos
         """
-        print(f"📊 Carregando dados de {data_path}...")
-        df = pd.read_csv(data_path)
+        if source == "lake":
+            end = end or datetime.now()
+            start = start or end - timedelta(days=365)
+            print(f"📊 Carregando dados do data lake de {start} a {end}...")
+            df = self.load_lake_data(start, end).dropna(subset=TRAINING_COLUMNS)
+            if df.empty:
+                raise FileNotFoundError(f"Nenhuma leitura no data lake entre {start} e {end}")
+        else:
+            print(f"📊 Carregando dados de {data_path}...")
+            df = load_dataset(data_path, columns=TRAINING_COLUMNS)
         
         print(f"Total de registros: {len(df)}")
         
@@ -0,0 +1,143 @@
+"""
+Query Cache
+===========
+
+Cache em memória dos resultados de consultas de leitura da API
+(``GET /thermal_comfort/``, ``/stats/summary``).
+
+Cada resultado é guardado com a versão de escrita do banco (soma de
+``thermal_write_version``, incrementada no mesmo statement de toda
+inserção, remoção ou recálculo de rollups) em que foi calculado, e só é
+servido enquanto a versão não muda:
+
+- as escritas feitas por este processo forçam a releitura da versão na
+  próxima consulta;
+- escritas de outros processos são percebidas na próxima leitura da
+  versão, feita no máximo a cada ``version_ttl`` segundos.
+
+Misses simultâneos da mesma consulta na mesma versão são colapsados em
+uma única ida ao banco (a consulta roda em uma task compartilhada, então
+o cancelamento de um cliente não afeta os demais). O ETag de cada
+resposta deriva de ``(versão, consulta)``: um ``If-None-Match`` igual
+recebe 304 sem consultar nada além da versão.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class WriteVersion:
+    """Última versão de escrita conhecida por este processo."""
+
+    def __init__(self, ttl: float = 1.0):
+        self.ttl = ttl
+        self._value: Optional[int] = None
+        self._checked = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+
+    def observe(self, version: Optional[int]):
+        """Registrar uma versão devolvida por uma escrita (ou lida do banco)."""
+        if version is None:
+            return
+        if self._value is None or version > self._value:
+            self._value = version
+        self._checked = time.monotonic()
+
+    def expire(self):
+        """Forçar a releitura do banco na próxima consulta."""
+        self._checked = 0.0
+        # Uma leitura já em andamento pode ser anterior ao commit
+        self._refresh = None
+
+    async def current(self, loader: Callable[[], Awaitable[int]]) -> int:
+        """Versão atual; ``loader`` lê do banco quando a conhecida expirou."""
+        if self._value is not None and time.monotonic() - self._checked < self.ttl:
+            return self._value
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.ensure_future(loader())
+        self.observe(await asyncio.shield(self._refresh))
+        return self._value
+
+
+class QueryCache:
+    """
+    Args:
+        max_entries: Número de resultados guardados (LRU); 0 desativa o
+            armazenamento, mantendo ETags e a colapsação de misses
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[Hashable, int], asyncio.Task] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "not_modified": 0}
+
+    async def get(self, key: Hashable, version: int, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Resultado de ``key`` na ``version``, chamando ``loader`` só em um miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+        flight = (key, version)
+        task = self._inflight.get(flight)
+        if task is None:
+            self._stats["misses"] += 1
+            task = asyncio.ensure_future(loader())
+            self._inflight[flight] = task
+            task.add_done_callback(lambda done: self._finish(flight, done))
+        else:
+            self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def not_modified(self):
+        self._stats["not_modified"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "entries": len(self._entries), "max_entries": self.max_entries}
+
+    def _finish(self, flight: Tuple[Hashable, int], task: asyncio.Task):
+        self._inflight.pop(flight, None)
+        if task.cancelled() or task.exception() is not None or self.max_entries <= 0:
+            return
+        key, version = flight
+        current = self._entries.get(key)
+        if current is not None and current[0] > version:
+            return
+        self._entries[key] = (version, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def query_etag(key: Hashable, version: int) -> str:
+    """ETag fraco de ``key`` na ``version`` (o corpo traz um timestamp próprio)."""
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Se o cabeçalho ``If-None-Match`` cobre ``etag`` (comparação fraca)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+_write_version = WriteVersion(ttl=float(os.getenv("THERMAL_WRITE_VERSION_TTL", "1.0")))
+_query_cache = QueryCache(max_entries=int(os.getenv("THERMAL_QUERY_CACHE_SIZE", "256")))
+
+
+def get_write_version() -> WriteVersion:
+    return _write_version
+
+
+def get_query_cache() -> QueryCache:
+    return _query_cache
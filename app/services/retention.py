@@ -0,0 +1,111 @@
+"""
+Retention
+=========
+
+Níveis de retenção de ``thermal_measurements``:
+
+1. leituras brutas por ``raw_days`` dias;
+2. depois, só o rollup horário, até ``hourly_days`` dias;
+3. depois, só o rollup diário (mantido para sempre).
+
+As leituras brutas saem por partição mensal inteira (``DROP TABLE``, sem
+DELETE linha a linha): uma partição só é descartada quando todo o mês é
+mais antigo que o corte, então os dados brutos ficam disponíveis por
+pelo menos ``raw_days`` dias. O trabalho é feito pela função
+``thermal_apply_retention`` (``app/services/thermal_schema.py``), em uma
+transação; ``0`` dias desativa o nível correspondente.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from app.services.query_cache import get_write_version
+from app.services.thermal_schema import APPLY_RETENTION_ASYNC_SQL, APPLY_RETENTION_SQL
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy:
+    """
+    Args:
+        raw_days: Dias de leituras brutas (0 = para sempre)
+        hourly_days: Dias de rollup horário (0 = para sempre); não pode
+            ser menor que ``raw_days``
+    """
+
+    def __init__(self, raw_days: int = 0, hourly_days: int = 0):
+        if raw_days < 0 or hourly_days < 0:
+            raise ValueError("Dias de retenção não podem ser negativos")
+        if hourly_days and (not raw_days or hourly_days < raw_days):
+            raise ValueError("A retenção horária deve ser maior ou igual à das leituras brutas")
+        self.raw_days = raw_days
+        self.hourly_days = hourly_days
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.raw_days or self.hourly_days)
+
+    def cutoffs(self, today: Optional[date] = None) -> Tuple[Optional[date], Optional[date]]:
+        """Datas antes das quais leituras brutas e rollups horários são descartados."""
+        today = today or date.today()
+        raw_before = today - timedelta(days=self.raw_days) if self.raw_days else None
+        hourly_before = today - timedelta(days=self.hourly_days) if self.hourly_days else None
+        return raw_before, hourly_before
+
+    def describe(self) -> str:
+        raw = f"{self.raw_days} dias" if self.raw_days else "para sempre"
+        hourly = f"{self.hourly_days} dias" if self.hourly_days else "para sempre"
+        return f"brutas: {raw}, horário: {hourly}, diário: para sempre"
+
+
+def create_retention_policy() -> RetentionPolicy:
+    """Política de ``THERMAL_RAW_RETENTION_DAYS``/``THERMAL_HOURLY_RETENTION_DAYS``."""
+    return RetentionPolicy(
+        raw_days=int(os.getenv("THERMAL_RAW_RETENTION_DAYS", "0")),
+        hourly_days=int(os.getenv("THERMAL_HOURLY_RETENTION_DAYS", "0")),
+    )
+
+
+def apply_retention(cur, policy: RetentionPolicy, dry_run: bool = True) -> List[Tuple[str, str, int]]:
+    """Aplicar (ou simular) a política com um cursor psycopg2; retorna ``(ação, alvo, linhas)``."""
+    raw_before, hourly_before = policy.cutoffs()
+    cur.execute(APPLY_RETENTION_SQL, {"raw": raw_before, "hourly": hourly_before, "dry_run": dry_run})
+    rows = cur.fetchall()
+    return [tuple(row.values()) if isinstance(row, dict) else tuple(row) for row in rows]
+
+
+async def apply_retention_async(pool, policy: RetentionPolicy, dry_run: bool = False) -> List[Tuple[str, str, int]]:
+    """Mesmo que ``apply_retention``, pelo pool asyncpg da API."""
+    raw_before, hourly_before = policy.cutoffs()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            rows = await conn.fetch(APPLY_RETENTION_ASYNC_SQL, raw_before, hourly_before, dry_run)
+    actions = [(row['action'], row['target'], row['affected']) for row in rows]
+    if actions and not dry_run:
+        # Força a releitura da versão de escrita pelo cache de consultas
+        get_write_version().expire()
+    return actions
+
+
+async def run_retention_periodically(
+    pool,
+    policy: RetentionPolicy,
+    interval: float = 86400.0,
+    dry_run: bool = False,
+):
+    """
+    Aplicar a política periodicamente (``asyncio.create_task`` no startup).
+    Com ``dry_run`` só registra no log o que seria descartado.
+    """
+    label = "Retenção (simulação)" if dry_run else "Retenção"
+    while True:
+        try:
+            actions = await apply_retention_async(pool, policy, dry_run=dry_run)
+            for action, target, affected in actions:
+                logger.info(f"{label}: {action} {target} ({affected} linhas)")
+        except Exception as e:
+            logger.error(f"Falha ao aplicar a retenção de thermal_measurements: {e}")
+        await asyncio.sleep(interval)
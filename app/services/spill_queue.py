@@ -0,0 +1,95 @@
+"""
+Spill Queue
+===========
+
+Fila local em disco para objetos que não puderam ser gravados no MinIO/S3.
+
+Cada objeto vira um par de arquivos no diretório da fila:
+
+- ``<n>.body``: conteúdo do objeto;
+- ``<n>.json``: chave de destino e metadados (gravado por último, com
+  ``os.replace``, então só entradas completas são vistas pelo replay).
+
+O número ``<n>`` é reservado criando o ``.body`` com ``O_EXCL``, então
+vários processos (workers do uvicorn) podem compartilhar o diretório sem
+que um objeto sobrescreva outro. O replay segue a ordem de chegada e para
+na primeira falha; entradas já regravadas por outro processo são puladas.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+class SpillQueue:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._counter_lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._next = max((int(n.split(".")[0]) for n in self._entries()), default=0) + 1
+
+    def _entries(self) -> List[str]:
+        names = [n for n in os.listdir(self.directory) if n.endswith(".json") and n.split(".")[0].isdigit()]
+        return sorted(names, key=lambda n: int(n.split(".")[0]))
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def spill(self, key: str, body: bytes, meta: Optional[Dict[str, Any]] = None):
+        """Guardar um objeto para gravação posterior."""
+        with self._counter_lock:
+            while True:
+                n = self._next
+                self._next += 1
+                body_path = os.path.join(self.directory, f"{n}.body")
+                try:
+                    fd = os.open(body_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                    break
+                except FileExistsError:
+                    # Número já usado por outro processo
+                    continue
+
+        meta_path = os.path.join(self.directory, f"{n}.json")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"key": key, "meta": meta or {}}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def replay(self, put_fn: Callable[[str, bytes], Any], on_success: Optional[Callable[[str, bytes, Dict], None]] = None) -> int:
+        """
+        Regravar os objetos pendentes com ``put_fn(key, body)``.
+
+        Returns:
+            Quantidade de objetos regravados (o replay para na primeira falha,
+            que é propagada ao chamador)
+        """
+        replayed = 0
+        with self._replay_lock:
+            for name in self._entries():
+                meta_path = os.path.join(self.directory, name)
+                body_path = meta_path[:-len(".json")] + ".body"
+                try:
+                    with open(meta_path, encoding="utf-8") as f:
+                        entry = json.load(f)
+                    with open(body_path, "rb") as f:
+                        body = f.read()
+                except FileNotFoundError:
+                    continue
+
+                put_fn(entry["key"], body)
+
+                try:
+                    os.remove(meta_path)
+                    os.remove(body_path)
+                except FileNotFoundError:
+                    # Regravado ao mesmo tempo por outro processo
+                    continue
+                replayed += 1
+                if on_success:
+                    on_success(entry["key"], body, entry["meta"])
+        return replayed
@@ -1,21 +1,92 @@
+import asyncio
 import boto3
+import io
 import json
+import logging
 import os
-from datetime import datetime
+import re
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from app.services.circuit_breaker import CircuitBreaker
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def is_service_failure(error: Exception) -> bool:
+    """Se ``error`` indica MinIO/S3 indisponível (e não uma resposta 4xx, como ``NoSuchKey``)."""
+    if isinstance(error, ClientError):
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        return status is None or status >= 500 or status == 429
+    return True
+
+
 class StorageService:
-    def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            endpoint_url=os.getenv("MLFLOW_S3_ENDPOINT_URL", "http://localhost:9000"),
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "minioadmin"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "minioadmin")
+    """
+    Acesso ao bucket de dados brutos no MinIO/S3.
+
+    O cliente boto3 só é criado no primeiro uso, com timeouts curtos, pool
+    de conexões explícito e retries limitados, então instanciar o serviço
+    nunca faz I/O de rede. A criação do bucket fica a cargo de
+    ``ensure_bucket``/``provision_bucket``, executados fora do caminho de
+    inicialização.
+
+    Gravações passam por um circuit breaker: com o MinIO degradado elas
+    falham imediatamente com ``CircuitOpenError`` em vez de esperar timeouts.
+    Respostas 4xx (``NoSuchKey``, ``NoSuchBucket``...) não contam como falha.
+    Uma gravação que recebe ``NoSuchBucket`` (MinIO que subiu depois do
+    provisionamento, ou bucket removido) cria o bucket e tenta de novo.
+    """
+
+    def __init__(self, bucket_name: str = "avd-raw-data"):
+        self.bucket_name = bucket_name
+        self.bucket_ready = False
+        self._s3_client = None
+        self._client_lock = threading.Lock()
+        self.breaker = CircuitBreaker(
+            "s3",
+            failure_rate_threshold=float(os.getenv("S3_BREAKER_FAILURE_RATE", "0.5")),
+            window_size=int(os.getenv("S3_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv("S3_BREAKER_MIN_CALLS", "5")),
+            reset_timeout=float(os.getenv("S3_BREAKER_RESET_TIMEOUT", "30")),
+            is_failure=is_service_failure,
         )
-        self.bucket_name = "avd-raw-data"
-        self._ensure_bucket_exists()
 
-    def _ensure_bucket_exists(self):
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            with self._client_lock:
+                if self._s3_client is None:
+                    self._s3_client = boto3.client(
+                        's3',
+                        endpoint_url=os.getenv("MLFLOW_S3_ENDPOINT_URL", "http://localhost:9000"),
+                        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "minioadmin"),
+                        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "minioadmin"),
+                        config=Config(
+                            connect_timeout=float(os.getenv("S3_CONNECT_TIMEOUT", "2")),
+                            read_timeout=float(os.getenv("S3_READ_TIMEOUT", "10")),
+                            max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "20")),
+                            retries={
+                                "max_attempts": int(os.getenv("S3_MAX_ATTEMPTS", "3")),
+                                "mode": "standard",
+                            },
+                        ),
+                    )
+        return self._s3_client
+
+    def ensure_bucket(self) -> bool:
+        """Criar o bucket se ele não existir. Retorna True se o bucket está pronto."""
         try:
             self.s3_client.head_bucket(Bucket=self.bucket_name)
         except ClientError:
@@ -23,19 +94,360 @@ class StorageService:
                 self.s3_client.create_bucket(Bucket=self.bucket_name)
             except Exception as e:
                 print(f"Error creating bucket: {e}")
+                return False
+        except Exception as e:
+            print(f"Error checking bucket: {e}")
+            return False
+        self.bucket_ready = True
+        return True
+
+    def put_object(self, key: str, body: bytes):
+        """Gravar um objeto no bucket, propagando erros ao chamador."""
+        try:
+            self.breaker.call(self.s3_client.put_object, Bucket=self.bucket_name, Key=key, Body=body)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "NoSuchBucket":
+                raise
+            self.bucket_ready = False
+            if not self.ensure_bucket():
+                raise
+            self.breaker.call(self.s3_client.put_object, Bucket=self.bucket_name, Key=key, Body=body)
+        return f"s3://{self.bucket_name}/{key}"
+
+    def get_object(self, key: str) -> bytes:
+        """Ler o conteúdo de um objeto do bucket."""
+        response = self.breaker.call(self.s3_client.get_object, Bucket=self.bucket_name, Key=key)
+        return response["Body"].read()
+
+    def list_entries(self, prefix: str = "", start_after: Optional[str] = None) -> Iterator[Tuple[str, int, str]]:
+        """Listar ``(chave, tamanho, etag)`` dos objetos sob ``prefix``, em ordem lexicográfica."""
+        params = {"Bucket": self.bucket_name, "Prefix": prefix}
+        if start_after:
+            params["StartAfter"] = start_after
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(**params):
+            for obj in page.get("Contents", []):
+                yield obj["Key"], obj["Size"], obj["ETag"].strip('"')
+
+    def list_keys(self, prefix: str = "", start_after: Optional[str] = None) -> Iterator[Tuple[str, int]]:
+        """Listar ``(chave, tamanho)`` dos objetos sob ``prefix``, em ordem lexicográfica."""
+        for key, size, _ in self.list_entries(prefix, start_after):
+            yield key, size
+
+    def delete_objects(self, keys: List[str]):
+        """Remover objetos do bucket (em lotes de 1000, o limite da API)."""
+        for i in range(0, len(keys), 1000):
+            chunk = keys[i:i + 1000]
+            response = self.breaker.call(
+                self.s3_client.delete_objects,
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+            )
+            errors = response.get("Errors") or []
+            if errors:
+                raise RuntimeError(f"Falha ao remover {len(errors)} objetos (ex.: {errors[0]})")
 
     def save_json(self, data: dict, filename: str = None):
         if not filename:
+            # Sufixo único: várias leituras no mesmo segundo não se sobrescrevem
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"thermal_data_{timestamp}.json"
-        
+            filename = f"thermal_data_{timestamp}_{uuid.uuid4().hex[:8]}.json"
+
         try:
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=filename,
-                Body=json.dumps(data, default=str)
-            )
-            return f"s3://{self.bucket_name}/{filename}"
+            return self.put_object(filename, json.dumps(data, default=str))
         except Exception as e:
             print(f"Error saving to S3: {e}")
             return None
+
+
+class LocalStorageService(StorageService):
+    """
+    Substituto do S3 em disco, para desenvolvimento e testes sem MinIO.
+
+    Cada objeto é um arquivo em ``<root>/<bucket>/<chave>``; a interface é a
+    mesma de ``StorageService`` (``put_object``, ``get_object``,
+    ``list_keys``, ``delete_objects``).
+    """
+
+    def __init__(self, root: str, bucket_name: str = "avd-raw-data"):
+        super().__init__(bucket_name)
+        self.root = os.path.join(root, bucket_name)
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Chave inválida: {key}")
+        return path
+
+    def ensure_bucket(self) -> bool:
+        os.makedirs(self.root, exist_ok=True)
+        self.bucket_ready = True
+        return True
+
+    def _put(self, key: str, body):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def put_object(self, key: str, body: bytes):
+        self.breaker.call(self._put, key, body)
+        return f"file://{self._path(key)}"
+
+    def get_object(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def list_entries(self, prefix: str = "", start_after: Optional[str] = None) -> Iterator[Tuple[str, int, str]]:
+        # ETag local: muda sempre que o arquivo é regravado
+        entries = []
+        base = os.path.join(self.root, os.path.dirname(prefix))
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if key.startswith(prefix) and (start_after is None or key > start_after):
+                    stat = os.stat(path)
+                    entries.append((key, stat.st_size, f"{stat.st_mtime_ns:x}-{stat.st_size:x}"))
+        yield from sorted(entries)
+
+    def delete_objects(self, keys: List[str]):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+
+_PARTITION_PATTERN = re.compile(
+    r"/year=(\d{4})/month=(\d{2})/day=(\d{2})(?:/hour=(\d{2}))?/"
+)
+
+
+class DatasetReader:
+    """
+    Leitura do data lake por intervalo de tempo.
+
+    Entende o layout particionado do arquivador (``thermal/year=/month=/day=/hour=``,
+    NDJSON ou Parquet) e da compactação (``compacted/year=/month=/day=``).
+    Só os prefixos do intervalo são listados: meses inteiros com um prefixo
+    de mês, as bordas com um prefixo por dia. Os objetos são lidos por um
+    pool limitado de threads, com no máximo ``2 * max_workers`` objetos em
+    memória, e os dados saem em blocos de ``chunk_rows`` linhas.
+
+    Args:
+        storage: ``StorageService`` (ou ``LocalStorageService``) do bucket
+        prefixes: Prefixos particionados a ler
+        max_workers: Leituras simultâneas de objetos
+        cache: ``ObjectCache`` local opcional (objetos endereçados por ETag)
+    """
+
+    def __init__(
+        self,
+        storage: StorageService,
+        prefixes: Sequence[str] = ("thermal", "compacted"),
+        max_workers: int = 8,
+        cache=None,
+    ):
+        self.storage = storage
+        self.prefixes = list(prefixes)
+        self.max_workers = max_workers
+        self.cache = cache
+
+    def _partition_prefixes(self, prefix: str, start: datetime, end: datetime) -> List[str]:
+        prefixes = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day <= end:
+            month_start = day.replace(day=1)
+            next_month = (month_start + timedelta(days=32)).replace(day=1)
+            if day == month_start and next_month - timedelta(microseconds=1) <= end:
+                prefixes.append(f"{prefix}/year={day.year:04d}/month={day.month:02d}/")
+                day = next_month
+            else:
+                prefixes.append(f"{prefix}/year={day.year:04d}/month={day.month:02d}/day={day.day:02d}/")
+                day += timedelta(days=1)
+        return prefixes
+
+    def _select(self, start: datetime, end: datetime) -> List[Tuple[str, str]]:
+        prefixes = [p for prefix in self.prefixes for p in self._partition_prefixes(prefix, start, end)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listed = executor.map(lambda p: [(key, etag) for key, _, etag in self.storage.list_entries(p)], prefixes)
+            entries = [entry for group in listed for entry in group]
+
+        selected = []
+        for key, etag in entries:
+            if not key.endswith((".parquet", ".ndjson")):
+                continue
+            match = _PARTITION_PATTERN.search(key)
+            if not match:
+                continue
+            year, month, day, hour = match.groups()
+            if hour is None:
+                lower = datetime(int(year), int(month), int(day))
+                upper = lower + timedelta(days=1)
+            else:
+                lower = datetime(int(year), int(month), int(day), int(hour))
+                upper = lower + timedelta(hours=1)
+            if lower <= end and upper > start:
+                selected.append((key, etag))
+        return selected
+
+    def list_objects(self, start: datetime, end: datetime) -> List[str]:
+        """Chaves dos objetos cujas partições cruzam ``[start, end]``."""
+        return [key for key, _ in self._select(start, end)]
+
+    def prefetch(self, start: datetime, end: datetime) -> int:
+        """Baixar para o cache local os objetos de ``[start, end]`` (ex.: antes de um treino)."""
+        if self.cache is None:
+            raise RuntimeError("Prefetch requer um cache local (LAKE_CACHE_DIR)")
+        items = [
+            (self.storage.bucket_name, key, etag, partial(self.storage.get_object, key))
+            for key, etag in self._select(start, end)
+        ]
+        return self.cache.prefetch(items, max_workers=self.max_workers)
+
+    def _get(self, key: str, etag: str) -> bytes:
+        if self.cache is None:
+            return self.storage.get_object(key)
+        return self.cache.get(self.storage.bucket_name, key, etag, partial(self.storage.get_object, key))
+
+    def _read_object(self, key: str, etag: str, columns: Optional[List[str]]) -> "pd.DataFrame":
+        import pandas as pd
+
+        body = self._get(key, etag)
+        if key.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            parquet = pq.ParquetFile(io.BytesIO(body))
+            available = parquet.schema_arrow.names
+            wanted = [c for c in columns if c in available] if columns else None
+            df = parquet.read(columns=wanted).to_pandas()
+        else:
+            df = pd.read_json(io.BytesIO(body), lines=True, dtype=False, convert_dates=False)
+        if columns:
+            df = df.reindex(columns=columns)
+        if "timestamp" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+            df["timestamp"] = pd.to_datetime(
+                df["timestamp"], errors="coerce", utc=True, format="ISO8601"
+            ).dt.tz_convert(None)
+        return df
+
+    def iter_chunks(
+        self,
+        start: datetime,
+        end: datetime,
+        columns: Optional[List[str]] = None,
+        chunk_rows: int = 100_000,
+        as_numpy: bool = False,
+    ) -> Iterator:
+        """
+        Percorrer as leituras com ``timestamp`` em ``[start, end]``.
+
+        Args:
+            start, end: Intervalo (inclusivo) da medição
+            columns: Colunas a projetar (padrão: todas)
+            chunk_rows: Linhas aproximadas por bloco
+            as_numpy: Produzir ``np.ndarray`` (colunas na ordem de ``columns``)
+                em vez de ``pd.DataFrame``
+
+        Yields:
+            Blocos em ordem de chave (aproximadamente, ordem de tempo)
+        """
+        # Horários com fuso são comparados em UTC, como gravados no lake
+        start, end = (
+            moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+            for moment in (start, end)
+        )
+        read_columns = None
+        if columns:
+            read_columns = list(columns) if "timestamp" in columns else [*columns, "timestamp"]
+
+        import pandas as pd
+
+        entries = self._select(start, end)
+        pending, frames, rows = deque(), [], 0
+
+        def emit():
+            chunk = pd.concat(frames, ignore_index=True)
+            if columns:
+                chunk = chunk[list(columns)]
+            return chunk.to_numpy() if as_numpy else chunk
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            entry_iter = iter(entries)
+            for key, etag in entry_iter:
+                pending.append(executor.submit(self._read_object, key, etag, read_columns))
+                if len(pending) >= 2 * self.max_workers:
+                    break
+            while pending:
+                df = pending.popleft().result()
+                next_entry = next(entry_iter, None)
+                if next_entry is not None:
+                    pending.append(executor.submit(self._read_object, *next_entry, read_columns))
+
+                if "timestamp" in df.columns:
+                    mask = df["timestamp"].between(start, end)
+                    if not mask.all():
+                        df = df[mask]
+                if df.empty:
+                    continue
+                frames.append(df)
+                rows += len(df)
+                if rows >= chunk_rows:
+                    yield emit()
+                    frames, rows = [], 0
+
+        if frames:
+            yield emit()
+
+    def read(self, start: datetime, end: datetime, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        """Ler o intervalo inteiro em um único ``DataFrame``."""
+        import pandas as pd
+
+        chunks = list(self.iter_chunks(start, end, columns))
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks, ignore_index=True)
+
+
+def create_storage_service(bucket_name: str = "avd-raw-data") -> StorageService:
+    """``LocalStorageService`` se ``STORAGE_LOCAL_DIR`` estiver definido, senão S3/MinIO."""
+    local_dir = os.getenv("STORAGE_LOCAL_DIR")
+    if local_dir:
+        return LocalStorageService(local_dir, bucket_name)
+    return StorageService(bucket_name)
+
+
+async def provision_bucket(
+    storage: StorageService,
+    retry_interval: float = 5.0,
+    max_retry_interval: float = 60.0,
+    max_attempts: Optional[int] = None,
+):
+    """
+    Garantir o bucket em background, tentando de novo (com backoff até
+    ``max_retry_interval``) enquanto o MinIO estiver indisponível; sem
+    ``max_attempts``, até conseguir. Pensado para ``asyncio.create_task``
+    no startup.
+    """
+    attempt, delay = 0, retry_interval
+    while True:
+        attempt += 1
+        if await asyncio.to_thread(storage.ensure_bucket):
+            logger.info(f"✅ Bucket '{storage.bucket_name}' pronto")
+            return True
+        limit = f"/{max_attempts}" if max_attempts else ""
+        logger.warning(
+            f"⚠️ Bucket '{storage.bucket_name}' indisponível (tentativa {attempt}{limit}); "
+            f"nova tentativa em {delay:.0f}s"
+        )
+        if max_attempts and attempt >= max_attempts:
+            return False
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_retry_interval)
@@ -0,0 +1,193 @@
+"""
+Thermal Calculations
+====================
+
+Cálculo da sensação térmica (wind chill / heat index) e da zona de conforto.
+
+Há duas versões das mesmas fórmulas:
+
+- escalar (``calculate_thermal_sensation``/``get_comfort_zone``), usada por
+  leitura individual;
+- vetorizada com NumPy (``compute_thermal_fields``), usada na ingestão em
+  lote, com ramos mascarados e binning de zonas via ``np.digitize``.
+
+Após o arredondamento para 2 casas, a versão vetorizada produz exatamente
+os mesmos valores da escalar (ver ``scripts/check_thermal_calculations.py``).
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Limites inferiores (inclusivos) de cada zona a partir da segunda
+COMFORT_ZONE_BINS = np.array([16.0, 20.0, 26.0, 30.0])
+COMFORT_ZONE_LABELS = np.array(["Frio", "Fresco", "Confortável", "Quente", "Muito Quente"], dtype=object)
+
+HEAT_INDEX_COEFFICIENTS = (
+    -8.78469475556,
+    1.61139411,
+    2.33854883889,
+    -0.14611605,
+    -0.012308094,
+    -0.0164248277778,
+    0.002211732,
+    0.00072546,
+    -0.000003582,
+)
+
+# Folga (em centésimos) abaixo da qual o arredondamento vetorizado é
+# considerado ambíguo e a linha é recalculada pela versão escalar. As
+# diferenças entre np.power e o ``**`` do Python são de poucos ULPs.
+_ROUNDING_TOLERANCE = 1e-6
+_ZONE_TOLERANCE = 1e-9
+
+
+def thermal_sensation_raw(temp, humidity, wind_speed, pressure=None, solar_radiation=None):
+    """Sensação térmica escalar, sem arredondamento."""
+    if temp < 27:
+        if wind_speed > 1.79:
+            wind_chill = 13.12 + 0.6215 * temp - 11.37 * (wind_speed * 3.6)**0.16 + 0.3965 * temp * (wind_speed * 3.6)**0.16
+            return wind_chill
+        return temp
+
+    c1, c2, c3, c4, c5, c6, c7, c8, c9 = HEAT_INDEX_COEFFICIENTS
+
+    heat_index = (c1 + (c2 * temp) + (c3 * humidity) +
+                 (c4 * temp * humidity) + (c5 * temp**2) +
+                 (c6 * humidity**2) + (c7 * temp**2 * humidity) +
+                 (c8 * temp * humidity**2) + (c9 * temp**2 * humidity**2))
+
+    if wind_speed > 0:
+        wind_factor = 1 - (wind_speed * 0.05)
+        wind_factor = max(wind_factor, 0.7)
+        heat_index *= wind_factor
+
+    if solar_radiation is not None and solar_radiation > 200:
+        solar_factor = 1 + (solar_radiation - 200) / 2000
+        heat_index *= solar_factor
+
+    return heat_index
+
+
+def calculate_thermal_sensation(temp, humidity, wind_speed, pressure=None, solar_radiation=None):
+    """Sensação térmica escalar, arredondada para 2 casas."""
+    return round(thermal_sensation_raw(temp, humidity, wind_speed, pressure, solar_radiation), 2)
+
+
+def get_comfort_zone(thermal_sensation):
+    if thermal_sensation < 16:
+        return "Frio"
+    elif thermal_sensation < 20:
+        return "Fresco"
+    elif thermal_sensation < 26:
+        return "Confortável"
+    elif thermal_sensation < 30:
+        return "Quente"
+    else:
+        return "Muito Quente"
+
+
+def thermal_sensation_array(temp, humidity, wind_speed, solar_radiation=None) -> np.ndarray:
+    """
+    Sensação térmica vetorizada, sem arredondamento.
+
+    Pode diferir da versão escalar em poucos ULPs; use
+    ``compute_thermal_fields`` quando o resultado precisa ser idêntico.
+    """
+    temp = np.asarray(temp, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    wind_speed = np.asarray(wind_speed, dtype=np.float64)
+
+    result = temp.copy()
+
+    # Ramo frio: wind chill quando há vento perceptível
+    cold = temp < 27
+    chill = cold & (wind_speed > 1.79)
+    if chill.any():
+        t = temp[chill]
+        v = np.power(wind_speed[chill] * 3.6, 0.16)
+        result[chill] = 13.12 + 0.6215 * t - 11.37 * v + 0.3965 * t * v
+
+    # Ramo quente: heat index com ajustes de vento e radiação
+    hot = ~cold
+    if hot.any():
+        c1, c2, c3, c4, c5, c6, c7, c8, c9 = HEAT_INDEX_COEFFICIENTS
+        t = temp[hot]
+        h = humidity[hot]
+        t2 = t * t
+        h2 = h * h
+        heat_index = (c1 + (c2 * t) + (c3 * h) +
+                      (c4 * t * h) + (c5 * t2) +
+                      (c6 * h2) + (c7 * t2 * h) +
+                      (c8 * t * h2) + (c9 * t2 * h2))
+
+        w = wind_speed[hot]
+        windy = w > 0
+        heat_index[windy] *= np.maximum(1 - (w[windy] * 0.05), 0.7)
+
+        if solar_radiation is not None:
+            s = np.asarray(solar_radiation, dtype=np.float64)[hot]
+            sunny = s > 200
+            heat_index[sunny] *= 1 + (s[sunny] - 200) / 2000
+
+        result[hot] = heat_index
+
+    return result
+
+
+def get_comfort_zone_array(thermal_sensation) -> np.ndarray:
+    """Zona de conforto vetorizada (mesmos limites de ``get_comfort_zone``)."""
+    sensation = np.asarray(thermal_sensation, dtype=np.float64)
+    return COMFORT_ZONE_LABELS[np.digitize(sensation, COMFORT_ZONE_BINS)]
+
+
+def compute_thermal_fields(
+    temp,
+    humidity,
+    wind_speed,
+    solar_radiation=None,
+    zone_from_rounded: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcular sensação térmica (arredondada) e zona de conforto para colunas inteiras.
+
+    Linhas cujo resultado vetorizado cai próximo de um empate de
+    arredondamento (ou de um limite de zona) são recalculadas pela versão
+    escalar, garantindo resultado idêntico ao de ``calculate_thermal_sensation``.
+
+    Args:
+        zone_from_rounded: Classificar a zona pela sensação arredondada (API)
+            ou pela sensação sem arredondamento (conversor INMET)
+
+    Returns:
+        (sensação térmica arredondada, zonas de conforto)
+    """
+    temp = np.asarray(temp, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    wind_speed = np.asarray(wind_speed, dtype=np.float64)
+    solar: Optional[np.ndarray] = None
+    if solar_radiation is not None:
+        solar = np.asarray(solar_radiation, dtype=np.float64)
+
+    raw = thermal_sensation_array(temp, humidity, wind_speed, solar)
+
+    scaled = raw * 100
+    rounded = np.round(scaled) / 100
+
+    with np.errstate(invalid="ignore"):
+        ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < _ROUNDING_TOLERANCE
+        if not zone_from_rounded:
+            ambiguous |= np.any(
+                np.abs(raw[:, None] - COMFORT_ZONE_BINS[None, :]) < _ZONE_TOLERANCE, axis=1
+            )
+
+    for i in np.flatnonzero(ambiguous):
+        value = thermal_sensation_raw(
+            float(temp[i]), float(humidity[i]), float(wind_speed[i]),
+            solar_radiation=float(solar[i]) if solar is not None else None
+        )
+        raw[i] = value
+        rounded[i] = round(value, 2)
+
+    zones = get_comfort_zone_array(rounded if zone_from_rounded else raw)
+    return rounded, zones
@@ -0,0 +1,160 @@
+"""
+Thermal Dataset
+===============
+
+Formato canônico dos dados processados (saída de
+``scripts/convert_inmet_data.py``): Parquet tipado e comprimido, com
+``timestamp`` como ``timestamp[us]``, medidas em ``float64`` e
+``comfort_zone`` como dicionário (``category`` no pandas). Conjuntos do
+modo lote ficam em diretórios ``station=<código>/year=<ano>/``, lidos
+como um único dataset particionado.
+
+Os leitores pedem só as colunas que usam (projeção de colunas do
+Parquet). O CSV continua aceito: se o ``.parquet`` pedido não existe e há
+um ``.csv`` com o mesmo nome (ou o contrário), ele é lido no lugar, com
+os mesmos tipos.
+"""
+
+import glob
+import os
+from typing import Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+MEASUREMENT_COLUMNS = ['temperature', 'humidity', 'wind_velocity', 'pressure', 'solar_radiation']
+DATASET_COLUMNS = ['timestamp', *MEASUREMENT_COLUMNS, 'thermal_sensation', 'comfort_zone']
+COMFORT_ZONES = ['Frio', 'Fresco', 'Confortável', 'Quente', 'Muito Quente']
+
+DATASET_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("us")),
+    *[(column, pa.float64()) for column in MEASUREMENT_COLUMNS],
+    ("thermal_sensation", pa.float64()),
+    ("comfort_zone", pa.dictionary(pa.int8(), pa.string())),
+])
+STATION_FIELDS = [
+    ("station", pa.dictionary(pa.int32(), pa.string())),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+]
+
+DEFAULT_COMPRESSION = os.getenv("THERMAL_DATASET_COMPRESSION", "zstd")
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def dataset_schema(columns: Sequence[str]) -> pa.Schema:
+    """Schema de um frame com ``columns`` (colunas da estação opcionais, em qualquer posição)."""
+    fields = {field.name: field for field in DATASET_SCHEMA}
+    fields.update({name: pa.field(name, type_) for name, type_ in STATION_FIELDS})
+    return pa.schema([fields[column] for column in columns])
+
+
+def to_table(df: pd.DataFrame) -> pa.Table:
+    """Frame convertido -> tabela Arrow com os tipos do dataset."""
+    return pa.Table.from_pandas(df, schema=dataset_schema(list(df.columns)), preserve_index=False)
+
+
+class DatasetWriter:
+    """
+    Escrita incremental de um arquivo do dataset: em ``.parquet`` cada
+    ``write`` vira um row group; em qualquer outra extensão, linhas de CSV
+    (cabeçalho só na primeira escrita).
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        self.path = path
+        self.compression = compression or DEFAULT_COMPRESSION
+        self.rows = 0
+        self._writer = None
+
+    @property
+    def is_parquet(self) -> bool:
+        return self.path.endswith(".parquet")
+
+    def write(self, df: pd.DataFrame):
+        if self.is_parquet:
+            table = to_table(df)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema, compression=self.compression)
+            self._writer.write_table(table)
+        else:
+            if self._writer is None:
+                self._writer = open(self.path, "w", encoding="utf-8", newline="")
+            # Formato fixo: um bloco só com meias-noites sairia sem a hora
+            df.to_csv(self._writer, index=False, header=self.rows == 0, date_format=DATE_FORMAT)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_dataset(df: pd.DataFrame, path: str, compression: Optional[str] = None):
+    """Gravar ``df`` em ``path`` (``.parquet`` tipado; qualquer outra extensão, CSV)."""
+    with DatasetWriter(path, compression) as writer:
+        writer.write(df)
+
+
+def resolve_dataset_path(path: str) -> str:
+    """``path`` se existe; senão o arquivo irmão ``.parquet``/``.csv`` de mesmo nome."""
+    if os.path.exists(path):
+        return path
+    stem = os.path.splitext(path)[0]
+    for sibling in (f"{stem}.parquet", f"{stem}.csv"):
+        if sibling != path and os.path.exists(sibling):
+            return sibling
+    raise FileNotFoundError(f"Dataset não encontrado: {path} (nem .parquet/.csv de mesmo nome)")
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Tipos do dataset em um frame lido de CSV (ou categorias fixas de zona no Parquet)."""
+    if 'timestamp' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    if 'comfort_zone' in df.columns:
+        zones = df['comfort_zone']
+        # Categorias na ordem das zonas (o Parquet as traz na ordem de aparição)
+        if isinstance(zones.dtype, pd.CategoricalDtype):
+            df['comfort_zone'] = zones.cat.set_categories(COMFORT_ZONES)
+        else:
+            df['comfort_zone'] = zones.astype(pd.CategoricalDtype(COMFORT_ZONES))
+    if 'station' in df.columns and not isinstance(df['station'].dtype, pd.CategoricalDtype):
+        df['station'] = df['station'].astype(str).astype('category')
+    return df
+
+
+def _read_csv(path: str, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+    usecols = None if columns is None else lambda column: column in columns
+    return _typed(pd.read_csv(path, usecols=usecols))
+
+
+def load_dataset(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Ler o dataset processado com só as ``columns`` pedidas (todas se ``None``).
+
+    Args:
+        path: Arquivo ``.parquet``/``.csv`` (com fallback para o irmão de
+            mesmo nome) ou diretório particionado do modo lote
+        columns: Colunas a ler; partições (``station``, ``year``) também valem
+    """
+    path = resolve_dataset_path(path)
+    columns = list(columns) if columns is not None else None
+
+    if os.path.isdir(path):
+        if glob.glob(os.path.join(path, "**", "*.parquet"), recursive=True):
+            return _typed(pq.read_table(path, columns=columns, partitioning="hive").to_pandas())
+        parts = sorted(glob.glob(os.path.join(path, "**", "*.csv"), recursive=True))
+        if not parts:
+            raise FileNotFoundError(f"Nenhum arquivo .parquet/.csv em {path}")
+        return _typed(pd.concat([_read_csv(part, columns) for part in parts], ignore_index=True))
+
+    if path.endswith(".parquet"):
+        return _typed(pq.read_table(path, columns=columns).to_pandas())
+    return _read_csv(path, columns)
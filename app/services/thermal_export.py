@@ -0,0 +1,218 @@
+"""
+Thermal Export
+==============
+
+Exportação em massa de ``thermal_measurements`` como fluxo de bytes, com
+memória constante independentemente do volume:
+
+- ``csv``: ``COPY (SELECT ...) TO STDOUT`` — o servidor formata o CSV e os
+  blocos passam direto para a resposta, por uma fila limitada (se o
+  cliente lê devagar, o COPY espera);
+- ``ndjson``: cursor no servidor (``DECLARE ... CURSOR`` via asyncpg),
+  ``chunk_rows`` linhas por ida ao banco, um objeto JSON por linha;
+- ``parquet``: mesmo cursor, um row group por bloco; cada row group é
+  enviado assim que escrito e só o rodapé fica para o final.
+
+A última linha informa a vazão da exportação: um comentário ``# ...`` no
+CSV, um objeto ``{"_export": {...}}`` no NDJSON e, no Parquet, a chave
+``export`` dos metadados do arquivo.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import time
+from contextlib import suppress
+from typing import Any, AsyncIterator, Dict, List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = (
+    "id", "timestamp", "temperature", "humidity", "wind_velocity", "pressure",
+    "solar_radiation", "thermal_sensation", "comfort_zone", "created_at", "station",
+)
+EXPORT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("timestamp", pa.timestamp("us")),
+    ("temperature", pa.float64()),
+    ("humidity", pa.float64()),
+    ("wind_velocity", pa.float64()),
+    ("pressure", pa.float64()),
+    ("solar_radiation", pa.float64()),
+    ("thermal_sensation", pa.float64()),
+    ("comfort_zone", pa.string()),
+    ("created_at", pa.timestamp("us")),
+    ("station", pa.string()),
+])
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def export_query(where_sql: str) -> str:
+    where = f" {where_sql}" if where_sql else ""
+    return f"SELECT {', '.join(EXPORT_COLUMNS)} FROM thermal_measurements{where} ORDER BY timestamp, id"
+
+
+def _json_default(value: Any) -> str:
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class _Progress:
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        summary = {
+            "format": self.fmt,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed > 0 else None,
+        }
+        logger.info(
+            f"Exportação {self.fmt}: {self.rows} linhas, {self.bytes} bytes em {elapsed:.2f}s"
+        )
+        return summary
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino do ParquetWriter que acumula bytes até serem drenados."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def _stream_csv(conn, query: str, params: List[Any], progress: _Progress) -> AsyncIterator[bytes]:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+
+    async def sink(data: bytes):
+        await queue.put(bytes(data))
+
+    async def copy():
+        try:
+            await conn.copy_from_query(query, *params, output=sink, format="csv", header=True)
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(copy())
+    try:
+        newlines = 0
+        while (chunk := await queue.get()) is not None:
+            newlines += chunk.count(b"\n")
+            progress.bytes += len(chunk)
+            yield chunk
+        await task  # propaga erros do COPY
+        progress.rows = max(newlines - 1, 0)  # sem o cabeçalho
+    finally:
+        if not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    s = progress.summary()
+    yield (
+        f"# exported {s['rows']} rows, {s['bytes']} bytes in {s['seconds']}s "
+        f"({s['rows_per_second']} rows/s)\n"
+    ).encode("utf-8")
+
+
+async def _iter_batches(conn, query: str, params: List[Any], chunk_rows: int):
+    # Cursores asyncpg só existem dentro de uma transação
+    async with conn.transaction():
+        cursor = await conn.cursor(query, *params)
+        while True:
+            rows = await cursor.fetch(chunk_rows)
+            if not rows:
+                return
+            yield rows
+
+
+async def _stream_ndjson(conn, query: str, params: List[Any], chunk_rows: int, progress: _Progress) -> AsyncIterator[bytes]:
+    async for rows in _iter_batches(conn, query, params, chunk_rows):
+        body = "".join(json.dumps(dict(row), default=_json_default) + "\n" for row in rows).encode("utf-8")
+        progress.rows += len(rows)
+        progress.bytes += len(body)
+        yield body
+
+    yield (json.dumps({"_export": progress.summary()}) + "\n").encode("utf-8")
+
+
+async def _stream_parquet(conn, query: str, params: List[Any], chunk_rows: int, progress: _Progress) -> AsyncIterator[bytes]:
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, EXPORT_SCHEMA, compression="snappy")
+    try:
+        async for rows in _iter_batches(conn, query, params, chunk_rows):
+            table = pa.Table.from_pydict(
+                {col: [row[col] for row in rows] for col in EXPORT_COLUMNS}, schema=EXPORT_SCHEMA
+            )
+            writer.write_table(table)
+            progress.rows += len(rows)
+            body = sink.drain()
+            progress.bytes += len(body)
+            if body:
+                yield body
+        writer.add_key_value_metadata({"export": json.dumps(progress.summary())})
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def stream_export(
+    conn,
+    fmt: str,
+    where_sql: str = "",
+    params: List[Any] = (),
+    chunk_rows: int = 10_000,
+) -> AsyncIterator[bytes]:
+    """
+    Gerar a exportação de ``thermal_measurements`` em ``fmt``, em blocos.
+
+    Args:
+        conn: Conexão asyncpg, reservada até o fim do fluxo
+        fmt: ``csv``, ``ndjson`` ou ``parquet``
+        where_sql: Cláusula ``WHERE`` com placeholders ``$n``
+        params: Valores dos placeholders
+        chunk_rows: Linhas por ida ao banco (NDJSON) ou por row group (Parquet)
+    """
+    query = export_query(where_sql)
+    params = list(params)
+    progress = _Progress(fmt)
+    if fmt == "csv":
+        stream = _stream_csv(conn, query, params, progress)
+    elif fmt == "ndjson":
+        stream = _stream_ndjson(conn, query, params, chunk_rows, progress)
+    elif fmt == "parquet":
+        stream = _stream_parquet(conn, query, params, chunk_rows, progress)
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+
+    async for chunk in stream:
+        yield chunk
@@ -0,0 +1,762 @@
+"""
+Thermal Repository
+==================
+
+Acesso assíncrono à tabela ``thermal_measurements`` usando asyncpg.
+
+As consultas não bloqueiam o event loop, então requisições concorrentes
+sobrepõem suas esperas pelo banco.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import asyncpg
+from fastapi import HTTPException
+
+from app.services.fast_json import to_columns
+from app.services.query_cache import get_write_version
+from app.services.thermal_export import EXPORT_COLUMNS, stream_export
+from app.services.thermal_schema import (
+    BUMP_WRITE_VERSION_SQL,
+    INSERTED_ROLLUP_CTES,
+    RETENTION_HORIZON_SQL,
+    ROLLUP_TABLES,
+    ROLLUP_VARIABLES,
+    WRITE_VERSION_SQL,
+    rollup_rebuild_bucket_sql,
+)
+
+logger = logging.getLogger(__name__)
+
+INSERT_COLUMNS = (
+    "timestamp", "temperature", "humidity", "wind_velocity", "pressure",
+    "solar_radiation", "thermal_sensation", "comfort_zone", "created_at",
+)
+INSERT_TYPES = (
+    "timestamp", "float8", "float8", "float8", "float8",
+    "float8", "float8", "varchar", "timestamp",
+)
+TIMESTAMP_COLUMNS = ("timestamp", "created_at")
+UNNEST_ARGS = ", ".join(f"${i}::{t}[]" for i, t in enumerate(INSERT_TYPES, start=1))
+
+# Erros de leituras que o banco rejeita (valor inválido, restrição violada),
+# ao contrário de falhas de conexão: tentar de novo não adianta
+REJECTED_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+# Rollups e versão de escrita atualizados no mesmo statement do INSERT
+ROLLUP_CTES = INSERTED_ROLLUP_CTES
+
+
+def to_naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """
+    Horário com fuso -> UTC sem fuso, como as colunas ``timestamp`` do banco
+    (o codec ``timestamp`` do asyncpg rejeita horários com fuso). Horários
+    sem fuso e ``None`` passam inalterados.
+    """
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _insert_values(record: Dict[str, Any]) -> List[Any]:
+    return [to_naive_utc(record[col]) if col in TIMESTAMP_COLUMNS else record[col] for col in INSERT_COLUMNS]
+
+
+def encode_cursor(timestamp: datetime, record_id: int) -> str:
+    """Cursor opaco de paginação a partir de ``(timestamp, id)``."""
+    payload = json.dumps({"t": timestamp.isoformat(), "i": record_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverso de ``encode_cursor``; levanta ``ValueError`` para cursores inválidos."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), int(payload["i"])
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+
+class _Where:
+    """Cláusulas WHERE com placeholders ``$n`` numerados na ordem dos parâmetros."""
+
+    def __init__(self):
+        self.clauses: List[str] = []
+        self.params: List[Any] = []
+
+    def add(self, clause: str, *values: Any):
+        placeholders = []
+        for value in values:
+            self.params.append(to_naive_utc(value) if isinstance(value, datetime) else value)
+            placeholders.append(f"${len(self.params)}")
+        self.clauses.append(clause.format(*placeholders))
+
+    def sql(self) -> str:
+        return f"WHERE {' AND '.join(self.clauses)}" if self.clauses else ""
+
+    @classmethod
+    def measurements(
+        cls,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_temp: Optional[float] = None,
+        max_temp: Optional[float] = None,
+        comfort_zone: Optional[str] = None,
+    ) -> "_Where":
+        """Filtros de listagem/exportação de ``thermal_measurements``."""
+        where = cls()
+        if start_date:
+            where.add("timestamp >= {}", start_date)
+        if end_date:
+            where.add("timestamp <= {}", end_date)
+        if min_temp is not None:
+            where.add("temperature >= {}", min_temp)
+        if max_temp is not None:
+            where.add("temperature <= {}", max_temp)
+        if comfort_zone:
+            where.add("comfort_zone = {}", comfort_zone)
+        return where
+
+
+class ThermalRepository:
+    """Operações sobre ``thermal_measurements`` a partir de um pool asyncpg."""
+
+    def __init__(self, pool: asyncpg.Pool, acquire_timeout: Optional[float] = None):
+        self.pool = pool
+        self.acquire_timeout = acquire_timeout
+
+    @asynccontextmanager
+    async def _acquire(self):
+        """
+        Emprestar uma conexão do pool, medindo a espera (ver
+        ``get_async_pool_stats``).
+
+        Uma conexão ociosa há mais de ``DB_POOL_HEALTH_CHECK_IDLE`` segundos
+        é testada com ``SELECT 1`` antes do uso; se falhar, é descartada e
+        outra é obtida.
+        """
+        start = time.perf_counter()
+        try:
+            conn = await self.pool.acquire(timeout=self.acquire_timeout)
+            if not await _healthy(conn):
+                await self.pool.release(conn)
+                conn = await self.pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            _acquire_stats["timeouts"] += 1
+            raise
+        waited = time.perf_counter() - start
+        _acquire_stats["acquired"] += 1
+        _acquire_stats["wait_time_total"] += waited
+        _acquire_stats["wait_time_max"] = max(_acquire_stats["wait_time_max"], waited)
+        try:
+            yield conn
+        finally:
+            _last_released[conn.get_server_pid()] = time.monotonic()
+            await self.pool.release(conn)
+
+    async def insert(self, record: Dict[str, Any]) -> int:
+        """Inserir uma medição (e somá-la aos rollups) e retornar o id gerado."""
+        placeholders = ", ".join(f"${i}" for i in range(1, len(INSERT_COLUMNS) + 1))
+        async with self._acquire() as conn:
+            row = await conn.fetchrow(
+                f"""
+                WITH inserted AS (
+                    INSERT INTO thermal_measurements ({", ".join(INSERT_COLUMNS)})
+                    VALUES ({placeholders})
+                    RETURNING *
+                ),
+                {ROLLUP_CTES}
+                SELECT id FROM inserted;
+                """,
+                *_insert_values(record)
+            )
+        get_write_version().expire()
+        return row['id']
+
+    async def insert_many(self, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Inserir várias medições em uma única ida ao banco.
+
+        As colunas são enviadas como arrays e expandidas com ``unnest`` no
+        servidor, equivalente a um INSERT multi-linha com um único statement.
+        Os rollups recebem um upsert por hora/dia e zona do lote.
+
+        Returns:
+            Ids gerados, na mesma ordem de ``records``
+        """
+        if not records:
+            return []
+
+        columns = [list(column) for column in zip(*map(_insert_values, records))]
+        async with self._acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                WITH inserted AS (
+                    INSERT INTO thermal_measurements ({", ".join(INSERT_COLUMNS)})
+                    SELECT {", ".join(INSERT_COLUMNS)}
+                    FROM unnest({UNNEST_ARGS}) WITH ORDINALITY
+                        AS t({", ".join(INSERT_COLUMNS)}, ord)
+                    ORDER BY ord
+                    RETURNING *
+                ),
+                {ROLLUP_CTES}
+                SELECT id FROM inserted;
+                """,
+                *columns
+            )
+        get_write_version().expire()
+        # Os ids vêm da sequence na ordem em que as linhas são inseridas
+        # (ORDER BY ord), então ordená-los restaura a ordem de entrada.
+        return sorted(row['id'] for row in rows)
+
+    async def list(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_temp: Optional[float] = None,
+        max_temp: Optional[float] = None,
+        comfort_zone: Optional[str] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        count: Optional[str] = None,
+        columnar: bool = False,
+    ) -> Tuple[Any, Optional[int], bool]:
+        """
+        Listar medições filtradas, mais recentes primeiro.
+
+        A paginação é por keyset sobre ``(timestamp, id)``: ``after`` é a
+        chave do último registro da página anterior, então qualquer página
+        custa o mesmo que a primeira (índice ``timestamp DESC, id DESC``).
+        ``offset`` continua aceito para clientes antigos.
+
+        Args:
+            after: ``(timestamp, id)`` a partir do qual continuar
+            count: ``None`` (sem total), ``exact`` (COUNT) ou ``estimated``
+                (estimativa do planejador, sem varrer a tabela)
+            columnar: Devolver ``{coluna: [valores...]}`` em vez de uma
+                lista de dicts
+
+        Returns:
+            (registros, total ou None, há próxima página)
+        """
+        where = _Where.measurements(start_date, end_date, min_temp, max_temp, comfort_zone)
+        filter_sql, filter_params = where.sql(), list(where.params)
+        if after is not None:
+            # A comparação de linha não poda partições; o limite simples em
+            # ``timestamp`` sim.
+            where.add("timestamp <= {}", after[0])
+            where.add("(timestamp, id) < ({}::timestamp, {}::bigint)", *after)
+        where_sql, params = where.sql(), where.params
+        n = len(params)
+
+        async with self._acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT * FROM thermal_measurements
+                {where_sql}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ${n + 1} OFFSET ${n + 2}
+                """,
+                *params, limit + 1, offset
+            )
+            total = None
+            if count == "exact":
+                total = await conn.fetchval(
+                    f"SELECT COUNT(*) FROM thermal_measurements {filter_sql}", *filter_params
+                )
+            elif count == "estimated":
+                plan = await conn.fetchval(
+                    f"EXPLAIN (FORMAT JSON) SELECT 1 FROM thermal_measurements {filter_sql}",
+                    *filter_params
+                )
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                total = int(plan[0]["Plan"]["Plan Rows"])
+
+        has_next = len(rows) > limit
+        if columnar:
+            return to_columns(rows[:limit], EXPORT_COLUMNS), total, has_next
+        return [dict(row) for row in rows[:limit]], total, has_next
+
+    async def export(
+        self,
+        fmt: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_temp: Optional[float] = None,
+        max_temp: Optional[float] = None,
+        comfort_zone: Optional[str] = None,
+        chunk_rows: int = 10_000,
+    ) -> AsyncIterator[bytes]:
+        """
+        Exportar as medições filtradas em ``fmt``, em ordem cronológica.
+
+        A conexão fica reservada enquanto o fluxo é consumido; ver
+        ``app/services/thermal_export.py``.
+        """
+        where = _Where.measurements(start_date, end_date, min_temp, max_temp, comfort_zone)
+        async with self._acquire() as conn:
+            async for chunk in stream_export(conn, fmt, where.sql(), where.params, chunk_rows):
+                yield chunk
+
+    async def get_by_id(self, thermal_id: int) -> Optional[Dict[str, Any]]:
+        async with self._acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM thermal_measurements WHERE id = $1", thermal_id)
+        return dict(row) if row else None
+
+    async def delete(self, thermal_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Remover uma medição, retornando o registro removido (ou None).
+
+        Mínimo e máximo não podem ser "desfeitos", então a hora e o dia da
+        medição são recalculados a partir das leituras brutas restantes.
+        """
+        async with self._acquire() as conn:
+            async with conn.transaction():
+                row = await conn.fetchrow(
+                    "DELETE FROM thermal_measurements WHERE id = $1 RETURNING *;", thermal_id
+                )
+                if row:
+                    await _rebuild_after_delete(conn, [row['timestamp']])
+        if row:
+            get_write_version().expire()
+        return dict(row) if row else None
+
+    async def delete_many(self, thermal_ids: List[int]) -> int:
+        """
+        Remover várias medições em uma transação e retornar quantas saíram.
+
+        Cada hora/dia afetado é recalculado uma única vez e a versão de
+        escrita sobe uma vez para o lote inteiro.
+        """
+        if not thermal_ids:
+            return 0
+        async with self._acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(
+                    "DELETE FROM thermal_measurements WHERE id = ANY($1::int[]) RETURNING timestamp;",
+                    thermal_ids
+                )
+                if rows:
+                    await _rebuild_after_delete(conn, [row['timestamp'] for row in rows])
+        if rows:
+            get_write_version().expire()
+        return len(rows)
+
+    async def write_version(self) -> int:
+        """
+        Versão de escrita de ``thermal_measurements`` (ver ``query_cache``).
+
+        Lida do banco no máximo a cada ``THERMAL_WRITE_VERSION_TTL`` segundos;
+        escritas deste processo a atualizam na hora.
+        """
+        async def load() -> int:
+            async with self._acquire() as conn:
+                return await conn.fetchval(WRITE_VERSION_SQL) or 0
+
+        return await get_write_version().current(load)
+
+    async def rollups(
+        self,
+        grain: str = "hour",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        comfort_zone: Optional[str] = None,
+        by_zone: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Agregados por intervalo (``hour`` ou ``day``) lidos dos rollups.
+
+        Cada linha tem ``bucket``, ``count`` e, por variável, ``min``, ``max``,
+        ``avg`` e ``std`` (desvio padrão populacional). Com ``by_zone`` as
+        zonas vêm separadas; senão são somadas.
+        """
+        table = ROLLUP_TABLES[grain]
+        start_date, end_date = to_naive_utc(start_date), to_naive_utc(end_date)
+        params: List[Any] = []
+        where_clauses = []
+        if start_date:
+            params.append(start_date)
+            where_clauses.append(f"bucket >= date_trunc('{grain}', ${len(params)}::timestamp)")
+        if end_date:
+            params.append(end_date)
+            where_clauses.append(f"bucket <= ${len(params)}")
+        if comfort_zone:
+            params.append(comfort_zone)
+            where_clauses.append(f"comfort_zone = ${len(params)}")
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+
+        group_columns = "bucket, comfort_zone" if by_zone else "bucket"
+        aggregates = ", ".join(
+            f"SUM({var}_sum) AS {var}_sum, SUM({var}_sumsq) AS {var}_sumsq, "
+            f"MIN({var}_min) AS {var}_min, MAX({var}_max) AS {var}_max"
+            for var in ROLLUP_VARIABLES
+        )
+        async with self._acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT {group_columns}, SUM(n)::bigint AS n, SUM(thermal_sensation_n)::bigint AS thermal_sensation_n,
+                       {aggregates}
+                FROM {table}
+                {where_sql}
+                GROUP BY {group_columns}
+                ORDER BY {group_columns}
+                """,
+                *params
+            )
+        return [_summarize_rollup(row, by_zone) for row in rows]
+
+    async def aggregate(
+        self,
+        bucket: timedelta,
+        start: datetime,
+        end: datetime,
+        metrics: List[str],
+        percentiles: Optional[List[float]] = None,
+        comfort_zone: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Agregar ``metrics`` em intervalos de ``bucket`` a partir de ``start``.
+
+        Intervalos múltiplos de uma hora sem percentis são lidos dos rollups
+        (bordas arredondadas para a hora/dia inteiro); os demais, e os
+        percentis, das leituras brutas com ``date_bin`` — só as partições
+        do intervalo são lidas.
+
+        Trechos anteriores ao horizonte de retenção (ver
+        ``app/services/retention.py``) são lidos do nível que ainda existe:
+        rollup horário e, antes dele, diário. Nesses trechos a resolução é a
+        do rollup e os percentis vêm como ``None``; ``tier`` indica a origem
+        de cada linha (``raw``, ``hour`` ou ``day``).
+
+        Returns:
+            Linhas com ``bucket``, ``tier``, ``count`` e, por métrica,
+            ``avg``, ``min``, ``max``, ``std`` e ``p<q>`` para cada
+            percentil pedido
+        """
+        unknown = set(metrics) - set(ROLLUP_VARIABLES)
+        if unknown:
+            raise ValueError(f"Métricas desconhecidas: {', '.join(sorted(unknown))}")
+        percentiles = percentiles or []
+        start, end = to_naive_utc(start), to_naive_utc(end)
+
+        # Grão do rollup que atende o pedido sem perda (None: leituras brutas)
+        wanted = None
+        if not percentiles and bucket % timedelta(hours=1) == timedelta(0):
+            wanted = "day" if bucket % timedelta(days=1) == timedelta(0) else "hour"
+        origin = _truncate(start, wanted) if wanted else start
+
+        merged: Dict[datetime, Dict[str, Any]] = {}
+        async with self._acquire() as conn:
+            horizon = await conn.fetchrow(RETENTION_HORIZON_SQL)
+            raw_from = horizon['raw_from'] if horizon else None
+            hourly_from = horizon['hourly_from'] if horizon else None
+
+            for seg_start, seg_end in _segments(start, end, raw_from, hourly_from):
+                raw_ok = raw_from is None or seg_start >= raw_from
+                hourly_ok = hourly_from is None or seg_start >= hourly_from
+                if wanted == "day":
+                    source = "day"
+                elif wanted == "hour" and hourly_ok:
+                    source = "hour"
+                elif raw_ok:
+                    source = "raw"
+                else:
+                    source = "hour" if hourly_ok else "day"
+
+                params: List[Any] = [bucket, origin, seg_start, seg_end]
+                zone_sql = ""
+                if comfort_zone:
+                    params.append(comfort_zone)
+                    zone_sql = f"AND comfort_zone = ${len(params)}"
+                sql = _aggregate_sql(source, metrics, percentiles if source == "raw" else [], zone_sql)
+                for row in await conn.fetch(sql, *params):
+                    _merge_bucket(merged, dict(row), source, metrics)
+
+        result = []
+        for key in sorted(merged):
+            sums = merged[key]
+            item = _summarize_rollup(sums, False, metrics)
+            item["tier"] = sums["tier"]
+            combined = "+" in sums["tier"]
+            for var in metrics:
+                for q in percentiles:
+                    item[var][f"p{q:g}"] = None if combined else sums.get(f"{var}_p{q:g}")
+            result.append(item)
+        return result
+
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas gerais de temperatura, sensação térmica e zonas de conforto.
+
+        Lidas do rollup diário: o custo depende do número de dias e zonas,
+        não do número de leituras.
+        """
+        aggregates = ", ".join(
+            f"SUM({var}_sum) AS {var}_sum, SUM({var}_sumsq) AS {var}_sumsq, "
+            f"MIN({var}_min) AS {var}_min, MAX({var}_max) AS {var}_max"
+            for var in ("temperature", "thermal_sensation")
+        )
+        async with self._acquire() as conn:
+            zone_rows = await conn.fetch(f"""
+                SELECT comfort_zone, SUM(n)::bigint AS n, SUM(thermal_sensation_n)::bigint AS thermal_sensation_n,
+                       {aggregates}
+                FROM {ROLLUP_TABLES['day']}
+                GROUP BY comfort_zone;
+            """)
+
+        total = sum(row['n'] for row in zone_rows)
+        if total == 0:
+            return {"total_records": 0}
+
+        def summarize(var: str, count: int) -> Dict[str, Any]:
+            values = [row for row in zone_rows if row[f'{var}_min'] is not None]
+            if not values or not count:
+                return {"min": None, "max": None, "avg": None, "std": None}
+            total_sum = sum(row[f'{var}_sum'] for row in values)
+            total_sumsq = sum(row[f'{var}_sumsq'] for row in values)
+            mean = total_sum / count
+            return {
+                "min": min(row[f'{var}_min'] for row in values),
+                "max": max(row[f'{var}_max'] for row in values),
+                "avg": round(mean, 2),
+                "std": round(max(total_sumsq / count - mean * mean, 0.0) ** 0.5, 2),
+            }
+
+        return {
+            "total_records": total,
+            "temperature": summarize("temperature", total),
+            "thermal_sensation": summarize(
+                "thermal_sensation", sum(row['thermal_sensation_n'] for row in zone_rows)
+            ),
+            "comfort_zones": {(row['comfort_zone'] or None): row['n'] for row in zone_rows},
+        }
+
+
+async def _rebuild_after_delete(conn, timestamps: List[datetime]):
+    """Recalcular os buckets que continham ``timestamps`` e subir a versão de escrita."""
+    for grain in ROLLUP_TABLES:
+        for bucket in sorted({_truncate(moment, grain) for moment in timestamps}):
+            for statement in rollup_rebuild_bucket_sql(grain):
+                await conn.execute(statement, bucket)
+    await conn.execute(BUMP_WRITE_VERSION_SQL)
+
+
+def _truncate(moment: datetime, grain: str) -> datetime:
+    if grain == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _segments(start: datetime, end: datetime, *horizons: Optional[datetime]) -> List[Tuple[datetime, datetime]]:
+    """Dividir ``[start, end)`` nos horizontes de retenção que caem dentro dele."""
+    cuts = sorted({h for h in horizons if h is not None and start < h < end})
+    bounds = [start, *cuts, end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _aggregate_sql(source: str, metrics: List[str], percentiles: List[float], zone_sql: str) -> str:
+    """
+    Somas por intervalo (``$1`` tamanho, ``$2`` origem, ``[$3, $4)`` trecho)
+    lidas de ``source``: ``raw`` (leituras brutas), ``hour`` ou ``day``.
+    As colunas seguem ``ROLLUP_COLUMNS``, então trechos de origens
+    diferentes podem ser somados.
+    """
+    if source == "raw":
+        columns = ["COUNT(*) AS n", "COUNT(thermal_sensation) AS thermal_sensation_n"]
+        for var in metrics:
+            columns.append(
+                f"COALESCE(SUM({var}), 0) AS {var}_sum, COALESCE(SUM({var} * {var}), 0) AS {var}_sumsq, "
+                f"MIN({var}) AS {var}_min, MAX({var}) AS {var}_max"
+            )
+            for q in percentiles:
+                columns.append(
+                    f'percentile_cont({q / 100!r}) WITHIN GROUP (ORDER BY {var}) AS "{var}_p{q:g}"'
+                )
+        return f"""
+            SELECT date_bin($1::interval, timestamp, $2::timestamp) AS bucket,
+                   {", ".join(columns)}
+            FROM thermal_measurements
+            WHERE timestamp >= $3 AND timestamp < $4 {zone_sql}
+            GROUP BY 1
+            ORDER BY 1
+        """
+
+    aggregates = ", ".join(
+        f"SUM({var}_sum) AS {var}_sum, SUM({var}_sumsq) AS {var}_sumsq, "
+        f"MIN({var}_min) AS {var}_min, MAX({var}_max) AS {var}_max"
+        for var in metrics
+    )
+    return f"""
+        SELECT date_bin($1::interval, bucket, $2::timestamp) AS bucket,
+               SUM(n)::bigint AS n, SUM(thermal_sensation_n)::bigint AS thermal_sensation_n,
+               {aggregates}
+        FROM {ROLLUP_TABLES[source]}
+        WHERE bucket >= date_trunc('{source}', $3::timestamp) AND bucket < $4 {zone_sql}
+        GROUP BY 1
+        ORDER BY 1
+    """
+
+
+def _merge_bucket(merged: Dict[datetime, Dict[str, Any]], row: Dict[str, Any], source: str, metrics: List[str]):
+    """Somar ``row`` ao intervalo de mesmo ``bucket`` vindo de outro trecho."""
+    current = merged.get(row['bucket'])
+    if current is None:
+        row["tier"] = source
+        merged[row['bucket']] = row
+        return
+    # Intervalo cortado por um horizonte de retenção: somas se somam,
+    # percentis não (ficam None para tiers combinados)
+    current["n"] += row["n"]
+    current["thermal_sensation_n"] += row["thermal_sensation_n"]
+    for var in metrics:
+        current[f"{var}_sum"] += row[f"{var}_sum"]
+        current[f"{var}_sumsq"] += row[f"{var}_sumsq"]
+        for agg, pick in (("min", min), ("max", max)):
+            values = [v for v in (current[f"{var}_{agg}"], row[f"{var}_{agg}"]) if v is not None]
+            current[f"{var}_{agg}"] = pick(values) if values else None
+    current["tier"] = "+".join(sorted({*current["tier"].split("+"), source}))
+
+
+def _summarize_rollup(row, by_zone: bool, variables=ROLLUP_VARIABLES) -> Dict[str, Any]:
+    """Converter somas de um intervalo em min/max/média/desvio padrão."""
+    count = row['n']
+    result: Dict[str, Any] = {"bucket": row['bucket'], "count": count}
+    if by_zone:
+        result["comfort_zone"] = row['comfort_zone'] or None
+    for var in variables:
+        n = row['thermal_sensation_n'] if var == "thermal_sensation" else count
+        if not n:
+            result[var] = {"min": None, "max": None, "avg": None, "std": None}
+            continue
+        mean = row[f'{var}_sum'] / n
+        result[var] = {
+            "min": row[f'{var}_min'],
+            "max": row[f'{var}_max'],
+            "avg": mean,
+            "std": max(row[f'{var}_sumsq'] / n - mean * mean, 0.0) ** 0.5,
+        }
+    return result
+
+
+_async_pool: Optional[asyncpg.Pool] = None
+_async_pool_lock = asyncio.Lock()
+_acquire_stats = {
+    "acquired": 0, "timeouts": 0, "wait_time_total": 0.0, "wait_time_max": 0.0,
+    "health_checks": 0, "health_check_failures": 0, "recycled": 0,
+}
+# Último uso de cada conexão do pool (pid do backend -> monotonic)
+_last_released: Dict[int, float] = {}
+HEALTH_CHECK_IDLE = float(os.getenv("DB_POOL_HEALTH_CHECK_IDLE", "30"))
+
+
+async def _healthy(conn) -> bool:
+    """Testar a conexão se ficou ociosa por muito tempo; derrubá-la se não responder."""
+    last = _last_released.get(conn.get_server_pid())
+    if last is None or time.monotonic() - last < HEALTH_CHECK_IDLE:
+        return True
+    _acquire_stats["health_checks"] += 1
+    try:
+        await conn.fetchval("SELECT 1", timeout=float(os.getenv("DB_CONNECT_TIMEOUT", "5")))
+        return True
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError):
+        _acquire_stats["health_check_failures"] += 1
+        _last_released.pop(conn.get_server_pid(), None)
+        # Fechada, a conexão é recriada no próximo acquire
+        conn.terminate()
+        return False
+
+
+async def init_async_pool() -> asyncpg.Pool:
+    """
+    Criar (uma única vez) o pool asyncpg do processo.
+
+    Conexões ociosas há mais de ``DB_POOL_MAX_IDLE_TIME`` segundos são
+    fechadas. A idade máxima (``DB_POOL_MAX_LIFETIME``) fica a cargo de
+    ``recycle_pool_connections``, já que o asyncpg não a implementa.
+    """
+    global _async_pool
+    async with _async_pool_lock:
+        if _async_pool is None:
+            _async_pool = await asyncpg.create_pool(
+                host=os.getenv("POSTGRES_HOST", "localhost"),
+                port=int(os.getenv("POSTGRES_PORT", "5433")),
+                database=os.getenv("POSTGRES_DB", "avd_wind_data"),
+                user=os.getenv("POSTGRES_USER", "user"),
+                password=os.getenv("POSTGRES_PASSWORD", "password"),
+                min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+                max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                max_inactive_connection_lifetime=float(os.getenv("DB_POOL_MAX_IDLE_TIME", "1800")),
+                timeout=float(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+            )
+    return _async_pool
+
+
+async def recycle_pool_connections(pool: asyncpg.Pool, max_lifetime: float):
+    """
+    Renovar as conexões do pool a cada ``max_lifetime`` segundos
+    (``asyncio.create_task`` no startup).
+
+    ``expire_connections`` marca as conexões abertas; as livres são
+    trocadas no próximo acquire e as em uso ao serem devolvidas, então
+    nenhuma conexão vive mais que cerca de ``2 * max_lifetime``.
+    """
+    while True:
+        await asyncio.sleep(max_lifetime)
+        try:
+            await pool.expire_connections()
+            _last_released.clear()
+            _acquire_stats["recycled"] += 1
+        except Exception as e:
+            logger.error(f"Falha ao renovar as conexões do pool: {e}")
+
+
+async def close_async_pool():
+    """Encerrar o pool asyncpg do processo."""
+    global _async_pool
+    async with _async_pool_lock:
+        if _async_pool is not None:
+            await _async_pool.close()
+            _async_pool = None
+
+
+def get_async_pool_stats() -> Dict[str, Any]:
+    """Estatísticas do pool asyncpg, ou ``{}`` se ele ainda não foi criado."""
+    if _async_pool is None:
+        return {}
+    size = _async_pool.get_size()
+    idle = _async_pool.get_idle_size()
+    acquired = _acquire_stats["acquired"]
+    return {
+        "min_size": _async_pool.get_min_size(),
+        "max_size": _async_pool.get_max_size(),
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "acquired": acquired,
+        "timeouts": _acquire_stats["timeouts"],
+        "wait_time_avg_ms": round(_acquire_stats["wait_time_total"] / acquired * 1000, 3) if acquired else 0.0,
+        "wait_time_max_ms": round(_acquire_stats["wait_time_max"] * 1000, 3),
+        "health_checks": _acquire_stats["health_checks"],
+        "health_check_failures": _acquire_stats["health_check_failures"],
+        "recycled": _acquire_stats["recycled"],
+    }
+
+
+async def get_thermal_repository() -> ThermalRepository:
+    """Dependency FastAPI que fornece o repositório assíncrono."""
+    try:
+        pool = _async_pool or await init_async_pool()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Erro ao conectar com banco: {e}")
+    return ThermalRepository(pool, acquire_timeout=float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "5")))
@@ -0,0 +1,465 @@
+"""
+Thermal Schema
+==============
+
+DDL da tabela ``thermal_measurements``, compartilhado por
+``scripts/init_tables.py``, pela migração e pela manutenção em background.
+
+A tabela é particionada por mês de ``timestamp`` (``thermal_measurements_yYYYYmMM``).
+Leituras fora das partições existentes vão para
+``thermal_measurements_default``; a função ``thermal_ensure_partition``
+cria a partição de um mês movendo para ela as linhas que estiverem na
+partição default, então pode ser chamada a qualquer momento.
+
+Índices (criados no pai, propagados a todas as partições):
+
+- BRIN em ``timestamp``: filtros por intervalo dentro de uma partição;
+- ``(timestamp DESC, id DESC)``: ordenação e paginação por keyset;
+- ``(comfort_zone, timestamp DESC, id DESC)``: listagem por zona;
+- ``(temperature)``: filtros ``min_temp``/``max_temp``;
+- ``(station, timestamp)`` único: cargas históricas por estação
+  (``scripts/load_inmet_postgres.py``) ignoram leituras já carregadas com
+  ``ON CONFLICT DO NOTHING``. Leituras da API têm ``station`` nulo e não
+  entram na restrição.
+
+Rollups (``thermal_rollup_hourly``/``thermal_rollup_daily``) guardam, por
+intervalo e zona de conforto, a contagem e, para cada variável medida,
+soma, soma dos quadrados, mínimo e máximo. São atualizados no mesmo
+statement da ingestão (``rollup_upsert_sql``), então média, desvio padrão
+e extremos de qualquer período saem sem ler as leituras brutas.
+
+``thermal_write_version`` é incrementada por toda escrita em
+``thermal_measurements`` ou nos rollups; o cache de consultas da API usa
+a soma das suas linhas como versão dos resultados guardados.
+
+Contenção: o upsert dos rollups trava a linha de cada hora/dia e zona
+tocada até o commit, então escritas concorrentes no mesmo intervalo
+(caso normal da ingestão ao vivo) serializam nela; é o preço de ter
+agregados exatos sem reler as leituras brutas. O write-behind reduz isso
+a uma escrita por flush. Para a versão não virar um segundo ponto de
+serialização entre escritas de intervalos diferentes, ela é dividida em
+``WRITE_VERSION_SLOTS`` linhas e cada conexão incrementa a sua
+(``pg_backend_pid()``): a soma continua crescendo a cada commit e só
+muda quando a escrita fica visível.
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_STATEMENTS = (
+    "CREATE SEQUENCE IF NOT EXISTS thermal_measurements_id_seq",
+    """
+    CREATE TABLE IF NOT EXISTS thermal_measurements (
+        id INTEGER NOT NULL DEFAULT nextval('thermal_measurements_id_seq'),
+        timestamp TIMESTAMP NOT NULL,
+        temperature FLOAT NOT NULL,
+        humidity FLOAT NOT NULL,
+        wind_velocity FLOAT NOT NULL,
+        pressure FLOAT NOT NULL,
+        solar_radiation FLOAT NOT NULL,
+        thermal_sensation FLOAT,
+        comfort_zone VARCHAR(50),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        station VARCHAR(16),
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp)
+    """,
+    "ALTER SEQUENCE thermal_measurements_id_seq OWNED BY thermal_measurements.id",
+    # Bancos criados antes da coluna de estação
+    "ALTER TABLE thermal_measurements ADD COLUMN IF NOT EXISTS station VARCHAR(16)",
+    """
+    CREATE TABLE IF NOT EXISTS thermal_measurements_default
+    PARTITION OF thermal_measurements DEFAULT
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_thermal_measurements_timestamp_brin
+    ON thermal_measurements USING brin (timestamp)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_thermal_measurements_timestamp_id
+    ON thermal_measurements (timestamp DESC, id DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_thermal_measurements_zone_timestamp_id
+    ON thermal_measurements (comfort_zone, timestamp DESC, id DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_thermal_measurements_temperature
+    ON thermal_measurements (temperature)
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_thermal_measurements_station_timestamp
+    ON thermal_measurements (station, timestamp)
+    """,
+    """
+    CREATE OR REPLACE FUNCTION thermal_ensure_partition(month_start date) RETURNS text AS $$
+    DECLARE
+        lower_bound date := date_trunc('month', month_start)::date;
+        upper_bound date := (date_trunc('month', month_start) + interval '1 month')::date;
+        part_name text := format('thermal_measurements_y%sm%s',
+                                 to_char(lower_bound, 'YYYY'), to_char(lower_bound, 'MM'));
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext(part_name));
+        IF to_regclass(part_name) IS NOT NULL THEN
+            RETURN part_name;
+        END IF;
+
+        -- Criada fora da hierarquia e anexada depois: as linhas do mês que
+        -- caíram na partição default são movidas antes do ATTACH.
+        EXECUTE format('CREATE TABLE %I (LIKE thermal_measurements INCLUDING DEFAULTS)', part_name);
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM thermal_measurements_default '
+            'WHERE timestamp >= %L AND timestamp < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            lower_bound, upper_bound, part_name
+        );
+        EXECUTE format(
+            'ALTER TABLE thermal_measurements ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            part_name, lower_bound, upper_bound
+        );
+        RETURN part_name;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+)
+
+ROLLUP_VARIABLES = (
+    "temperature", "humidity", "wind_velocity", "pressure",
+    "solar_radiation", "thermal_sensation",
+)
+ROLLUP_TABLES = {"hour": "thermal_rollup_hourly", "day": "thermal_rollup_daily"}
+ROLLUP_COLUMNS = ["bucket", "comfort_zone", "n", "thermal_sensation_n"] + [
+    f"{var}_{agg}" for var in ROLLUP_VARIABLES for agg in ("sum", "sumsq", "min", "max")
+]
+
+
+def _rollup_table_ddl(table: str) -> str:
+    variables = ",\n".join(
+        f"        {var}_sum FLOAT NOT NULL DEFAULT 0,\n"
+        f"        {var}_sumsq FLOAT NOT NULL DEFAULT 0,\n"
+        f"        {var}_min FLOAT,\n"
+        f"        {var}_max FLOAT"
+        for var in ROLLUP_VARIABLES
+    )
+    return f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        bucket TIMESTAMP NOT NULL,
+        comfort_zone VARCHAR(50) NOT NULL,
+        n BIGINT NOT NULL,
+        thermal_sensation_n BIGINT NOT NULL DEFAULT 0,
+{variables},
+        PRIMARY KEY (bucket, comfort_zone)
+    )
+    """
+
+
+def rollup_select_sql(grain: str, source: str, where: str = "") -> str:
+    """Agregados de ``source`` por ``date_trunc(grain, timestamp)`` e zona."""
+    aggregates = ",\n".join(
+        f"COALESCE(SUM({var}), 0), COALESCE(SUM({var} * {var}), 0), MIN({var}), MAX({var})"
+        for var in ROLLUP_VARIABLES
+    )
+    return f"""
+        SELECT date_trunc('{grain}', timestamp), COALESCE(comfort_zone, ''),
+               COUNT(*), COUNT(thermal_sensation),
+               {aggregates}
+        FROM {source}
+        {where}
+        GROUP BY 1, 2
+    """
+
+
+def rollup_upsert_sql(grain: str, source: str) -> str:
+    """Somar os agregados das linhas de ``source`` ao rollup de ``grain``."""
+    table = ROLLUP_TABLES[grain]
+    updates = ["n = {t}.n + EXCLUDED.n", "thermal_sensation_n = {t}.thermal_sensation_n + EXCLUDED.thermal_sensation_n"]
+    for var in ROLLUP_VARIABLES:
+        updates += [
+            f"{var}_sum = {{t}}.{var}_sum + EXCLUDED.{var}_sum",
+            f"{var}_sumsq = {{t}}.{var}_sumsq + EXCLUDED.{var}_sumsq",
+            f"{var}_min = LEAST({{t}}.{var}_min, EXCLUDED.{var}_min)",
+            f"{var}_max = GREATEST({{t}}.{var}_max, EXCLUDED.{var}_max)",
+        ]
+    return f"""
+        INSERT INTO {table} ({", ".join(ROLLUP_COLUMNS)})
+        {rollup_select_sql(grain, source)}
+        ON CONFLICT (bucket, comfort_zone) DO UPDATE SET
+        {", ".join(update.format(t=table) for update in updates)}
+    """
+
+
+def rollup_rebuild_bucket_sql(grain: str) -> List[str]:
+    """Recalcular a partir das leituras brutas o intervalo de ``grain`` que contém ``$1``."""
+    table = ROLLUP_TABLES[grain]
+    bucket = f"date_trunc('{grain}', $1::timestamp)"
+    where = f"WHERE timestamp >= {bucket} AND timestamp < {bucket} + interval '1 {grain}'"
+    return [
+        f"DELETE FROM {table} WHERE bucket = {bucket}",
+        f"INSERT INTO {table} ({', '.join(ROLLUP_COLUMNS)}) "
+        f"{rollup_select_sql(grain, 'thermal_measurements', where)}",
+    ]
+
+
+SCHEMA_STATEMENTS += tuple(_rollup_table_ddl(table) for table in ROLLUP_TABLES.values())
+
+WRITE_VERSION_SLOTS = 16
+
+SCHEMA_STATEMENTS += (
+    """
+    CREATE TABLE IF NOT EXISTS thermal_write_version (
+        id SMALLINT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    # Bancos criados com a versão em uma única linha (``CHECK (id = 1)``)
+    "ALTER TABLE thermal_write_version DROP CONSTRAINT IF EXISTS thermal_write_version_id_check",
+    f"""
+    INSERT INTO thermal_write_version (id, version)
+    SELECT slot, 0 FROM generate_series(1, {WRITE_VERSION_SLOTS}) AS slot
+    ON CONFLICT (id) DO NOTHING
+    """,
+)
+
+BUMP_WRITE_VERSION_SQL = (
+    "UPDATE thermal_write_version SET version = version + 1 "
+    f"WHERE id = 1 + pg_backend_pid() % {WRITE_VERSION_SLOTS}"
+)
+WRITE_VERSION_SQL = "SELECT COALESCE(SUM(version), 0) FROM thermal_write_version"
+
+# Rollups e versão de escrita atualizados no mesmo statement de um INSERT
+# (CTEs sobre as linhas da CTE ``inserted``, que devem trazer RETURNING *)
+INSERTED_ROLLUP_CTES = ",\n".join(
+    [f"rollup_{grain} AS ({rollup_upsert_sql(grain, 'inserted')})" for grain in ROLLUP_TABLES]
+    + [f"bump AS ({BUMP_WRITE_VERSION_SQL})"]
+)
+
+# Refazer os rollups a partir das leituras brutas. O lock bloqueia as
+# atualizações concorrentes até o commit; elas então somam por cima.
+# Períodos cujas leituras brutas já saíram pela retenção são preservados.
+_RAW_FROM = (
+    "COALESCE((SELECT raw_from FROM thermal_retention_horizon WHERE id = 1), '-infinity'::timestamp)"
+)
+REBUILD_ROLLUPS_STATEMENTS = (
+    f"LOCK TABLE {', '.join(ROLLUP_TABLES.values())} IN EXCLUSIVE MODE",
+    *(f"DELETE FROM {table} WHERE bucket >= {_RAW_FROM}" for table in ROLLUP_TABLES.values()),
+    *(
+        f"INSERT INTO {table} ({', '.join(ROLLUP_COLUMNS)}) "
+        f"{rollup_select_sql(grain, 'thermal_measurements', f'WHERE timestamp >= {_RAW_FROM}')}"
+        for grain, table in ROLLUP_TABLES.items()
+    ),
+    BUMP_WRITE_VERSION_SQL,
+)
+
+
+def rebuild_rollups(cur):
+    """Recalcular todos os rollups (cursor psycopg2, dentro de uma transação)."""
+    for statement in REBUILD_ROLLUPS_STATEMENTS:
+        cur.execute(statement)
+
+
+# --- Retenção ----------------------------------------------------------------
+#
+# ``thermal_retention_horizon`` guarda a partir de quando cada nível ainda
+# existe (``NULL``: desde sempre); as consultas agregadas o usam para ler
+# trechos antigos dos rollups. ``thermal_apply_retention`` descarta
+# partições mensais inteiras anteriores a ``raw_before`` (conferindo antes
+# que o rollup diário cobre cada uma, e recalculando se não cobrir) e
+# rollups horários anteriores a ``hourly_before``. O horizonte bruto avança
+# só até o fim da partição mais recente de fato descartada. Com ``dry_run``
+# apenas relata o que faria.
+
+_RETENTION_REBUILD = "\n".join(
+    f"""
+                DELETE FROM {table} WHERE bucket >= lower_bound AND bucket < upper_bound;
+                INSERT INTO {table} ({", ".join(ROLLUP_COLUMNS)})
+                {rollup_select_sql(grain, "thermal_measurements",
+                                   "WHERE timestamp >= lower_bound AND timestamp < upper_bound")};"""
+    for grain, table in ROLLUP_TABLES.items()
+)
+
+SCHEMA_STATEMENTS += (
+    """
+    CREATE TABLE IF NOT EXISTS thermal_retention_horizon (
+        id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+        raw_from TIMESTAMP,
+        hourly_from TIMESTAMP
+    )
+    """,
+    "INSERT INTO thermal_retention_horizon (id) VALUES (1) ON CONFLICT (id) DO NOTHING",
+    r"""
+    CREATE OR REPLACE FUNCTION thermal_apply_retention(
+        raw_before date, hourly_before date, dry_run boolean DEFAULT true
+    ) RETURNS TABLE (action text, target text, affected bigint) AS $$
+    DECLARE
+        part record;
+        old_month date;
+        lower_bound timestamp;
+        upper_bound timestamp;
+        raw_count bigint;
+        rolled_count bigint;
+        dropped_until timestamp;
+        changed boolean := false;
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('thermal_apply_retention'));
+
+        IF raw_before IS NOT NULL THEN
+            raw_before := date_trunc('month', raw_before)::date;
+
+            -- Leituras antigas na partição default ganham partição própria
+            -- para serem descartadas como as demais
+            FOR old_month, raw_count IN
+                SELECT date_trunc('month', timestamp)::date, COUNT(*)
+                FROM thermal_measurements_default
+                WHERE timestamp < raw_before
+                GROUP BY 1 ORDER BY 1
+            LOOP
+                IF dry_run THEN
+                    action := 'move_default_rows';
+                    target := to_char(old_month, 'YYYY-MM');
+                    affected := raw_count;
+                    RETURN NEXT;
+                ELSE
+                    PERFORM thermal_ensure_partition(old_month);
+                END IF;
+            END LOOP;
+
+            FOR part IN
+                SELECT c.relname::text AS name,
+                       make_date(substring(c.relname from 'y(\d{4})m')::int,
+                                 substring(c.relname from 'm(\d{2})$')::int, 1) AS month_start
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'thermal_measurements'::regclass
+                  AND c.relname ~ '^thermal_measurements_y\d{4}m\d{2}$'
+                ORDER BY 2
+            LOOP
+                lower_bound := part.month_start::timestamp;
+                upper_bound := lower_bound + interval '1 month';
+                CONTINUE WHEN upper_bound > raw_before;
+
+                EXECUTE format('SELECT COUNT(*) FROM %I', part.name) INTO raw_count;
+                SELECT COALESCE(SUM(n), 0) INTO rolled_count
+                FROM thermal_rollup_daily
+                WHERE bucket >= lower_bound AND bucket < upper_bound;
+
+                IF raw_count <> rolled_count THEN
+                    action := 'rebuild_rollups';
+                    target := part.name;
+                    affected := raw_count - rolled_count;
+                    RETURN NEXT;
+                    IF NOT dry_run THEN
+__REBUILD__
+                    END IF;
+                END IF;
+
+                action := 'drop_partition';
+                target := part.name;
+                affected := raw_count;
+                RETURN NEXT;
+                IF NOT dry_run THEN
+                    EXECUTE format('DROP TABLE %I', part.name);
+                    dropped_until := GREATEST(dropped_until, upper_bound);
+                    changed := true;
+                END IF;
+            END LOOP;
+        END IF;
+
+        IF hourly_before IS NOT NULL THEN
+            SELECT COUNT(*) INTO rolled_count FROM thermal_rollup_hourly WHERE bucket < hourly_before;
+            IF rolled_count > 0 THEN
+                action := 'delete_hourly_rollups';
+                target := 'thermal_rollup_hourly';
+                affected := rolled_count;
+                RETURN NEXT;
+                IF NOT dry_run THEN
+                    DELETE FROM thermal_rollup_hourly WHERE bucket < hourly_before;
+                    changed := true;
+                END IF;
+            END IF;
+        END IF;
+
+        IF NOT dry_run THEN
+            UPDATE thermal_retention_horizon
+            SET raw_from = GREATEST(raw_from, dropped_until),
+                hourly_from = GREATEST(hourly_from, hourly_before::timestamp)
+            WHERE id = 1;
+            IF changed THEN
+                __BUMP__;
+            END IF;
+        END IF;
+        RETURN;
+    END;
+    $$ LANGUAGE plpgsql
+    """.replace("__REBUILD__", _RETENTION_REBUILD).replace("__BUMP__", BUMP_WRITE_VERSION_SQL),
+)
+
+RETENTION_HORIZON_SQL = "SELECT raw_from, hourly_from FROM thermal_retention_horizon WHERE id = 1"
+APPLY_RETENTION_SQL = "SELECT action, target, affected FROM thermal_apply_retention(%(raw)s, %(hourly)s, %(dry_run)s)"
+APPLY_RETENTION_ASYNC_SQL = "SELECT action, target, affected FROM thermal_apply_retention($1, $2, $3)"
+
+
+ENSURE_PARTITIONS_SQL = """
+    SELECT thermal_ensure_partition(month::date)
+    FROM generate_series(
+        date_trunc('month', %(start)s::date::timestamp),
+        date_trunc('month', %(end)s::date::timestamp),
+        interval '1 month'
+    ) AS month
+"""
+
+ENSURE_PARTITIONS_ASYNC_SQL = ENSURE_PARTITIONS_SQL.replace("%(start)s", "$1").replace("%(end)s", "$2")
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_window(months_ahead: int = 3) -> Tuple[date, date]:
+    """Mês corrente e os ``months_ahead`` seguintes."""
+    current = date.today().replace(day=1)
+    return current, add_months(current, months_ahead)
+
+
+def is_partitioned(cur) -> bool:
+    """Se ``thermal_measurements`` já é uma tabela particionada (cursor psycopg2)."""
+    cur.execute("""
+        SELECT c.relkind FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relname = 'thermal_measurements' AND n.nspname = current_schema()
+    """)
+    row = cur.fetchone()
+    if row is None:
+        return False
+    relkind = row[0] if not isinstance(row, dict) else row["relkind"]
+    return relkind == "p"
+
+
+def create_schema(cur, months_ahead: int = 3):
+    """Criar tabela, índices, função e partições da janela corrente (cursor psycopg2)."""
+    for statement in SCHEMA_STATEMENTS:
+        cur.execute(statement)
+    start, end = partition_window(months_ahead)
+    cur.execute(ENSURE_PARTITIONS_SQL, {"start": start, "end": end})
+
+
+async def ensure_partitions(pool, months_ahead: int = 3) -> List[str]:
+    """Garantir as partições do mês corrente e dos próximos (pool asyncpg)."""
+    start, end = partition_window(months_ahead)
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(ENSURE_PARTITIONS_ASYNC_SQL, start, end)
+    return [row[0] for row in rows]
+
+
+async def maintain_partitions(pool, interval: float = 86400.0, months_ahead: int = 3):
+    """Criar partições futuras periodicamente (``asyncio.create_task`` no startup)."""
+    while True:
+        try:
+            await ensure_partitions(pool, months_ahead)
+        except Exception as e:
+            logger.error(f"Falha ao criar partições de thermal_measurements: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Retenção de thermal_measurements
+================================
+
+Aplica a política de retenção por níveis (``app/services/retention.py``):
+partições mensais de leituras brutas mais antigas que o corte são
+descartadas inteiras (o rollup diário de cada uma é conferido e, se
+preciso, recalculado antes) e rollups horários antigos são removidos.
+O rollup diário é mantido para sempre.
+
+Com ``--dry-run`` nada é alterado: o script só relata o que seria feito.
+
+Uso:
+    python scripts/apply_retention.py --dry-run --raw-days 365 --hourly-days 730
+    python scripts/apply_retention.py              # THERMAL_*_RETENTION_DAYS
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import create_connection
+from app.services.retention import RetentionPolicy, apply_retention, create_retention_policy
+
+ACTION_LABELS = {
+    "move_default_rows": "🗂️  mover da partição default",
+    "rebuild_rollups": "🔁 recalcular rollups",
+    "drop_partition": "🗑️  descartar partição",
+    "delete_hourly_rollups": "🧹 remover rollups horários",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raw-days", type=int, help="Dias de leituras brutas (padrão: THERMAL_RAW_RETENTION_DAYS)")
+    parser.add_argument("--hourly-days", type=int, help="Dias de rollup horário (padrão: THERMAL_HOURLY_RETENTION_DAYS)")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas mostrar o que seria descartado")
+    args = parser.parse_args()
+
+    try:
+        policy = create_retention_policy()
+        if args.raw_days is not None or args.hourly_days is not None:
+            policy = RetentionPolicy(
+                raw_days=policy.raw_days if args.raw_days is None else args.raw_days,
+                hourly_days=policy.hourly_days if args.hourly_days is None else args.hourly_days,
+            )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if not policy.enabled:
+        print("ℹ️  Nenhum nível de retenção configurado (tudo é mantido)")
+        return
+
+    raw_before, hourly_before = policy.cutoffs()
+    mode = "Simulação" if args.dry_run else "Aplicando"
+    print(f"📅 {mode} — {policy.describe()}")
+    print(f"   Corte das leituras brutas: {raw_before or '-'} | rollups horários: {hourly_before or '-'}\n")
+
+    conn = create_connection()
+    try:
+        start = time.perf_counter()
+        cur = conn.cursor()
+        actions = apply_retention(cur, policy, dry_run=args.dry_run)
+        if args.dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Erro ao aplicar a retenção, nada foi alterado: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    for action, target, affected in actions:
+        print(f"   {ACTION_LABELS.get(action, action)}: {target} ({affected} linhas)")
+    if not actions:
+        print("   Nada a fazer")
+    dropped = sum(affected for action, _, affected in actions if action == "drop_partition")
+    print(f"\n✅ {len(actions)} ações, {dropped} leituras brutas "
+          f"{'seriam descartadas' if args.dry_run else 'descartadas'} em {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Inserção em Lote
+============================
+
+Mede linhas/segundo de ``ThermalRepository.insert_many`` (um único
+INSERT ... SELECT FROM unnest) para vários tamanhos de lote, comparando
+com o caminho antigo de um ``INSERT ... RETURNING id`` por linha.
+
+As linhas inseridas são removidas ao final de cada rodada com
+``ThermalRepository.delete_many``, que recalcula os rollups afetados e
+sobe a versão de escrita (invalidando o cache de consultas).
+
+Uso:
+    python scripts/benchmark_batch_insert.py --sizes 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.thermal_repository import (
+    close_async_pool,
+    get_thermal_repository,
+    init_async_pool,
+)
+
+
+def make_records(n):
+    base = datetime(2020, 1, 1)
+    now = datetime.now()
+    return [
+        {
+            "timestamp": base + timedelta(hours=i),
+            "temperature": random.uniform(10, 38),
+            "humidity": random.uniform(20, 100),
+            "wind_velocity": random.uniform(0, 15),
+            "pressure": random.uniform(990, 1030),
+            "solar_radiation": random.uniform(0, 1000),
+            "thermal_sensation": random.uniform(10, 45),
+            "comfort_zone": "Confortável",
+            "created_at": now,
+        }
+        for i in range(n)
+    ]
+
+
+async def insert_row_by_row(repo, records):
+    return [await repo.insert(record) for record in records]
+
+
+async def measure(label, insert, repo, records):
+    start = time.perf_counter()
+    ids = await insert(records)
+    elapsed = time.perf_counter() - start
+
+    await repo.delete_many(ids)
+
+    print(f"{label:<10} {len(records):>7} linhas em {elapsed:.3f}s | {len(records) / elapsed:>10,.0f} linhas/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="Maior lote medido também no caminho linha a linha")
+    args = parser.parse_args()
+
+    await init_async_pool()
+    repo = await get_thermal_repository()
+
+    print("📊 Inserção em lote (linhas/s por tamanho de lote)\n")
+    for size in args.sizes:
+        records = make_records(size)
+        await measure("unnest", repo.insert_many, repo, records)
+        if size <= args.legacy_max:
+            await measure("por linha", lambda r: insert_row_by_row(repo, r), repo, records)
+
+    await close_async_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
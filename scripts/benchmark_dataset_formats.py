@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Formato do Dataset Processado
+=========================================
+
+Compara o dataset processado (saída de ``convert_inmet_data.py``) em CSV
+e em Parquet tipado (``app/services/thermal_dataset.py``): tamanho em
+disco e tempo de carga de cada leitor.
+
+- ``csv (pd.read_csv)``: leitura antiga dos carregadores, sem tipos
+  (``timestamp`` e ``comfort_zone`` como texto)
+- ``csv tipado``: fallback CSV de ``load_dataset`` (datas e categorias)
+- ``parquet``: todas as colunas / só as do treinamento
+  (``TRAINING_COLUMNS``) / só as do ``ThermalSensationPredictor``
+
+Os dados são ``--years`` anos horários sintéticos convertidos pelo
+próprio conversor, ou um dataset existente com ``--csv``.
+
+Uso:
+    python scripts/benchmark_dataset_formats.py --years 10
+    python scripts/benchmark_dataset_formats.py --csv data/sample_thermal_data.csv
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.thermal_dataset import MEASUREMENT_COLUMNS, load_dataset, write_dataset
+from scripts.benchmark_inmet_conversion import write_inmet_file
+from scripts.convert_inmet_data import load_inmet_file
+
+# Mesmas colunas de ``prediction_service.TRAINING_COLUMNS`` (sem importar sklearn/mlflow)
+TRAINING_COLUMNS = [
+    'timestamp', 'temperature', 'humidity', 'wind_velocity',
+    'pressure', 'solar_radiation', 'thermal_sensation',
+]
+PREDICTOR_COLUMNS = MEASUREMENT_COLUMNS + ['thermal_sensation']
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=float, default=10, help="Anos de leituras horárias sintéticas")
+    parser.add_argument("--csv", help="Usar um dataset processado existente (CSV)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições por leitor (vale a melhor)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.csv:
+            df = load_dataset(args.csv)
+        else:
+            inmet_path = os.path.join(tmp, "inmet.csv")
+            write_inmet_file(inmet_path, years=args.years)
+            df = load_inmet_file(inmet_path)
+
+        paths = {
+            "csv": os.path.join(tmp, "dataset.csv"),
+            "parquet snappy": os.path.join(tmp, "dataset_snappy.parquet"),
+            "parquet zstd": os.path.join(tmp, "dataset_zstd.parquet"),
+        }
+        write_dataset(df, paths["csv"])
+        write_dataset(df, paths["parquet snappy"], compression="snappy")
+        write_dataset(df, paths["parquet zstd"], compression="zstd")
+
+        rows = len(df)
+        csv_size = os.path.getsize(paths["csv"])
+        print(f"📄 {rows} linhas\n\n💾 Tamanho em disco")
+        for label, path in paths.items():
+            size = os.path.getsize(path)
+            print(f"   {label:<16} {size / 1024 ** 2:8.2f} MiB ({size / csv_size:6.1%} do CSV)")
+
+        parquet = paths["parquet zstd"]
+        readers = [
+            ("csv (pd.read_csv)", lambda: pd.read_csv(paths["csv"])),
+            ("csv tipado", lambda: load_dataset(paths["csv"])),
+            ("parquet", lambda: load_dataset(parquet)),
+            ("parquet treino", lambda: load_dataset(parquet, columns=TRAINING_COLUMNS)),
+            ("parquet preditor", lambda: load_dataset(parquet, columns=PREDICTOR_COLUMNS)),
+        ]
+        print(f"\n⏱️  Carga (melhor de {args.repeat})")
+        baseline = None
+        for label, reader in readers:
+            elapsed = best_of(reader, args.repeat)
+            baseline = baseline or elapsed
+            print(f"   {label:<18} {elapsed * 1000:8.1f} ms | {rows / elapsed:>12,.0f} linhas/s ({baseline / elapsed:5.1f}x)")
+
+        typed = load_dataset(parquet)
+        assert str(typed["timestamp"].dtype).startswith("datetime64")
+        assert isinstance(typed["comfort_zone"].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(typed, load_dataset(paths["csv"]))
+    print("\n✅ Parquet e CSV tipado carregam o mesmo frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Acesso ao Banco (psycopg2 bloqueante x asyncpg)
+===========================================================
+
+Dispara N GETs por id em paralelo no mesmo event loop, como o FastAPI faz,
+e compara:
+
+- ``sync``: handler ``async def`` usando uma conexão psycopg2 (I/O
+  bloqueante, serializa o event loop)
+- ``async``: ``ThermalRepository`` com asyncpg (esperas se sobrepõem)
+
+Uso:
+    python scripts/benchmark_db_access.py --requests 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import create_connection
+from app.services.thermal_repository import (
+    close_async_pool,
+    get_thermal_repository,
+    init_async_pool,
+)
+
+
+sync_conn = None
+
+
+async def fetch_sync(thermal_id):
+    """Mesmo padrão dos handlers antigos: I/O bloqueante dentro de async def."""
+    with sync_conn.cursor() as cur:
+        cur.execute("SELECT * FROM thermal_measurements WHERE id = %s", (thermal_id,))
+        return cur.fetchone()
+
+
+async def run(label, coro_factory, ids):
+    latencies = []
+
+    async def timed(thermal_id):
+        start = time.perf_counter()
+        await coro_factory(thermal_id)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in ids))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<6} {len(ids)} GETs em {elapsed:.3f}s | "
+        f"{len(ids) / elapsed:,.0f} req/s | "
+        f"latência média {statistics.mean(latencies) * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms"
+    )
+
+
+async def main():
+    global sync_conn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="GETs paralelos por rodada")
+    parser.add_argument("--sleep", type=float, default=0.0,
+                        help="Latência artificial por consulta (pg_sleep, s) para simular consultas lentas")
+    args = parser.parse_args()
+
+    await init_async_pool()
+    repo = await get_thermal_repository()
+    sync_conn = create_connection()
+    sync_conn.autocommit = True
+
+    async with repo.pool.acquire() as conn:
+        ids = [r['id'] for r in await conn.fetch(
+            "SELECT id FROM thermal_measurements ORDER BY id LIMIT $1", args.requests
+        )]
+    if not ids:
+        print("❌ Tabela thermal_measurements vazia. Ingerir dados antes do benchmark.")
+        return
+    ids = (ids * (args.requests // len(ids) + 1))[:args.requests]
+
+    if args.sleep:
+        async def fetch_async(thermal_id):
+            async with repo.pool.acquire() as conn:
+                await conn.execute("SELECT pg_sleep($1)", args.sleep)
+            return await repo.get_by_id(thermal_id)
+
+        async def fetch_blocking(thermal_id):
+            with sync_conn.cursor() as cur:
+                cur.execute("SELECT pg_sleep(%s)", (args.sleep,))
+            return await fetch_sync(thermal_id)
+    else:
+        fetch_async = repo.get_by_id
+        fetch_blocking = fetch_sync
+
+    print(f"📊 {args.requests} GETs paralelos por id\n")
+    await run("sync", fetch_blocking, ids)
+    await run("async", fetch_async, ids)
+
+    await close_async_pool()
+    sync_conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Conversão INMET
+===========================
+
+Gera um arquivo INMET sintético (cabeçalho de 8 linhas, ``;``, decimal
+``,``, latin1) com ``--years`` anos de leituras horárias e mede o cálculo
+das colunas derivadas (sensação térmica e zona de conforto):
+
+- ``iterrows``: laço linha a linha com as funções escalares (caminho antigo
+  de ``convert_inmet_data.py``, reproduzido aqui como referência)
+- ``vetorizado``: ``add_thermal_columns`` (operações de coluna NumPy)
+
+Confere que as duas saídas são idênticas e mede também a conversão
+completa do arquivo, inteira e em blocos de ``--chunk-rows`` linhas
+(tempo e pico de memória residente de um processo novo para cada uma; as
+duas saídas também precisam ser idênticas).
+
+Uso:
+    python scripts/benchmark_inmet_conversion.py --years 10 --chunk-rows 20000
+"""
+
+import argparse
+import os
+import sys
+import filecmp
+import multiprocessing
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.convert_inmet_data import add_thermal_columns, convert_inmet_to_system_format
+
+INMET_COLUMNS = [
+    "Data", "Hora UTC", "PRECIPITAÇÃO TOTAL, HORÁRIO (mm)",
+    "PRESSAO ATMOSFERICA AO NIVEL DA ESTACAO, HORARIA (mB)",
+    "PRESSÃO ATMOSFERICA MAX.NA HORA ANT. (AUT) (mB)",
+    "PRESSÃO ATMOSFERICA MIN. NA HORA ANT. (AUT) (mB)",
+    "RADIACAO GLOBAL (Kj/m²)",
+    "TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)",
+    "TEMPERATURA DO PONTO DE ORVALHO (°C)",
+    "UMIDADE RELATIVA DO AR, HORARIA (%)",
+    "VENTO, DIREÇÃO HORARIA (gr) (° (gr))",
+    "VENTO, RAJADA MAXIMA (m/s)",
+    "VENTO, VELOCIDADE HORARIA (m/s)",
+]
+
+
+def write_inmet_file(path, years=10, start="2015-01-01", station="A301", seed=42,
+                     latitude=-8.05916666, longitude=-34.95916666, missing=0.02):
+    """Arquivo no layout do INMET com ``years`` anos de leituras horárias."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=int(years * 365.25 * 24), freq="h")
+    n = len(index)
+    hour = index.hour.to_numpy()
+    day = index.dayofyear.to_numpy()
+
+    temp = 26 + 5 * np.sin((hour - 9) / 24 * 2 * np.pi) + 2 * np.sin(day / 365 * 2 * np.pi) + rng.normal(0, 1.5, n)
+    humidity = np.clip(75 - 2.5 * (temp - 26) + rng.normal(0, 6, n), 10, 100)
+    wind = np.abs(rng.normal(3, 1.8, n))
+    pressure = 1010 + rng.normal(0, 2.5, n)
+    radiation = np.where((hour >= 9) & (hour <= 21), np.abs(rng.normal(1500, 900, n)), np.nan)
+
+    def fmt(values, decimals):
+        text = pd.Series(np.round(values, decimals)).map(lambda v: "" if np.isnan(v) else f"{v:.{decimals}f}".replace(".", ","))
+        # Falhas do sensor: células vazias espalhadas
+        text[rng.random(n) < missing] = ""
+        return text
+
+    frame = pd.DataFrame({
+        "Data": index.strftime("%Y/%m/%d"),
+        "Hora UTC": index.strftime("%H%M") + " UTC",
+        INMET_COLUMNS[2]: fmt(np.abs(rng.normal(0, 0.5, n)), 1),
+        INMET_COLUMNS[3]: fmt(pressure, 1),
+        INMET_COLUMNS[4]: fmt(pressure + 0.3, 1),
+        INMET_COLUMNS[5]: fmt(pressure - 0.3, 1),
+        INMET_COLUMNS[6]: fmt(radiation, 1),
+        INMET_COLUMNS[7]: fmt(temp, 1),
+        INMET_COLUMNS[8]: fmt(temp - 4, 1),
+        INMET_COLUMNS[9]: fmt(humidity, 0),
+        INMET_COLUMNS[10]: fmt(rng.uniform(0, 360, n), 0),
+        INMET_COLUMNS[11]: fmt(wind * 1.8, 1),
+        INMET_COLUMNS[12]: fmt(wind, 1),
+    })
+
+    header = [
+        "REGIAO:;NE", "UF:;PE", "ESTACAO:;RECIFE", f"CODIGO (WMO):;{station}",
+        f"LATITUDE:;{latitude:.8f}".replace(".", ","),
+        f"LONGITUDE:;{longitude:.8f}".replace(".", ","),
+        "ALTITUDE:;11,3", "DATA DE FUNDACAO:;2004-05-20",
+    ]
+    with open(path, "w", encoding="latin1", newline="") as f:
+        f.write("\n".join(header) + "\n")
+        frame.to_csv(f, sep=";", index=False, lineterminator=";\n")
+    return n
+
+
+def thermal_columns_iterrows(df):
+    """Caminho antigo: funções escalares sobre ``df.iterrows()``."""
+    def calculate_thermal_sensation(temp, humidity, wind_speed, pressure=None, solar_radiation=None):
+        if temp < 27:
+            if wind_speed > 1.79:
+                return 13.12 + 0.6215 * temp - 11.37 * (wind_speed * 3.6)**0.16 + 0.3965 * temp * (wind_speed * 3.6)**0.16
+            return temp
+        c1, c2, c3 = -8.78469475556, 1.61139411, 2.33854883889
+        c4, c5, c6 = -0.14611605, -0.012308094, -0.0164248277778
+        c7, c8, c9 = 0.002211732, 0.00072546, -0.000003582
+        heat_index = (c1 + (c2 * temp) + (c3 * humidity) +
+                      (c4 * temp * humidity) + (c5 * temp**2) +
+                      (c6 * humidity**2) + (c7 * temp**2 * humidity) +
+                      (c8 * temp * humidity**2) + (c9 * temp**2 * humidity**2))
+        if wind_speed > 0:
+            heat_index *= max(1 - (wind_speed * 0.05), 0.7)
+        if solar_radiation is not None and solar_radiation > 200:
+            heat_index *= 1 + (solar_radiation - 200) / 2000
+        return heat_index
+
+    def get_comfort_zone(sensation):
+        if sensation < 16:
+            return "Frio"
+        elif sensation < 20:
+            return "Fresco"
+        elif sensation < 26:
+            return "Confortável"
+        elif sensation < 30:
+            return "Quente"
+        return "Muito Quente"
+
+    sensations, zones = [], []
+    for _, row in df.iterrows():
+        sensation = calculate_thermal_sensation(
+            row['temperature'], row['humidity'], row['wind_velocity'],
+            row['pressure'], row['solar_radiation']
+        )
+        sensations.append(round(sensation, 2))
+        zones.append(get_comfort_zone(sensation))
+    df['thermal_sensation'] = sensations
+    df['comfort_zone'] = zones
+    return df
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _peak_rss():
+    """Pico de memória residente do processo (MiB), de ``/proc/self/status`` (Linux)."""
+    # ru_maxrss herda o pico do processo pai no fork; VmHWM recomeça no exec
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _convert_in_child(input_path, output_path, chunk_rows):
+    _, elapsed = timed(convert_inmet_to_system_format, input_path, output_path, chunk_rows)
+    return elapsed, _peak_rss()
+
+
+def _idle_child():
+    return _peak_rss()
+
+
+def peak_memory(*args):
+    """Tempo e pico de memória residente (MiB) da conversão em um processo novo."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_convert_in_child, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=float, default=10, help="Anos de leituras horárias no arquivo sintético")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=20000, help="Linhas por bloco na conversão em blocos")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inmet_path = os.path.join(tmp, "inmet.csv")
+        rows = write_inmet_file(inmet_path, years=args.years, seed=args.seed)
+        print(f"📄 Arquivo sintético: {rows} linhas ({os.path.getsize(inmet_path) / 1024 ** 2:.1f} MiB)\n")
+
+        output_path = os.path.join(tmp, "out.csv")
+        _, total = timed(convert_inmet_to_system_format, inmet_path, output_path)
+        converted = pd.read_csv(output_path)
+        base = converted.drop(columns=["thermal_sensation", "comfort_zone"])
+
+        reference, t_loop = timed(thermal_columns_iterrows, base.copy())
+        vectorized, t_vec = timed(add_thermal_columns, base.copy())
+
+        ref_csv = reference.to_csv(index=False)
+        vec_csv = vectorized.to_csv(index=False)
+        differing = int((reference["thermal_sensation"].to_numpy() != vectorized["thermal_sensation"].to_numpy()).sum()
+                        + (reference["comfort_zone"].to_numpy() != vectorized["comfort_zone"].to_numpy()).sum())
+
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            mem_idle = pool.apply(_idle_child)
+        t_whole, mem_whole = peak_memory(inmet_path, output_path, None)
+        chunked_path = os.path.join(tmp, "out_chunked.csv")
+        t_chunked, mem_chunked = peak_memory(inmet_path, chunked_path, args.chunk_rows)
+        chunked_same = filecmp.cmp(output_path, chunked_path, shallow=False)
+
+    print(f"\n{'iterrows':<12} {t_loop:8.3f}s | {rows / t_loop:>12,.0f} linhas/s")
+    print(f"{'vetorizado':<12} {t_vec:8.3f}s | {rows / t_vec:>12,.0f} linhas/s ({t_loop / t_vec:.0f}x)")
+    print(f"{'conversão':<12} {total:8.3f}s | {rows / total:>12,.0f} linhas/s (arquivo completo, vetorizado)")
+    print(f"\n{'inteiro':<12} {t_whole:8.3f}s | pico RSS {mem_whole:8.1f} MiB (+{mem_whole - mem_idle:.1f})")
+    print(f"{'em blocos':<12} {t_chunked:8.3f}s | pico RSS {mem_chunked:8.1f} MiB (+{mem_chunked - mem_idle:.1f}, "
+          f"{args.chunk_rows} linhas por bloco)")
+    print(f"{'processo':<12} {'':8}    pico RSS {mem_idle:8.1f} MiB (só os imports)")
+    if ref_csv != vec_csv:
+        print(f"\n❌ Saídas diferentes ({differing} valores)")
+        sys.exit(1)
+    print("\n✅ Saída idêntica ao cálculo linha a linha")
+    if not chunked_same:
+        print("❌ Conversão em blocos diferente da conversão do arquivo inteiro")
+        sys.exit(1)
+    print("✅ Conversão em blocos idêntica à do arquivo inteiro")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Serialização das Respostas de Leitura
+=================================================
+
+Mede o custo de transformar uma página de ``GET /thermal_comfort/`` em
+bytes JSON, por 1000 linhas, sem banco (linhas sintéticas com as colunas
+de ``thermal_measurements``):
+
+- ``pydantic+json``: envelope ``APIResponse`` validado e convertido com
+  ``jsonable_encoder`` + ``json.dumps`` (caminho antigo do FastAPI)
+- ``pydantic``: ``APIResponse.model_dump_json``
+- ``orjson``: envelope como dict serializado com ``fast_json.dumps``
+- ``orjson columnar``: idem, com ``{coluna: [valores...]}``
+
+Uso:
+    python scripts/benchmark_serialization.py --rows 1000 --repeat 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.schemas import APIResponse
+from app.services.fast_json import dumps, to_columns
+
+
+def make_rows(n):
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "id": i,
+            "timestamp": start + timedelta(minutes=i),
+            "temperature": 20.0 + (i % 150) / 10,
+            "humidity": 40.0 + i % 50,
+            "wind_velocity": (i % 30) / 3,
+            "pressure": 1005.0 + i % 15,
+            "solar_radiation": float(i % 900),
+            "thermal_sensation": 21.0 + (i % 130) / 10,
+            "comfort_zone": "Confortável",
+            "created_at": start + timedelta(minutes=i, seconds=5),
+        }
+        for i in range(n)
+    ]
+
+
+def envelope(records):
+    return {
+        "success": True,
+        "message": "Dados recuperados com sucesso",
+        "data": {"records": records, "pagination": {"limit": len(records), "has_next": False}},
+        "timestamp": datetime.now(),
+    }
+
+
+def bench(label, fn, rows, repeat):
+    body = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    per_1000 = elapsed / len(rows) * 1000
+    print(f"{label:<18} {per_1000 * 1000:8.2f} ms / 1000 linhas | {len(body) / 1024:8.1f} KiB")
+    return per_1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Linhas por página")
+    parser.add_argument("--repeat", type=int, default=50, help="Repetições por variante")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"📊 {args.rows} linhas, {args.repeat} repetições\n")
+
+    baseline = bench(
+        "pydantic+json",
+        lambda: json.dumps(jsonable_encoder(APIResponse(**envelope(rows)))).encode("utf-8"),
+        rows, args.repeat,
+    )
+    bench("pydantic", lambda: APIResponse(**envelope(rows)).model_dump_json().encode("utf-8"), rows, args.repeat)
+    fast = bench("orjson", lambda: dumps(envelope(rows)), rows, args.repeat)
+    columnar = bench("orjson columnar", lambda: dumps(envelope(to_columns(rows))), rows, args.repeat)
+
+    print(f"\n✅ orjson {baseline / fast:.1f}x, columnar {baseline / columnar:.1f}x mais rápido que pydantic+json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Startup do StorageService com MinIO indisponível
+============================================================
+
+Compara o tempo até o serviço estar pronto para atender:
+
+- ``eager``: comportamento antigo — cliente boto3 com configuração padrão
+  criado no construtor, seguido de ``head_bucket``/``create_bucket``
+  síncronos (bloqueia o import do router);
+- ``lazy``: ``StorageService()`` atual — nenhum I/O no construtor; o
+  provisionamento do bucket roda em uma task de background.
+
+Por padrão aponta para um endereço não roteável, simulando um MinIO que
+não responde. Use ``--endpoint http://localhost:1`` para simular conexão
+recusada.
+
+Uso:
+    python scripts/benchmark_storage_startup.py --max-wait 60
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.storage_service import StorageService, provision_bucket
+
+
+def eager_startup(endpoint):
+    client = boto3.client(
+        's3',
+        endpoint_url=endpoint,
+        aws_access_key_id="minioadmin",
+        aws_secret_access_key="minioadmin",
+    )
+    try:
+        client.head_bucket(Bucket="avd-raw-data")
+    except ClientError:
+        client.create_bucket(Bucket="avd-raw-data")
+
+
+def measure_eager(endpoint, max_wait):
+    outcome = {}
+
+    def run():
+        try:
+            eager_startup(endpoint)
+            outcome["result"] = "ok"
+        except Exception as e:
+            outcome["result"] = type(e).__name__
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(max_wait)
+    elapsed = time.perf_counter() - start
+
+    if thread.is_alive():
+        print(f"eager  pronto em > {max_wait:.1f}s (ainda bloqueado, interrompido)")
+    else:
+        print(f"eager  pronto em {elapsed:.3f}s ({outcome['result']})")
+
+
+async def measure_lazy():
+    start = time.perf_counter()
+    storage = StorageService()
+    task = asyncio.create_task(provision_bucket(storage, retry_interval=1.0, max_attempts=1))
+    elapsed = time.perf_counter() - start
+    print(f"lazy   pronto em {elapsed:.3f}s (bucket provisionado em background)")
+
+    await task
+    total = time.perf_counter() - start
+    print(f"       provisionamento em background terminou após {total:.3f}s "
+          f"(bucket_ready={storage.bucket_ready})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", default="http://10.255.255.1:9000",
+                        help="Endpoint S3 indisponível")
+    parser.add_argument("--max-wait", type=float, default=60.0,
+                        help="Tempo máximo esperando o startup antigo")
+    args = parser.parse_args()
+
+    os.environ["MLFLOW_S3_ENDPOINT_URL"] = args.endpoint
+    print(f"📊 Startup com MinIO indisponível em {args.endpoint}\n")
+
+    measure_eager(args.endpoint, args.max_wait)
+    asyncio.run(measure_lazy())
+
+
+if __name__ == "__main__":
+    main()
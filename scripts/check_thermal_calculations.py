@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Verificação - Cálculo Vetorizado x Escalar
+==========================================
+
+Teste de propriedade: sorteia uma grade aleatória de entradas (mais os
+valores de fronteira das fórmulas) e confere que ``compute_thermal_fields``
+produz exatamente a mesma sensação térmica arredondada e a mesma zona de
+conforto que ``calculate_thermal_sensation``/``get_comfort_zone``.
+
+Uso:
+    python scripts/check_thermal_calculations.py --samples 200000 --seed 42
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.thermal_calculations import (
+    calculate_thermal_sensation,
+    compute_thermal_fields,
+    get_comfort_zone,
+    thermal_sensation_raw,
+)
+
+
+def build_inputs(samples, seed):
+    rng = np.random.default_rng(seed)
+    temp = rng.uniform(-15, 50, samples)
+    humidity = rng.uniform(0, 100, samples)
+    wind = rng.uniform(0, 25, samples)
+    solar = rng.uniform(0, 1400, samples)
+
+    # Fronteiras dos ramos: temperatura 27, vento 1.79/0, fator de vento 0.7, radiação 200
+    edges_temp = np.array([26.99, 27.0, 27.01, 0.0, -0.0, 16.0, 20.0, 26.0, 30.0])
+    edges_wind = np.array([0.0, 1.79, 1.7900001, 6.0, 6.0000001])
+    edges_solar = np.array([0.0, 200.0, 200.0001])
+    grid = np.array(np.meshgrid(edges_temp, [0.0, 50.0, 100.0], edges_wind, edges_solar)).reshape(4, -1)
+
+    # Valores com 2 casas (como chegam do INMET/sensores)
+    rounded = np.round(rng.uniform(-15, 50, (4, samples // 4)), 2)
+    rounded[1] = np.abs(rounded[1]) % 100
+    rounded[2] = np.abs(rounded[2]) % 25
+    rounded[3] = np.abs(rounded[3]) * 20
+
+    return [np.concatenate([a, g, r]) for a, g, r in zip((temp, humidity, wind, solar), grid, rounded)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    temp, humidity, wind, solar = build_inputs(args.samples, args.seed)
+    print(f"🔍 Comparando {len(temp):,} combinações de entrada...")
+
+    start = time.perf_counter()
+    sensations, zones = compute_thermal_fields(temp, humidity, wind, solar)
+    vector_time = time.perf_counter() - start
+    _, zones_raw = compute_thermal_fields(temp, humidity, wind, solar, zone_from_rounded=False)
+
+    start = time.perf_counter()
+    failures = 0
+    for i, (t, h, w, s) in enumerate(zip(temp.tolist(), humidity.tolist(), wind.tolist(), solar.tolist())):
+        expected = calculate_thermal_sensation(t, h, w, solar_radiation=s)
+        expected_zone = get_comfort_zone(expected)
+        expected_zone_raw = get_comfort_zone(thermal_sensation_raw(t, h, w, solar_radiation=s))
+        if (sensations[i] != expected or zones[i] != expected_zone or zones_raw[i] != expected_zone_raw):
+            failures += 1
+            if failures <= 10:
+                print(f"❌ t={t!r} h={h!r} w={w!r} s={s!r}: "
+                      f"{sensations[i]!r}/{zones[i]} != {expected!r}/{expected_zone}")
+    scalar_time = time.perf_counter() - start
+
+    print(f"⏱️  Vetorizado: {vector_time:.3f}s | Escalar: {scalar_time:.3f}s")
+    if failures:
+        print(f"❌ {failures} divergências")
+        sys.exit(1)
+    print("✅ Resultados idênticos")
+
+
+if __name__ == "__main__":
+    main()
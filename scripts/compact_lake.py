@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Compactação do Data Lake
+========================
+
+Junta os objetos JSON de leitura única do bucket ``avd-raw-data`` em
+arquivos Parquet diários (``compacted/year=/month=/day=``, pelo dia das
+leituras), removendo as origens só depois que cada arquivo foi gravado e
+conferido. Pode ser interrompido e executado de novo a qualquer momento.
+
+``--repartition`` move para o dia das leituras os Parquet compactados
+antes, que ficavam no dia de gravação das origens.
+
+Uso:
+    python scripts/compact_lake.py --dry-run
+    python scripts/compact_lake.py --start 2025-11-01 --until 2025-11-30
+    python scripts/compact_lake.py --endpoint-url http://localhost:9000
+    python scripts/compact_lake.py --local-dir /tmp/lake   # sem MinIO
+    python scripts/compact_lake.py --repartition --dry-run
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.lake_compaction import create_lake_compactor
+from app.services.storage_service import LocalStorageService, StorageService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, help="Primeiro dia (padrão: origem mais antiga)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Último dia, inclusive (padrão: ontem)")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas listar o que seria compactado")
+    parser.add_argument("--bucket", default="avd-raw-data", help="Bucket de dados brutos")
+    parser.add_argument("--endpoint-url", help="Endpoint S3 (padrão: MLFLOW_S3_ENDPOINT_URL)")
+    parser.add_argument("--local-dir", help="Usar um diretório local no lugar do S3")
+    parser.add_argument("--workers", type=int, help="Threads de listagem/leitura")
+    parser.add_argument("--repartition", action="store_true",
+                        help="Mover compactados antigos para o dia das leituras")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    if args.endpoint_url:
+        os.environ["MLFLOW_S3_ENDPOINT_URL"] = args.endpoint_url
+    if args.local_dir:
+        storage = LocalStorageService(args.local_dir, args.bucket)
+    else:
+        storage = StorageService(args.bucket)
+
+    compactor = create_lake_compactor(storage)
+    if args.workers:
+        compactor.max_workers = args.workers
+
+    if args.repartition:
+        summary = compactor.repartition(dry_run=args.dry_run)
+        for detail in summary["details"]:
+            print(f"   {detail['key']}: {detail['rows']} linhas -> {len(detail['output_keys'])} dias")
+        verb = "seriam movidos" if args.dry_run else "movidos"
+        print(f"\n✅ {summary['moved']} de {summary['checked']} arquivos {verb} ({summary['rows']} linhas)")
+        return
+
+    print(f"🗜️  Compactando s3://{args.bucket}/{compactor.source_prefix}*"
+          f"{' (dry-run)' if args.dry_run else ''}\n")
+
+    start = time.perf_counter()
+    summary = compactor.run(start=args.start, until=args.until, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    for detail in summary["details"]:
+        line = f"   {detail['day']}: {detail['sources']} objetos"
+        if detail.get("output_keys"):
+            line += (f" -> {', '.join(detail['output_keys'])} "
+                     f"({detail['rows']} linhas, {detail['bytes'] / 1024:.1f} KiB)")
+        if detail.get("failed"):
+            line += f" ⚠️ {len(detail['failed'])} ilegíveis mantidos"
+        print(line)
+
+    if summary["resumed"]:
+        print(f"\n🔁 {summary['resumed']} compactações anteriores concluídas")
+    print(f"\n✅ {summary['sources']} objetos de {summary['days']} dias "
+          f"em {summary['files']} arquivos ({elapsed:.1f}s)")
+    if summary["failed"]:
+        print(f"⚠️  {summary['failed']} objetos ilegíveis não foram removidos")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
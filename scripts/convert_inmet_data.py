@@ -1,167 +1,330 @@
-import pandas as pd
-import numpy as np
+#!/usr/bin/env python3
+"""
+Conversão INMET
+===============
+
+Converte os CSVs horários do INMET (cabeçalho de 8 linhas de metadados,
+``;``, decimal ``,``, latin1) para o formato do sistema: Parquet tipado e
+comprimido (``app/services/thermal_dataset.py``) ou, pela extensão da
+saída / ``--format csv``, CSV.
+
+Arquivo único (padrão ``data/inmet.csv`` -> ``data/sample_thermal_data.parquet``)
+ou lote (``--batch``): um diretório ou glob de arquivos de estação,
+convertidos em paralelo por um pool de processos. No lote cada linha
+recebe ``station``, ``latitude`` e ``longitude`` do cabeçalho do arquivo e
+a saída é um único conjunto particionado por estação e ano::
+
+    <output-dir>/station=A301/year=2023/<arquivo>.parquet
+
+O lote é incremental: ``<output-dir>/_manifest.json`` guarda hash, mtime,
+número de linhas e partições de cada arquivo convertido, e uma nova
+execução só converte arquivos novos (que acrescentam as próprias
+partições, sem reescrever as demais) ou alterados (que trocam só as
+partições deles). ``--full`` converte tudo de novo.
+
+Com ``--chunk-rows`` (nos dois modos) cada arquivo é lido, convertido e
+escrito em blocos, com memória limitada mesmo em arquivos muito grandes
+(ex.: vários anos de uma estação concatenados); o resultado é igual ao da
+leitura do arquivo inteiro.
+
+Uso:
+    python scripts/convert_inmet_data.py
+    python scripts/convert_inmet_data.py --input data/inmet.csv --output data/sample_thermal_data.csv
+    python scripts/convert_inmet_data.py --batch "data/inmet/*.CSV" --output-dir data/processed/inmet --workers 8
+    python scripts/convert_inmet_data.py --input data/inmet_merged.csv --chunk-rows 100000
+"""
+
+import argparse
+import glob
+import hashlib
+import json
 import os
 import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.thermal_calculations import compute_thermal_fields
+from app.services.thermal_dataset import DATASET_COLUMNS, MEASUREMENT_COLUMNS, DatasetWriter
+
+FINAL_COLUMNS = DATASET_COLUMNS
+NUMERIC_COLUMNS = MEASUREMENT_COLUMNS
+
+# - skiprows=8: Pula metadados
+# - delimiter=';': Separador do INMET
+# - decimal=',': Decimal brasileiro
+# - encoding='latin1' ou 'utf-8': INMET costuma usar latin1 (ISO-8859-1)
+READ_OPTIONS = {'skiprows': 8, 'delimiter': ';', 'decimal': ',', 'encoding': 'latin1'}
+
+# Registro dos arquivos já convertidos, na raiz do conjunto do lote (o
+# prefixo "_" o esconde dos leitores de dataset)
+MANIFEST_NAME = '_manifest.json'
 
-def calculate_thermal_sensation(temp, humidity, wind_speed, pressure=None, solar_radiation=None):
+# Chaves do cabeçalho de metadados (sem acento, maiúsculas) -> campo
+HEADER_FIELDS = {
+    'REGIAO': 'region',
+    'UF': 'uf',
+    'ESTACAO': 'station_name',
+    'CODIGO (WMO)': 'station',
+    'LATITUDE': 'latitude',
+    'LONGITUDE': 'longitude',
+    'ALTITUDE': 'altitude',
+}
+
+def add_thermal_columns(df):
     """
-    Calcula sensação térmica usando fórmula aproximada do índice de calor
+    Adicionar ``thermal_sensation`` (2 casas) e ``comfort_zone`` com operações
+    de coluna. A zona é classificada pela sensação sem arredondamento, como
+    no cálculo linha a linha original; o resultado é idêntico a ele.
     """
-    # Fórmula simplificada do Heat Index
-    if temp < 27:  # Para temperaturas baixas, usar wind chill
-        if wind_speed > 1.79:  # > 6.5 km/h
-            wind_chill = 13.12 + 0.6215 * temp - 11.37 * (wind_speed * 3.6)**0.16 + 0.3965 * temp * (wind_speed * 3.6)**0.16
-            return wind_chill
-        return temp
-    
-    # Para temperaturas altas, usar heat index
-    c1 = -8.78469475556
-    c2 = 1.61139411
-    c3 = 2.33854883889
-    c4 = -0.14611605
-    c5 = -0.012308094
-    c6 = -0.0164248277778
-    c7 = 0.002211732
-    c8 = 0.00072546
-    c9 = -0.000003582
-    
-    heat_index = (c1 + (c2 * temp) + (c3 * humidity) + 
-                 (c4 * temp * humidity) + (c5 * temp**2) + 
-                 (c6 * humidity**2) + (c7 * temp**2 * humidity) + 
-                 (c8 * temp * humidity**2) + (c9 * temp**2 * humidity**2))
-    
-    # Ajustar por vento (vento reduz sensação de calor)
-    if wind_speed > 0:
-        wind_factor = 1 - (wind_speed * 0.05)  # Cada m/s reduz 5% a sensação
-        wind_factor = max(wind_factor, 0.7)  # Mínimo 70%
-        heat_index *= wind_factor
-    
-    # Ajustar por radiação solar (se disponível)
-    if solar_radiation is not None and solar_radiation > 200:
-        solar_factor = 1 + (solar_radiation - 200) / 2000  # Radiação alta aumenta sensação
-        heat_index *= solar_factor
-    
-    return heat_index
-
-def get_comfort_zone(thermal_sensation):
-    """Classifica zona de conforto baseada na sensação térmica"""
-    if thermal_sensation < 16:
-        return "Frio"
-    elif thermal_sensation < 20:
-        return "Fresco" 
-    elif thermal_sensation < 26:
-        return "Confortável"
-    elif thermal_sensation < 30:
-        return "Quente"
-    else:
-        return "Muito Quente"
+    sensations, zones = compute_thermal_fields(
+        df['temperature'].to_numpy(dtype=float),
+        df['humidity'].to_numpy(dtype=float),
+        df['wind_velocity'].to_numpy(dtype=float),
+        df['solar_radiation'].to_numpy(dtype=float),
+        zone_from_rounded=False,
+    )
+    df['thermal_sensation'] = sensations
+    df['comfort_zone'] = zones
+    return df
+
+def _normalize_key(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return text.strip().rstrip(':').strip().upper()
+
+
+def read_inmet_header(input_path):
+    """
+    Metadados das 8 primeiras linhas de um CSV do INMET (``CHAVE:;valor``):
+    ``station`` (código WMO), ``station_name``, ``region``, ``uf``,
+    ``latitude``, ``longitude`` e ``altitude``.
+    """
+    header = {}
+    with open(input_path, encoding='latin1') as f:
+        for _ in range(8):
+            key, _sep, value = f.readline().partition(';')
+            field = HEADER_FIELDS.get(_normalize_key(key))
+            if field:
+                header[field] = value.strip().rstrip(';').strip()
+
+    if not header.get('station'):
+        raise ValueError(f"Cabeçalho sem 'CODIGO (WMO)': {input_path}")
+    for field in ('latitude', 'longitude', 'altitude'):
+        try:
+            header[field] = float(header[field].replace(',', '.'))
+        except (KeyError, ValueError):
+            header[field] = None
+    return header
+
+
+def _column_mapping(columns):
+    """Mapeamento: Nome no CSV INMET -> Nome no Sistema (colunas já sem espaços)."""
+    column_mapping = {
+        'Data': 'date',
+        'Hora UTC': 'time',
+        'TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)': 'temperature',
+        'UMIDADE RELATIVA DO AR, HORARIA (%)': 'humidity',
+        'VENTO, VELOCIDADE HORARIA (m/s)': 'wind_velocity',
+        'PRESSAO ATMOSFERICA AO NIVEL DA ESTACAO, HORARIA (mB)': 'pressure',
+        'RADIACAO GLOBAL (Kj/m²)': 'solar_radiation'
+    }
+
+    # Ajuste fino nos nomes se necessário (INMET as vezes muda acentos)
+    # Procurar coluna que contem "TEMPERATURA DO AR"
+    for col in columns:
+        if "TEMPERATURA DO AR" in col and "BULBO SECO" in col:
+            column_mapping[col] = 'temperature'
+        elif "UMIDADE RELATIVA" in col:
+            column_mapping[col] = 'humidity'
+        elif "VENTO" in col and "VELOCIDADE" in col:
+            column_mapping[col] = 'wind_velocity'
+        elif "PRESSAO ATMOSFERICA" in col and "ESTACAO" in col:
+            column_mapping[col] = 'pressure'
+        elif "RADIACAO GLOBAL" in col:
+            column_mapping[col] = 'solar_radiation'
+
+    # Filtrar apenas colunas presentes
+    return {k: v for k, v in column_mapping.items() if k in columns}
 
-def convert_inmet_to_system_format(input_path, output_path):
+
+def _prepare_frame(df):
+    """Renomear, montar ``timestamp`` e converter as medidas para número (sem preencher falhas)."""
+    # Tentar encontrar as colunas (os nomes as vezes variam ligeiramente no INMET)
+    # Vamos normalizar os nomes das colunas do DF para facilitar
+    df.columns = [c.strip() for c in df.columns]
+    mapped_cols = _column_mapping(list(df.columns))
+    df = df[list(mapped_cols.keys())].rename(columns=mapped_cols)
+
+    # Converter Data e Hora para Timestamp
+    # Hora UTC vem como "0000 UTC", precisamos remover " UTC" e formatar
+    df['time'] = df['time'].astype(str).str.replace(' UTC', '').str.zfill(4)
+    df['time'] = df['time'].str[:2] + ':' + df['time'].str[2:]
+
+    df['timestamp'] = pd.to_datetime(df['date'] + ' ' + df['time'], format='%Y/%m/%d %H:%M')
+
+    # Mas cuidado: INMET poe nulos como vazio ou -9999
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            # Forçar numérico, transformar erros em NaN
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def _finish_frame(df):
+    """Radiação em W/m², colunas derivadas e ``FINAL_COLUMNS`` (falhas já preenchidas)."""
+    # Radiação no INMET as vezes vem vazia à noite, preencher com 0
+    df['solar_radiation'] = df['solar_radiation'].fillna(0)
+    # Converter Kj/m² (acumulado hora) para W/m² (intensidade média)
+    # 1 Kj/m² = 1000 J/m². Dividido por 3600s = ~0.277 W/m²
+    df['solar_radiation'] = df['solar_radiation'] * 1000 / 3600
+
+    # Calcular Colunas Derivadas (Sensação e Conforto)
+    add_thermal_columns(df)
+    return df[FINAL_COLUMNS]
+
+
+def load_inmet_file(input_path):
+    """Ler um CSV do INMET inteiro e devolver as colunas do sistema (``FINAL_COLUMNS``)."""
+    df = _prepare_frame(pd.read_csv(input_path, **READ_OPTIONS))
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            # Preencher NaN com interpolação linear (bom para séries temporais)
+            df[col] = df[col].interpolate(method='linear', limit_direction='both')
+
+    return _finish_frame(df)
+
+
+def _scan_valid_bounds(input_path, chunk_rows):
+    """
+    Primeiro valor válido e posição do último valor válido de cada medida
+    (passagem de leitura só das colunas numéricas).
+    """
+    def wanted(col):
+        return _column_mapping([col.strip()]).get(col.strip()) in NUMERIC_COLUMNS
+
+    first, last = {}, {}
+    offset = 0
+    for raw in pd.read_csv(input_path, usecols=wanted, chunksize=chunk_rows, **READ_OPTIONS):
+        raw.columns = [c.strip() for c in raw.columns]
+        for source, col in _column_mapping(list(raw.columns)).items():
+            values = pd.to_numeric(raw[source], errors='coerce').to_numpy(dtype=float)
+            valid = np.flatnonzero(~np.isnan(values))
+            if len(valid):
+                first.setdefault(col, values[valid[0]])
+                last[col] = offset + int(valid[-1])
+        offset += len(raw)
+    return first, last
+
+
+def iter_inmet_chunks(input_path, chunk_rows=100_000):
+    """
+    Ler um CSV do INMET em blocos de ``chunk_rows`` linhas e devolver cada
+    bloco já convertido (``FINAL_COLUMNS``), com memória limitada.
+
+    O preenchimento das falhas é idêntico ao do arquivo inteiro
+    (``interpolate(method='linear', limit_direction='both')``): cada medida
+    guarda o último valor válido já emitido (posição e valor) e as linhas
+    de uma falha que atravessa o fim do bloco esperam o próximo valor
+    válido. Uma passagem prévia só pelas colunas numéricas acha o primeiro
+    e o último valor válido de cada medida, então o início e o fim sem
+    leitura (copiados do valor mais próximo) não precisam ser retidos; só
+    falhas internas ficam em memória, pelo tamanho da falha.
+    """
+    first, last = _scan_valid_bounds(input_path, chunk_rows)
+    anchors = {}
+    pending = None
+    offset = 0
+
+    for raw in pd.read_csv(input_path, chunksize=chunk_rows, **READ_OPTIONS):
+        frame = _prepare_frame(raw)
+        buf = frame if pending is None or pending.empty else pd.concat([pending, frame], ignore_index=True)
+        end = offset + len(buf)
+        positions = np.arange(offset, end)
+
+        columns = {}
+        cut = end
+        for col in NUMERIC_COLUMNS:
+            if col not in buf.columns:
+                continue
+            values = buf[col].to_numpy(dtype=float)
+            valid = np.flatnonzero(~np.isnan(values))
+            columns[col] = (values, valid)
+            if col not in last or last[col] < end or (col not in anchors and not len(valid)):
+                # Sem leituras, já no fim sem leitura ou ainda antes da primeira
+                continue
+            cut = min(cut, offset + int(valid[-1]) + 1 if len(valid) else offset)
+
+        ready_rows = cut - offset
+        ready = buf.iloc[:ready_rows].copy()
+        for col, (values, valid) in columns.items():
+            xp, fp = positions[valid], values[valid]
+            if col in anchors:
+                xp = np.concatenate(([anchors[col][0]], xp))
+                fp = np.concatenate(([anchors[col][1]], fp))
+            filled = values[:ready_rows].copy()
+            missing = np.isnan(filled)
+            if len(xp):
+                filled[missing] = np.interp(positions[:ready_rows][missing], xp, fp)
+            else:
+                filled[missing] = first.get(col, np.nan)
+            ready[col] = filled
+
+            emitted = valid[valid < ready_rows]
+            if len(emitted):
+                anchors[col] = (int(positions[emitted[-1]]), values[emitted[-1]])
+
+        pending = buf.iloc[ready_rows:].reset_index(drop=True)
+        offset = cut
+        if ready_rows:
+            yield _finish_frame(ready)
+
+    # O último bloco alcança o último valor válido de todas as medidas
+    assert pending is None or pending.empty
+
+
+def write_inmet_chunks(input_path, output_path, chunk_rows=100_000):
+    """
+    Converter em blocos direto para ``output_path`` (``.parquet``: um row
+    group por bloco; ``.csv``); retorna ``(linhas, início, fim)``.
+    """
+    rows, first, last = 0, None, None
+    with DatasetWriter(output_path) as writer:
+        for chunk in iter_inmet_chunks(input_path, chunk_rows):
+            writer.write(chunk)
+            rows += len(chunk)
+            first = chunk['timestamp'].min() if first is None else min(first, chunk['timestamp'].min())
+            last = chunk['timestamp'].max() if last is None else max(last, chunk['timestamp'].max())
+    return rows, first, last
+
+
+def convert_inmet_to_system_format(input_path, output_path, chunk_rows=None):
     print(f"🔄 Convertendo '{input_path}' para formato do sistema...")
     
     try:
-        # 1. Ler CSV do INMET
-        # - skiprows=8: Pula metadados
-        # - delimiter=';': Separador do INMET
-        # - decimal=',': Decimal brasileiro
-        # - encoding='latin1' ou 'utf-8': INMET costuma usar latin1 (ISO-8859-1)
-        df = pd.read_csv(input_path, skiprows=8, delimiter=';', decimal=',', encoding='latin1')
-        
-        # 2. Selecionar e Renomear Colunas
-        # Mapeamento: Nome no CSV INMET -> Nome no Sistema
-        column_mapping = {
-            'Data': 'date',
-            'Hora UTC': 'time',
-            'TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)': 'temperature',
-            'UMIDADE RELATIVA DO AR, HORARIA (%)': 'humidity',
-            'VENTO, VELOCIDADE HORARIA (m/s)': 'wind_velocity',
-            'PRESSAO ATMOSFERICA AO NIVEL DA ESTACAO, HORARIA (mB)': 'pressure',
-            'RADIACAO GLOBAL (Kj/m²)': 'solar_radiation'
-        }
-        
-        # Tentar encontrar as colunas (os nomes as vezes variam ligeiramente no INMET)
-        # Vamos normalizar os nomes das colunas do DF para facilitar
-        df.columns = [c.strip() for c in df.columns]
-        
-        # Ajuste fino nos nomes se necessário (INMET as vezes muda acentos)
-        # Procurar coluna que contem "TEMPERATURA DO AR"
-        for col in df.columns:
-            if "TEMPERATURA DO AR" in col and "BULBO SECO" in col:
-                column_mapping[col] = 'temperature'
-            elif "UMIDADE RELATIVA" in col:
-                column_mapping[col] = 'humidity'
-            elif "VENTO" in col and "VELOCIDADE" in col:
-                column_mapping[col] = 'wind_velocity'
-            elif "PRESSAO ATMOSFERICA" in col and "ESTACAO" in col:
-                column_mapping[col] = 'pressure'
-            elif "RADIACAO GLOBAL" in col:
-                column_mapping[col] = 'solar_radiation'
-
-        # Filtrar apenas colunas mapeadas
-        mapped_cols = {k: v for k, v in column_mapping.items() if k in df.columns}
-        df = df[list(mapped_cols.keys())].rename(columns=mapped_cols)
-        
-        # 3. Tratamento de Dados
-        
-        # Converter Data e Hora para Timestamp
-        # Hora UTC vem como "0000 UTC", precisamos remover " UTC" e formatar
-        df['time'] = df['time'].astype(str).str.replace(' UTC', '').str.zfill(4)
-        df['time'] = df['time'].str[:2] + ':' + df['time'].str[2:]
-        
-        df['timestamp'] = pd.to_datetime(df['date'] + ' ' + df['time'], format='%Y/%m/%d %H:%M')
-        
-        # Converter Radiação: INMET usa Kj/m², sistema usa W/m² (aprox) ou manter escala
-        # Mas cuidado: INMET poe nulos como vazio ou -9999
-        numeric_cols = ['temperature', 'humidity', 'wind_velocity', 'pressure', 'solar_radiation']
-        
-        for col in numeric_cols:
-            if col in df.columns:
-                # Forçar numérico, transformar erros em NaN
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                # Preencher NaN com interpolação linear (bom para séries temporais)
-                df[col] = df[col].interpolate(method='linear', limit_direction='both')
-        
-        # Radiação no INMET as vezes vem vazia à noite, preencher com 0
-        df['solar_radiation'] = df['solar_radiation'].fillna(0)
-        # Converter Kj/m² (acumulado hora) para W/m² (intensidade média)
-        # 1 Kj/m² = 1000 J/m². Dividido por 3600s = ~0.277 W/m²
-        df['solar_radiation'] = df['solar_radiation'] * 1000 / 3600
-        
-        # 4. Calcular Colunas Derivadas (Sensação e Conforto)
         print("🧮 Calculando sensação térmica e zonas de conforto...")
-        
-        sensations = []
-        zones = []
-        
-        for _, row in df.iterrows():
-            sensation = calculate_thermal_sensation(
-                row['temperature'],
-                row['humidity'],
-                row['wind_velocity'],
-                row['pressure'],
-                row['solar_radiation']
-            )
-            sensations.append(round(sensation, 2))
-            zones.append(get_comfort_zone(sensation))
+        if chunk_rows:
+            # Leitura e escrita em blocos (memória limitada)
+            rows, first, last = write_inmet_chunks(input_path, output_path, chunk_rows)
+        else:
+            df_final = load_inmet_file(input_path)
             
-        df['thermal_sensation'] = sensations
-        df['comfort_zone'] = zones
-        
-        # 5. Selecionar Colunas Finais
-        final_cols = ['timestamp', 'temperature', 'humidity', 'wind_velocity', 
-                      'pressure', 'solar_radiation', 'thermal_sensation', 'comfort_zone']
-        
-        df_final = df[final_cols]
-        
-        # 6. Salvar
-        df_final.to_csv(output_path, index=False)
+            # Salvar (.parquet tipado ou .csv, pela extensão)
+            with DatasetWriter(output_path) as writer:
+                writer.write(df_final)
+            rows, first, last = len(df_final), df_final['timestamp'].min(), df_final['timestamp'].max()
         
         print("\n✅ Conversão Concluída com Sucesso!")
         print(f"📄 Origem: {input_path}")
         print(f"💾 Destino: {output_path}")
-        print(f"📊 Registros processados: {len(df_final)}")
-        print(f"📅 Período: {df_final['timestamp'].min()} até {df_final['timestamp'].max()}")
+        print(f"📊 Registros processados: {rows}")
+        print(f"📅 Período: {first} até {last}")
         print("\nAgora você pode rodar: python scripts/ingest_data.py")
         
     except Exception as e:
@@ -169,11 +332,269 @@ def convert_inmet_to_system_format(input_path, output_path):
         import traceback
         traceback.print_exc()
 
-if __name__ == "__main__":
-    INMET_FILE = "data/inmet.csv"
-    OUTPUT_FILE = "data/sample_thermal_data.csv"
-    
-    if not os.path.exists(INMET_FILE):
-        print(f"Arquivo {INMET_FILE} não encontrado na raiz.")
+
+def resolve_inputs(source):
+    """Arquivos de ``source``: diretório (``*.csv`` recursivo, qualquer caixa) ou glob."""
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '**', '*'), recursive=True)
+        paths = [p for p in paths if p.lower().endswith('.csv')]
     else:
-        convert_inmet_to_system_format(INMET_FILE, OUTPUT_FILE)
+        paths = glob.glob(source, recursive=True)
+    return sorted({os.path.abspath(p) for p in paths if os.path.isfile(p)})
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    """``size``, ``mtime`` e ``sha256`` de um arquivo de entrada."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': file_sha256(path)}
+
+
+def convert_station_file(input_path, output_dir, chunk_rows=None, fmt='parquet'):
+    """
+    Converter um arquivo de estação para o conjunto particionado
+    ``station=<código>/year=<ano>/<arquivo>.<fmt>`` (roda nos workers do
+    lote). Cada arquivo de origem escreve apenas os próprios arquivos de
+    partição, então os workers não disputam a mesma saída. Com
+    ``chunk_rows`` o arquivo é lido e escrito em blocos.
+
+    As partições são gravadas em arquivos ocultos e só trocadas pelas
+    definitivas (``os.replace``) depois do arquivo inteiro convertido:
+    uma falha no meio não deixa partições parciais nem apaga as de uma
+    conversão anterior.
+    """
+    start = time.perf_counter()
+    fingerprint = file_fingerprint(input_path)
+    header = read_inmet_header(input_path)
+    chunks = iter_inmet_chunks(input_path, chunk_rows) if chunk_rows else [load_inmet_file(input_path)]
+
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    writers = {}
+    rows, first, last = 0, None, None
+    try:
+        for df in chunks:
+            df.insert(0, 'station', header['station'])
+            df.insert(1, 'latitude', header['latitude'])
+            df.insert(2, 'longitude', header['longitude'])
+
+            for year, part in df.groupby(df['timestamp'].dt.year, sort=True):
+                partition = os.path.join(output_dir, f"station={header['station']}", f"year={year}")
+                path = os.path.join(partition, f"{stem}.{fmt}")
+                if path not in writers:
+                    os.makedirs(partition, exist_ok=True)
+                    # Oculto (".") e com a extensão final, que decide o formato da escrita
+                    writers[path] = DatasetWriter(os.path.join(partition, f".tmp-{stem}.{fmt}"))
+                writers[path].write(part)
+
+            rows += len(df)
+            first = df['timestamp'].min() if first is None else min(first, df['timestamp'].min())
+            last = df['timestamp'].max() if last is None else max(last, df['timestamp'].max())
+    except BaseException:
+        for writer in writers.values():
+            writer.close()
+            if os.path.exists(writer.path):
+                os.remove(writer.path)
+        raise
+
+    for path, writer in writers.items():
+        writer.close()
+        os.replace(writer.path, path)
+    outputs = list(writers)
+
+    return {
+        'input': input_path,
+        **fingerprint,
+        'station': header['station'],
+        'station_name': header.get('station_name'),
+        'rows': rows,
+        'first': first,
+        'last': last,
+        'outputs': outputs,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def convert_inmet_batch(inputs, output_dir, workers=None, chunk_rows=None, fmt='parquet'):
+    """
+    Converter ``inputs`` em paralelo (``ProcessPoolExecutor``), com uma
+    linha de progresso por arquivo. Falhas não interrompem o lote; retorna
+    ``(resultados, erros)`` com ``erros`` como ``[(arquivo, mensagem)]``.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results, errors = [], []
+    total = len(inputs)
+    width = len(str(total))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(convert_station_file, path, output_dir, chunk_rows, fmt): path for path in inputs}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            name = os.path.basename(path)
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append((path, f"{type(e).__name__}: {e}"))
+                print(f"[{done:>{width}}/{total}] ❌ {name}: {e}")
+                continue
+            results.append(result)
+            print(f"[{done:>{width}}/{total}] ✅ {result['station']} {name}: "
+                  f"{result['rows']} linhas, {len(result['outputs'])} partições ({result['seconds']:.1f}s)")
+
+    return results, errors
+
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'version': 1, 'files': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(output_dir, manifest):
+    """Gravar o manifesto de forma atômica (arquivo temporário + ``os.replace``)."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def plan_incremental(inputs, manifest, fmt):
+    """
+    Separar ``inputs`` em ``(novos, alterados, inalterados)`` pelo manifesto.
+
+    Tamanho e mtime iguais bastam para considerar o arquivo inalterado;
+    se mudaram, o hash decide (um arquivo só copiado ou tocado não é
+    convertido de novo, só tem o mtime atualizado no manifesto).
+    """
+    new, changed, unchanged = [], [], []
+    files = manifest['files']
+    for path in inputs:
+        entry = files.get(path)
+        if entry is None:
+            new.append(path)
+            continue
+        if entry.get('format') != fmt:
+            changed.append(path)
+            continue
+        stat = os.stat(path)
+        if stat.st_size == entry['size'] and stat.st_mtime == entry['mtime']:
+            unchanged.append(path)
+        elif stat.st_size == entry['size'] and file_sha256(path) == entry['sha256']:
+            entry['mtime'] = stat.st_mtime
+            unchanged.append(path)
+        else:
+            changed.append(path)
+    return new, changed, unchanged
+
+
+def convert_inmet_incremental(inputs, output_dir, workers=None, chunk_rows=None, fmt='parquet', full=False):
+    """
+    Converter só os arquivos novos ou alterados desde a última execução
+    (``_manifest.json`` em ``output_dir``: hash, mtime, linhas e partições
+    de cada entrada). Arquivos novos só acrescentam as próprias partições
+    ao conjunto; um arquivo alterado troca apenas as partições que são
+    dele. Com ``full`` tudo é convertido de novo.
+
+    Retorna ``(resultados, erros, inalterados)``.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    if full:
+        new = [path for path in inputs if path not in manifest['files']]
+        changed = [path for path in inputs if path in manifest['files']]
+        unchanged = []
+    else:
+        new, changed, unchanged = plan_incremental(inputs, manifest, fmt)
+    print(f"🗂️  Manifesto: {len(new)} novos, {len(changed)} alterados, {len(unchanged)} inalterados\n")
+
+    results, errors = convert_inmet_batch(new + changed, output_dir, workers=workers, chunk_rows=chunk_rows, fmt=fmt)
+
+    for result in results:
+        outputs = [os.path.relpath(path, output_dir) for path in result['outputs']]
+        previous = manifest['files'].get(result['input'], {}).get('outputs', [])
+        # Partições de uma conversão anterior que a nova não regravou (ex.: outro ano ou formato)
+        for stale in set(previous) - set(outputs):
+            stale_path = os.path.join(output_dir, stale)
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+                if not os.listdir(os.path.dirname(stale_path)):
+                    os.rmdir(os.path.dirname(stale_path))
+        manifest['files'][result['input']] = {
+            'sha256': result['sha256'],
+            'size': result['size'],
+            'mtime': result['mtime'],
+            'rows': result['rows'],
+            'station': result['station'],
+            'first': str(result['first']),
+            'last': str(result['last']),
+            'format': fmt,
+            'outputs': sorted(outputs),
+            'converted_at': datetime.now().isoformat(timespec='seconds'),
+        }
+    save_manifest(output_dir, manifest)
+    return results, errors, unchanged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default="data/inmet.csv", help="CSV do INMET (modo arquivo único)")
+    parser.add_argument("--output", default="data/sample_thermal_data.parquet",
+                        help="Arquivo de saída, .parquet ou .csv (modo arquivo único)")
+    parser.add_argument("--batch", help="Diretório ou glob de CSVs de estação (ex.: 'data/inmet/*.CSV')")
+    parser.add_argument("--output-dir", default="data/processed/inmet", help="Diretório do conjunto particionado (lote)")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="Formato das partições (lote)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processos do lote (padrão: núcleos)")
+    parser.add_argument("--chunk-rows", type=int, default=0,
+                        help="Ler e escrever em blocos de N linhas, com memória limitada (0 = arquivo inteiro)")
+    parser.add_argument("--full", action="store_true", help="Ignorar o manifesto e converter todos os arquivos (lote)")
+    args = parser.parse_args()
+
+    if not args.batch:
+        if not os.path.exists(args.input):
+            print(f"Arquivo {args.input} não encontrado na raiz.")
+        else:
+            convert_inmet_to_system_format(args.input, args.output, chunk_rows=args.chunk_rows)
+        return
+
+    inputs = resolve_inputs(args.batch)
+    if not inputs:
+        print(f"❌ Nenhum CSV encontrado em '{args.batch}'")
+        sys.exit(1)
+    if os.path.isdir(args.batch) and os.path.abspath(args.output_dir).startswith(os.path.abspath(args.batch) + os.sep):
+        # As partições .csv do próprio conjunto não são entradas do INMET
+        output_root = os.path.abspath(args.output_dir) + os.sep
+        inputs = [path for path in inputs if not path.startswith(output_root)]
+
+    print(f"🔄 Lote de {len(inputs)} arquivos com {args.workers} processos -> {args.output_dir}")
+    start = time.perf_counter()
+    results, errors, unchanged = convert_inmet_incremental(
+        inputs, args.output_dir, workers=args.workers, chunk_rows=args.chunk_rows, fmt=args.format, full=args.full,
+    )
+    elapsed = time.perf_counter() - start
+
+    rows = sum(r['rows'] for r in results)
+    stations = {r['station'] for r in results}
+    print(f"\n📊 {len(results)} arquivos convertidos ({len(unchanged)} inalterados), {len(stations)} estações, "
+          f"{rows} registros em {elapsed:.1f}s ({rows / elapsed if elapsed else 0:,.0f} linhas/s)")
+    if results:
+        print(f"📅 Período: {min(r['first'] for r in results)} até {max(r['last'] for r in results)}")
+
+    if errors:
+        print(f"\n❌ {len(errors)} arquivos com erro:")
+        for path, message in errors:
+            print(f"   {path}: {message}")
+        sys.exit(1)
+    print("\n✅ Lote concluído")
+
+
+if __name__ == "__main__":
+    main()
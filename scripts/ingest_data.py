@@ -1,4 +1,3 @@
-import pandas as pd
 import requests
 import os
 import sys
@@ -8,6 +7,8 @@ from tqdm import tqdm
 # Add project root to path to import other modules if needed
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from app.services.thermal_dataset import DATASET_COLUMNS, load_dataset
+
 # Configuration
 THINGSBOARD_HOST = os.getenv("THINGSBOARD_HOST", "http://localhost:8080")
 FASTAPI_HOST = os.getenv("FASTAPI_HOST", "http://localhost:8060")
@@ -88,7 +89,7 @@ def send_to_api(row):
     url = f"{FASTAPI_HOST}/thermal_comfort/"
     try:
         payload = {
-            "timestamp": row['timestamp'],
+            "timestamp": row['timestamp'].isoformat(),
             "temperature": row['temperature'],
             "humidity": row['humidity'],
             "wind_velocity": row['wind_velocity'],
@@ -102,7 +103,7 @@ def send_to_api(row):
 
 def process_row(row_data):
     device_access_token, row = row_data
-    ts = int(pd.to_datetime(row['timestamp']).timestamp() * 1000)
+    ts = int(row['timestamp'].timestamp() * 1000)
     
     telemetry = {
         "ts": ts,
@@ -136,13 +137,15 @@ def main():
     if not device_access_token:
         return
 
-    data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_thermal_data.csv')
-    if not os.path.exists(data_path):
+    # Parquet is the processed format; a CSV with the same name is used as fallback
+    data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_thermal_data.parquet')
+    try:
+        df = load_dataset(data_path, columns=DATASET_COLUMNS)
+    except FileNotFoundError:
         print(f"Data file not found at {data_path}. Please run convert_inmet_data.py to process data first.")
         return
 
-    print(f"Reading data from {data_path}...")
-    df = pd.read_csv(data_path)
+    print(f"Read {len(df)} rows from {data_path}")
     
     print(f"Sending {len(df)} records to ThingsBoard using {MAX_WORKERS} workers...")
     
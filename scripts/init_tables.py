@@ -1,6 +1,11 @@
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.thermal_schema import create_schema, is_partitioned, rebuild_rollups
 
 def get_db_connection(db_name="avd_wind_data"):
     return psycopg2.connect(
@@ -35,29 +40,26 @@ def create_database():
 def init_tables():
     create_database()
     
-    commands = (
-        """
-        CREATE TABLE IF NOT EXISTS thermal_measurements (
-            id SERIAL PRIMARY KEY,
-            timestamp TIMESTAMP NOT NULL,
-            temperature FLOAT NOT NULL,
-            humidity FLOAT NOT NULL,
-            wind_velocity FLOAT NOT NULL,
-            pressure FLOAT NOT NULL,
-            solar_radiation FLOAT NOT NULL,
-            thermal_sensation FLOAT,
-            comfort_zone VARCHAR(50),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """,
-    )
-    
     conn = None
     try:
         conn = get_db_connection()
         cur = conn.cursor()
-        for command in commands:
-            cur.execute(command)
+        cur.execute("SELECT to_regclass('thermal_measurements') IS NOT NULL")
+        if cur.fetchone()[0] and not is_partitioned(cur):
+            print("thermal_measurements is not partitioned yet. "
+                  "Run scripts/migrate_partitioned_table.py to migrate it.")
+            return
+        # Tabela particionada por mês + partições do mês corrente e dos próximos
+        create_schema(cur, months_ahead=int(os.getenv("THERMAL_PARTITION_MONTHS_AHEAD", "3")))
+        # Rollups recém-criados sobre uma tabela com dados: preencher
+        cur.execute("""
+            SELECT NOT EXISTS (SELECT 1 FROM thermal_rollup_daily)
+               AND EXISTS (SELECT 1 FROM thermal_measurements)
+        """)
+        if cur.fetchone()[0]:
+            rebuild_rollups(cur)
+            print("Rollup tables rebuilt from thermal_measurements.")
+        cur.execute("ANALYZE thermal_measurements")
         cur.close()
         conn.commit()
         print("Tables created successfully!")
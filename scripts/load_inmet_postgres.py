@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Carga INMET -> PostgreSQL
+=========================
+
+Converte arquivos do INMET (com o conversor de ``convert_inmet_data.py``)
+e grava as leituras direto em ``thermal_measurements``, sem CSV
+intermediário nem uma requisição HTTP por linha:
+
+1. os arquivos são convertidos em paralelo por um pool de processos (com
+   ``--chunk-rows``, em blocos no próprio processo, para arquivos muito
+   grandes);
+2. cada arquivo é carregado em uma transação: as linhas vão por
+   ``COPY ... FROM STDIN`` (blocos de ``--copy-rows`` linhas) para uma
+   tabela temporária e de lá para ``thermal_measurements`` com um único
+   ``INSERT ... ON CONFLICT (station, timestamp) DO NOTHING``, que no
+   mesmo statement soma as linhas novas aos rollups e incrementa a versão
+   de escrita;
+3. leituras já carregadas (mesma estação e horário) são ignoradas, então
+   repetir a carga de um arquivo, ou de um arquivo anual que cresceu, é
+   seguro.
+
+Com ``--dry-run`` cada transação é desfeita no final: o script só relata
+quantas linhas seriam inseridas.
+
+Uso:
+    python scripts/load_inmet_postgres.py --batch "data/inmet/*.CSV" --workers 8
+    python scripts/load_inmet_postgres.py --batch data/inmet --dry-run
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import create_connection
+from app.services.thermal_dataset import DATE_FORMAT
+from app.services.thermal_schema import ENSURE_PARTITIONS_SQL, INSERTED_ROLLUP_CTES
+from scripts.convert_inmet_data import iter_inmet_chunks, load_inmet_file, read_inmet_header, resolve_inputs
+
+LOAD_COLUMNS = [
+    "station", "timestamp", "temperature", "humidity", "wind_velocity",
+    "pressure", "solar_radiation", "thermal_sensation", "comfort_zone",
+]
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE thermal_load (
+        station VARCHAR(16) NOT NULL,
+        timestamp TIMESTAMP NOT NULL,
+        temperature FLOAT NOT NULL,
+        humidity FLOAT NOT NULL,
+        wind_velocity FLOAT NOT NULL,
+        pressure FLOAT NOT NULL,
+        solar_radiation FLOAT NOT NULL,
+        thermal_sensation FLOAT,
+        comfort_zone VARCHAR(50)
+    ) ON COMMIT DROP
+"""
+COPY_SQL = f"COPY thermal_load ({', '.join(LOAD_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+INSERT_SQL = f"""
+    WITH inserted AS (
+        INSERT INTO thermal_measurements ({', '.join(LOAD_COLUMNS)})
+        SELECT {', '.join(LOAD_COLUMNS)} FROM thermal_load ORDER BY timestamp
+        ON CONFLICT (station, timestamp) DO NOTHING
+        RETURNING *
+    ),
+    {INSERTED_ROLLUP_CTES}
+    SELECT COUNT(*) AS inserted FROM inserted
+"""
+
+
+def copy_frame(cur, df, copy_rows):
+    """Enviar ``df`` para ``thermal_load`` com ``COPY FROM STDIN``, ``copy_rows`` linhas por vez."""
+    for start in range(0, len(df), copy_rows):
+        buffer = io.StringIO()
+        df.iloc[start:start + copy_rows].to_csv(
+            buffer, columns=LOAD_COLUMNS, header=False, index=False, date_format=DATE_FORMAT,
+        )
+        buffer.seek(0)
+        cur.copy_expert(COPY_SQL, buffer)
+
+
+def load_file(conn, station, frames, copy_rows=50_000, dry_run=False):
+    """
+    Carregar os blocos convertidos de um arquivo em uma transação.
+
+    Returns:
+        ``(linhas lidas, linhas inseridas)``
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(CREATE_STAGING_SQL)
+        staged = 0
+        for df in frames:
+            if df.empty:
+                continue
+            df = df.assign(station=station)
+            # Partições mensais do período (sem elas as linhas iriam para a default)
+            cur.execute(ENSURE_PARTITIONS_SQL, {
+                "start": df['timestamp'].min().date(), "end": df['timestamp'].max().date(),
+            })
+            copy_frame(cur, df, copy_rows)
+            staged += len(df)
+        cur.execute(INSERT_SQL)
+        inserted = cur.fetchone()['inserted']
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return staged, inserted
+
+
+def _convert(path):
+    return read_inmet_header(path), load_inmet_file(path)
+
+
+def iter_converted(inputs, workers=None, chunk_rows=None):
+    """
+    ``(arquivo, cabeçalho, blocos, erro)`` de cada entrada, na ordem em que
+    ficam prontas. No pool há no máximo ``2 * workers`` arquivos
+    convertidos esperando a carga.
+    """
+    if chunk_rows:
+        for path in inputs:
+            try:
+                yield path, read_inmet_header(path), iter_inmet_chunks(path, chunk_rows), None
+            except Exception as e:
+                yield path, None, None, e
+        return
+
+    workers = workers or os.cpu_count()
+    remaining = iter(inputs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+
+        def submit_next():
+            path = next(remaining, None)
+            if path is not None:
+                futures[pool.submit(_convert, path)] = path
+
+        for _ in range(2 * workers):
+            submit_next()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = futures.pop(future)
+                submit_next()
+                try:
+                    header, df = future.result()
+                except Exception as e:
+                    yield path, None, None, e
+                    continue
+                yield path, header, [df], None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", required=True, help="Diretório ou glob de CSVs de estação do INMET")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processos de conversão (padrão: núcleos)")
+    parser.add_argument("--chunk-rows", type=int, default=0,
+                        help="Converter cada arquivo em blocos de N linhas, com memória limitada (0 = arquivo inteiro)")
+    parser.add_argument("--copy-rows", type=int, default=50_000, help="Linhas por COPY")
+    parser.add_argument("--dry-run", action="store_true", help="Desfazer cada transação (só relatar)")
+    args = parser.parse_args()
+
+    inputs = resolve_inputs(args.batch)
+    if not inputs:
+        print(f"❌ Nenhum CSV encontrado em '{args.batch}'")
+        sys.exit(1)
+
+    mode = "Simulando carga" if args.dry_run else "Carregando"
+    print(f"🚚 {mode} de {len(inputs)} arquivos em thermal_measurements ({args.workers} processos de conversão)\n")
+
+    conn = create_connection()
+    total = len(inputs)
+    width = len(str(total))
+    staged_total, inserted_total, errors = 0, 0, []
+    start = time.perf_counter()
+    try:
+        for done, (path, header, frames, error) in enumerate(
+            iter_converted(inputs, workers=args.workers, chunk_rows=args.chunk_rows), 1
+        ):
+            name = os.path.basename(path)
+            file_start = time.perf_counter()
+            if error is None:
+                try:
+                    staged, inserted = load_file(conn, header['station'], frames, args.copy_rows, args.dry_run)
+                except Exception as e:
+                    error = e
+            if error is not None:
+                errors.append((path, f"{type(error).__name__}: {error}"))
+                print(f"[{done:>{width}}/{total}] ❌ {name}: {error}")
+                continue
+
+            elapsed = time.perf_counter() - file_start
+            staged_total += staged
+            inserted_total += inserted
+            print(f"[{done:>{width}}/{total}] ✅ {header['station']} {name}: {staged} linhas, {inserted} novas, "
+                  f"{staged - inserted} já carregadas ({elapsed:.2f}s, {staged / elapsed if elapsed else 0:,.0f} linhas/s)")
+
+        if inserted_total and not args.dry_run:
+            cur = conn.cursor()
+            cur.execute("ANALYZE thermal_measurements")
+            conn.commit()
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    verb = "seriam inseridas" if args.dry_run else "inseridas"
+    print(f"\n📊 {staged_total} linhas lidas, {inserted_total} {verb}, {staged_total - inserted_total} já carregadas "
+          f"em {elapsed:.1f}s ({staged_total / elapsed if elapsed else 0:,.0f} linhas/s)")
+    if errors:
+        print(f"\n❌ {len(errors)} arquivos com erro (nada foi gravado deles):")
+        for path, message in errors:
+            print(f"   {path}: {message}")
+        sys.exit(1)
+    print("\n✅ Carga concluída")
+
+
+if __name__ == "__main__":
+    main()
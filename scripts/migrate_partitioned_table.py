@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Migração - thermal_measurements particionada por mês
+====================================================
+
+Converte a tabela ``thermal_measurements`` antiga (heap único com chave
+``id SERIAL``) no esquema particionado de ``app/services/thermal_schema.py``:
+
+1. a tabela antiga é renomeada para ``thermal_measurements_legacy`` (seus
+   índices são removidos e a sequence de ids é preservada);
+2. a tabela particionada é criada, com uma partição por mês entre a
+   leitura mais antiga e ``THERMAL_PARTITION_MONTHS_AHEAD`` meses à frente;
+3. as linhas são copiadas mês a mês;
+4. as contagens são conferidas, os rollups são recalculados e a tabela
+   antiga é removida (ou mantida com ``--keep-legacy``).
+
+Tudo roda em uma única transação: em caso de erro nada muda.
+
+Uso:
+    python scripts/migrate_partitioned_table.py --dry-run
+    python scripts/migrate_partitioned_table.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import create_connection
+from app.services.thermal_schema import (
+    ENSURE_PARTITIONS_SQL,
+    SCHEMA_STATEMENTS,
+    add_months,
+    is_partitioned,
+    partition_window,
+    rebuild_rollups,
+)
+
+COLUMNS = (
+    "id, timestamp, temperature, humidity, wind_velocity, pressure, "
+    "solar_radiation, thermal_sensation, comfort_zone, created_at"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Apenas mostrar o que seria migrado")
+    parser.add_argument("--keep-legacy", action="store_true", help="Manter thermal_measurements_legacy")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT to_regclass('thermal_measurements') IS NOT NULL AS exists")
+        if not cur.fetchone()["exists"]:
+            print("❌ thermal_measurements não existe; use scripts/init_tables.py")
+            sys.exit(1)
+        if is_partitioned(cur):
+            print("✅ thermal_measurements já é particionada")
+            return
+
+        cur.execute("""
+            SELECT date_trunc('month', MIN(timestamp))::date AS first_month,
+                   date_trunc('month', MAX(timestamp))::date AS last_month,
+                   COUNT(*) AS total
+            FROM thermal_measurements
+        """)
+        info = cur.fetchone()
+        total = info["total"]
+        current, last_ahead = partition_window(int(os.getenv("THERMAL_PARTITION_MONTHS_AHEAD", "3")))
+        first_month = min(info["first_month"] or current, current)
+        last_month = max(info["last_month"] or last_ahead, last_ahead)
+
+        print(f"📊 {total} linhas, partições de {first_month:%Y-%m} a {last_month:%Y-%m}")
+        if args.dry_run:
+            return
+
+        start = time.perf_counter()
+
+        # 1. Tirar a tabela antiga do caminho, preservando a sequence de ids
+        cur.execute("LOCK TABLE thermal_measurements IN ACCESS EXCLUSIVE MODE")
+        cur.execute("ALTER TABLE thermal_measurements RENAME TO thermal_measurements_legacy")
+        cur.execute("""
+            SELECT con.conname FROM pg_constraint con
+            WHERE con.conrelid = 'thermal_measurements_legacy'::regclass AND con.contype = 'p'
+        """)
+        pkey = cur.fetchone()
+        if pkey:
+            cur.execute(f'ALTER TABLE thermal_measurements_legacy DROP CONSTRAINT "{pkey["conname"]}"')
+        cur.execute("""
+            SELECT indexrelid::regclass::text AS name FROM pg_index
+            WHERE indrelid = 'thermal_measurements_legacy'::regclass
+        """)
+        for index in cur.fetchall():
+            cur.execute(f"DROP INDEX {index['name']}")
+        cur.execute("ALTER SEQUENCE IF EXISTS thermal_measurements_id_seq OWNED BY NONE")
+        cur.execute("ALTER TABLE thermal_measurements_legacy ALTER COLUMN id DROP DEFAULT")
+
+        # 2. Esquema particionado
+        for statement in SCHEMA_STATEMENTS:
+            cur.execute(statement)
+        cur.execute(ENSURE_PARTITIONS_SQL, {"start": first_month, "end": last_month})
+        print(f"🗂️  {cur.rowcount} partições mensais")
+
+        # 3. Copiar mês a mês
+        month = first_month
+        while month <= last_month:
+            next_month = add_months(month, 1)
+            cur.execute(
+                f"""
+                INSERT INTO thermal_measurements ({COLUMNS})
+                SELECT {COLUMNS} FROM thermal_measurements_legacy
+                WHERE timestamp >= %(start)s AND timestamp < %(end)s
+                """,
+                {"start": month, "end": next_month},
+            )
+            if cur.rowcount:
+                print(f"   {month:%Y-%m}: {cur.rowcount} linhas")
+            month = next_month
+
+        # 4. Conferir e limpar
+        cur.execute("SELECT COUNT(*) AS total FROM thermal_measurements")
+        migrated = cur.fetchone()["total"]
+        if migrated != total:
+            raise RuntimeError(f"Contagem divergente: {migrated} migradas, {total} na tabela antiga")
+        cur.execute(
+            "SELECT setval('thermal_measurements_id_seq', "
+            "GREATEST((SELECT COALESCE(MAX(id), 0) FROM thermal_measurements), 1))"
+        )
+        rebuild_rollups(cur)
+        if not args.keep_legacy:
+            cur.execute("DROP TABLE thermal_measurements_legacy")
+        cur.execute("ANALYZE thermal_measurements")
+
+        conn.commit()
+        print(f"\n✅ {migrated} linhas migradas em {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Migração abortada, nada foi alterado: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
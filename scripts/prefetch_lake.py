@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Prefetch do Data Lake
+=====================
+
+Baixa para o cache local (``LAKE_CACHE_DIR``) os objetos do data lake de
+um intervalo de tempo, antes de um treino ou análise que vá lê-los com
+``DatasetReader``. Objetos já em cache não são baixados de novo.
+
+Uso:
+    python scripts/prefetch_lake.py --start 2025-11-01 --end 2025-12-01
+    python scripts/prefetch_lake.py --start 2025-11-01 --cache-dir /tmp/lake-cache
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.lake_cache import ObjectCache, create_object_cache
+from app.services.storage_service import DatasetReader, LocalStorageService, StorageService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=datetime.fromisoformat, required=True, help="Início do intervalo")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=datetime.now(), help="Fim do intervalo (padrão: agora)")
+    parser.add_argument("--cache-dir", help="Diretório do cache (padrão: LAKE_CACHE_DIR)")
+    parser.add_argument("--max-bytes", type=int, default=int(os.getenv("LAKE_CACHE_MAX_BYTES", str(2 * 1024 ** 3))),
+                        help="Tamanho máximo do cache com --cache-dir (padrão: LAKE_CACHE_MAX_BYTES)")
+    parser.add_argument("--bucket", default="avd-raw-data", help="Bucket do data lake")
+    parser.add_argument("--local-dir", help="Usar um diretório local no lugar do S3")
+    parser.add_argument("--workers", type=int, default=8, help="Downloads simultâneos")
+    args = parser.parse_args()
+
+    cache = (
+        ObjectCache(args.cache_dir, max_bytes=args.max_bytes)
+        if args.cache_dir else create_object_cache()
+    )
+    if cache is None:
+        print("❌ Defina LAKE_CACHE_DIR ou use --cache-dir")
+        sys.exit(1)
+
+    storage = LocalStorageService(args.local_dir, args.bucket) if args.local_dir else StorageService(args.bucket)
+    reader = DatasetReader(storage, max_workers=args.workers, cache=cache)
+
+    print(f"📥 Prefetch de {args.start} a {args.end} em {cache.directory}\n")
+    start = time.perf_counter()
+    count = reader.prefetch(args.start, args.end)
+    elapsed = time.perf_counter() - start
+
+    stats = cache.stats()
+    print(f"✅ {count} objetos em {elapsed:.1f}s "
+          f"({stats['misses']} baixados, {stats['hits']} já em cache, "
+          f"{stats['bytes_downloaded'] / 1024 ** 2:.1f} MiB)")
+    print(f"   Cache: {stats['disk_bytes'] / 1024 ** 2:.1f} / {stats['max_bytes'] / 1024 ** 2:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Rebuild dos Rollups
+===================
+
+Recalcula ``thermal_rollup_hourly`` e ``thermal_rollup_daily`` a partir de
+``thermal_measurements``. Os rollups são mantidos pela própria ingestão;
+este script só é necessário após cargas feitas direto no banco (COPY,
+restore de backup) ou para conferir divergências.
+
+A ingestão concorrente fica bloqueada até o commit e depois soma por cima,
+então o rebuild pode rodar com a API no ar.
+
+Uso:
+    python scripts/rebuild_rollups.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import create_connection
+from app.services.thermal_schema import ROLLUP_TABLES, rebuild_rollups
+
+
+def main():
+    conn = create_connection()
+    try:
+        start = time.perf_counter()
+        cur = conn.cursor()
+        rebuild_rollups(cur)
+        counts = {}
+        for grain, table in ROLLUP_TABLES.items():
+            cur.execute(f"SELECT COUNT(*) AS buckets, COALESCE(SUM(n), 0) AS readings FROM {table}")
+            counts[grain] = cur.fetchone()
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Erro ao recalcular rollups: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    print(f"✅ Rollups recalculados em {time.perf_counter() - start:.1f}s")
+    for grain, row in counts.items():
+        print(f"   {ROLLUP_TABLES[grain]}: {row['buckets']} intervalos, {row['readings']} leituras")
+
+
+if __name__ == "__main__":
+    main()
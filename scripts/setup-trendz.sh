@@ -109,7 +109,7 @@ echo "   Email:    tenant@thingsboard.org"
 echo "   Senha:    tenant"
 echo ""
 echo "📁 Arquivos criados:"
-echo "   - data/sample_thermal_data.csv"
+echo "   - data/sample_thermal_data.parquet"
 echo "   - data/trendz_dashboard_config.json"
 echo ""
 echo "📋 Próximos passos:"
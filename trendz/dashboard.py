@@ -7,10 +7,18 @@ import json
 from typing import Dict
 import requests
 
+from app.services.thermal_dataset import load_dataset
+
+# Colunas do dataset processado usadas pelos painéis e pelo upload
+DASHBOARD_COLUMNS = [
+    'timestamp', 'temperature', 'humidity', 'wind_velocity', 'pressure',
+    'thermal_sensation', 'comfort_zone'
+]
+
 class ThermalDataProcessor:
     """Processador de dados de sensação térmica para Trendz Analytics"""
     
-    def __init__(self, data_source: str = "/app/data/sample_thermal_data.csv"):
+    def __init__(self, data_source: str = "/app/data/sample_thermal_data.parquet"):
         self.data_source = data_source
         self.df = None
         self.comfort_zones = None
@@ -18,8 +26,7 @@ class ThermalDataProcessor:
     def load_data(self) -> pd.DataFrame:
         """Carregar dados de sensação térmica"""
         try:
-            self.df = pd.read_csv(self.data_source)
-            self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
+            self.df = load_dataset(self.data_source, columns=DASHBOARD_COLUMNS)
             self.df['hour'] = self.df['timestamp'].dt.hour
             self.df['day_of_week'] = self.df['timestamp'].dt.dayofweek
             self.df['month'] = self.df['timestamp'].dt.month
@@ -229,8 +236,8 @@ class TrendzDashboardCreator:
             },
             "data_sources": {
                 "primary": {
-                    "type": "csv",
-                    "path": "/app/data/sample_thermal_data.csv",
+                    "type": "parquet",
+                    "path": "/app/data/sample_thermal_data.parquet",
                     "fields": {
                         "timestamp": "datetime",
                         "temperature": "float", 
@@ -350,7 +357,7 @@ def main():
     
     print("\n🎉 Configuração concluída!")
     print("\nArquivos criados:")
-    print("  - data/sample_thermal_data.csv")
+    print("  - data/sample_thermal_data.parquet")
     print("  - data/trendz_dashboard_config.json")
     print("\nPróximos passos:")
     print("  1. Acesse http://localhost:8888")